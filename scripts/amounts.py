@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Extraktion von Geldbeträgen aus Haushaltstexten (deutsche Schreibweise).
+
+Schnelle Alternative zu fetch_mcp_data.extract_numbers_from_text für
+große Textmengen (z.B. vollständige Haushaltspläne mit 300 Seiten):
+
+    - der Text wird als Array von Codepoints verarbeitet; Zahlengrenzen,
+      Ziffernwerte, Tausenderpunkte und Dezimalkomma werden mit NumPy
+      für alle Zahlen eines Dokuments gleichzeitig bestimmt (kein float()
+      und keine Regex-Gruppe je Treffer)
+    - nur gültige deutsche Schreibweisen: Tausenderpunkte in Dreiergruppen
+      ("13.783.548,35"), höchstens ein Dezimalkomma nach den Punkten,
+      je höchstens 15 Ziffern vor und nach dem Komma (float64 ist darüber
+      ungenau); "1.2.3", ",5" oder überlange Ziffernfolgen sind keine Beträge
+    - negative Beträge ("-1.234", "−1.234", "– 5")
+    - Einheiten "€"/"EUR"/"Euro", "T€"/"TEUR"/"Tsd. €" (x 1.000),
+      "Mio. €" (x 1.000.000), "Mrd. €" (x 1.000.000.000); nur die wenigen
+      Zahlen mit passendem Folgezeichen werden mit UNIT_RE geprüft
+
+Verwendung:
+    from amounts import extract_amounts, extract_amounts_batch
+    werte = extract_amounts("Gewerbesteuer 3,8 Mio. € (Vorjahr 3.550 T€)")
+    treffer = extract_amounts_batch(texte)  # strukturiertes Array mit Offsets
+"""
+
+import re
+from collections.abc import Iterable
+
+import numpy as np
+
+# Einheit direkt nach einer Zahl (an der Position nach der letzten Ziffer geprüft)
+UNIT_RE = re.compile(
+    r"""
+    [ \t\xa0]*
+    (?:
+        (?P<scale>Mio|Mrd|Tsd|T)\.?[ \t\xa0]*(?:€|EUR\b|Euro\b)
+       |TEUR\b
+       |€|EUR\b|Euro\b
+    )
+    """,
+    re.VERBOSE,
+)
+
+SCALE_FACTORS = {None: 1.0, "Mio": 1e6, "Mrd": 1e9, "Tsd": 1e3, "T": 1e3}
+
+AMOUNT_DTYPE = np.dtype([
+    ("doc", np.int32),      # Index des Dokuments im Batch
+    ("start", np.int64),    # Zeichen-Offset Anfang (inkl. Vorzeichen)
+    ("end", np.int64),      # Zeichen-Offset Ende (inkl. Einheit)
+    ("amount", np.float64), # Betrag in EUR
+    ("currency", np.bool_), # Einheit angegeben (€/EUR/T€/Mio. €)
+])
+
+_ZERO, _NINE = ord("0"), ord("9")
+_DOT, _COMMA = ord("."), ord(",")
+_SIGNS = np.array([ord("-"), ord("−"), ord("–")], dtype=np.uint32)
+_SPACES = np.array([ord(" "), ord("\t"), 0xA0], dtype=np.uint32)
+_UNIT_STARTS = np.array([ord("M"), ord("T"), ord("E"), ord("€")], dtype=np.uint32)
+MAX_DIGITS = 15
+_POW10 = 10.0 ** np.arange(2 * MAX_DIGITS + 1)
+
+
+def _is_word(chars: np.ndarray) -> np.ndarray:
+    """Ziffern, Buchstaben (inkl. Umlaute) sowie Punkt/Komma: kein Vorzeichen-Kontext."""
+    lower = chars | 0x20
+    return (
+        ((chars >= _ZERO) & (chars <= _NINE))
+        | ((lower >= ord("a")) & (lower <= ord("z")))
+        | (chars == _DOT) | (chars == _COMMA)
+        | (chars >= 0xC0)
+    )
+
+
+def _empty() -> tuple[np.ndarray, ...]:
+    return (
+        np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.float64), np.empty(0, dtype=np.bool_),
+    )
+
+
+def _valid_tokens(chars: np.ndarray, token: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Prüft die Schreibweise aller Zahlen gleichzeitig.
+
+    Ungültig sind Zahlen direkt nach einem Punkt oder Komma (",5"),
+    mit mehreren Kommas, mit Punkten nach dem Komma, mit Tausendergruppen,
+    die nicht genau drei Ziffern haben ("1.2.3", "12.34"), mit mehr als
+    drei Ziffern vor dem ersten Tausenderpunkt oder mit mehr als
+    MAX_DIGITS Ziffern vor bzw. nach dem Komma.
+    """
+    n = len(starts)
+    before = chars[np.maximum(starts - 1, 0)]
+    valid = (starts == 0) | ((before != _DOT) & (before != _COMMA))
+
+    sep_pos = np.flatnonzero(token & ((chars == _DOT) | (chars == _COMMA)))
+    if not len(sep_pos):
+        return valid & (ends - starts <= MAX_DIGITS)
+
+    sep_token = np.searchsorted(starts, sep_pos, side="right") - 1
+    is_comma = chars[sep_pos] == _COMMA
+    commas = np.bincount(sep_token[is_comma], minlength=n)
+    last_comma = np.full(n, -1, dtype=np.int64)
+    last_comma[sep_token[is_comma]] = sep_pos[is_comma]
+
+    # Länge der Ziffernfolge hinter jedem Trenner (bis zum nächsten Trenner
+    # derselben Zahl oder zum Zahlende)
+    same_next = np.append(sep_token[1:] == sep_token[:-1], False)
+    next_boundary = np.where(same_next, np.append(sep_pos[1:], 0), ends[sep_token])
+    width = next_boundary - sep_pos - 1
+    is_dot = ~is_comma
+    bad_dot = is_dot & ((width != 3) | ((last_comma[sep_token] >= 0) & (sep_pos > last_comma[sep_token])))
+    valid &= (commas <= 1) & (np.bincount(sep_token[bad_dot], minlength=n) == 0)
+
+    # Erste Gruppe vor einem Tausenderpunkt: 1-3 Ziffern
+    first_sep = np.ones(len(sep_pos), dtype=bool)
+    first_sep[1:] = sep_token[1:] != sep_token[:-1]
+    first = first_sep & is_dot
+    valid[sep_token[first]] &= sep_pos[first] - starts[sep_token[first]] <= 3
+
+    # Ziffern vor und nach dem Komma
+    dots = np.bincount(sep_token[is_dot], minlength=n)
+    has_comma = last_comma >= 0
+    integer_end = np.where(has_comma, last_comma, ends)
+    valid &= integer_end - starts - dots <= MAX_DIGITS
+    valid &= ~has_comma | (ends - last_comma - 1 <= MAX_DIGITS)
+    return valid
+
+
+def _scan(text: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Findet alle Beträge eines Textes.
+
+    Eine Zahl ist eine Folge von Ziffern, in der einzelne Punkte
+    (Tausendertrenner) und Kommas (Dezimaltrenner, das letzte zählt)
+    zwischen zwei Ziffern stehen dürfen.
+
+    Returns:
+        (start, end, amount, currency) als Arrays
+    """
+    chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    if not len(chars):
+        return _empty()
+
+    digit = (chars >= _ZERO) & (chars <= _NINE)
+    token = digit.copy()
+    token[1:-1] |= ((chars[1:-1] == _DOT) | (chars[1:-1] == _COMMA)) & digit[:-2] & digit[2:]
+    boundary = token.copy()
+    boundary[1:] ^= token[:-1]
+    starts = np.flatnonzero(boundary & token)
+    if not len(starts):
+        return _empty()
+    ends = np.flatnonzero(boundary & ~token)
+    if len(ends) < len(starts):
+        ends = np.append(ends, len(chars))
+    valid = _valid_tokens(chars, token, starts, ends)
+    if not valid.all():
+        # Ungültige Zahlen samt ihrer Ziffern verwerfen
+        marks = np.zeros(len(chars) + 1, dtype=np.int32)
+        np.add.at(marks, starts[~valid], 1)
+        np.add.at(marks, ends[~valid], -1)
+        dropped = np.cumsum(marks[:-1]) > 0
+        token &= ~dropped
+        digit &= ~dropped
+        starts, ends = starts[valid], ends[valid]
+        if not len(starts):
+            return _empty()
+
+    # Mantisse: alle Ziffern einer Zahl als Ganzzahl; Stellenwert je Ziffer
+    # aus der Anzahl der folgenden Ziffern derselben Zahl
+    digit_pos = np.flatnonzero(digit)
+    first_digit = np.searchsorted(digit_pos, starts)
+    last_digit = np.append(first_digit[1:], len(digit_pos)) - 1
+    token_start = np.zeros(len(digit_pos), dtype=np.int32)
+    token_start[first_digit] = 1
+    token_of_digit = np.cumsum(token_start, dtype=np.int32) - 1
+    exponent = last_digit.astype(np.int32)[token_of_digit] - np.arange(len(digit_pos), dtype=np.int32)
+    terms = (chars[digit_pos] - _ZERO) * _POW10[exponent]
+    amount = np.add.reduceat(terms, first_digit)
+
+    # Nachkommastellen: Ziffern nach dem letzten Komma der Zahl
+    comma_pos = np.flatnonzero(token & (chars == _COMMA))
+    if len(comma_pos):
+        comma_token = np.searchsorted(starts, comma_pos, side="right") - 1
+        last_comma = np.full(len(starts), -1, dtype=np.int64)
+        last_comma[comma_token] = comma_pos  # aufsteigend: das letzte Komma gewinnt
+        has_comma = np.flatnonzero(last_comma >= 0)
+        decimals = last_digit[has_comma] + 1 - np.searchsorted(digit_pos, last_comma[has_comma])
+        amount[has_comma] /= _POW10[decimals]
+
+    # Vorzeichen direkt oder mit einem Leerzeichen vor der Zahl,
+    # aber nicht als Bindestrich zwischen Wörtern/Zahlen ("2023-2024")
+    def char_at(positions):
+        return np.where(positions >= 0, chars[np.maximum(positions, 0)], 0)
+
+    sign_pos = np.where(
+        np.isin(char_at(starts - 1), _SIGNS), starts - 1,
+        np.where((char_at(starts - 1) == ord(" ")) & np.isin(char_at(starts - 2), _SIGNS), starts - 2, -1)
+    )
+    negative = (sign_pos >= 0) & ~_is_word(char_at(sign_pos - 1))
+    amount[negative] *= -1
+    starts = np.where(negative, sign_pos, starts)
+
+    # Einheiten: nur Zahlen, denen (nach höchstens einem Leerzeichen)
+    # M/T/E/€ folgt, werden mit UNIT_RE geprüft
+    def char_after(positions):
+        return np.where(positions < len(chars), chars[np.minimum(positions, len(chars) - 1)], 0)
+
+    candidates = np.flatnonzero(
+        np.isin(char_after(ends), _UNIT_STARTS)
+        | (np.isin(char_after(ends), _SPACES) & np.isin(char_after(ends + 1), _UNIT_STARTS))
+    )
+    currency = np.zeros(len(starts), dtype=np.bool_)
+    for i in candidates.tolist():
+        match = UNIT_RE.match(text, int(ends[i]))
+        if match:
+            amount[i] *= SCALE_FACTORS[match.group("scale")]
+            currency[i] = True
+            ends[i] = match.end()
+
+    return starts, ends, amount, currency
+
+
+def extract_amounts(text: str, currency_only: bool = False) -> np.ndarray:
+    """
+    Extrahiert alle Beträge eines Textes als float64-Array (in EUR).
+
+    Args:
+        text: Haushaltstext
+        currency_only: Nur Zahlen mit Einheit (€/EUR/T€/Mio. €) berücksichtigen
+    """
+    _, _, amount, currency = _scan(text)
+    return amount[currency] if currency_only else amount
+
+
+def extract_amounts_batch(texts: Iterable[str], currency_only: bool = False) -> np.ndarray:
+    """
+    Extrahiert Beträge aus vielen Dokumenten in ein strukturiertes Array.
+
+    Returns:
+        Array mit AMOUNT_DTYPE (doc, start, end, amount, currency),
+        sortiert nach Dokument und Position
+    """
+    parts = []
+    for doc, text in enumerate(texts):
+        starts, ends, amount, currency = _scan(text)
+        if currency_only:
+            starts, ends, amount, currency = (
+                starts[currency], ends[currency], amount[currency], currency[currency]
+            )
+        part = np.empty(len(amount), dtype=AMOUNT_DTYPE)
+        part["doc"] = doc
+        part["start"] = starts
+        part["end"] = ends
+        part["amount"] = amount
+        part["currency"] = currency
+        parts.append(part)
+
+    if not parts:
+        return np.empty(0, dtype=AMOUNT_DTYPE)
+    return np.concatenate(parts)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: extract_numbers_from_text vs. amounts.extract_amounts_batch.
+
+Erzeugt einen synthetischen Korpus aus Haushaltsplan-ähnlichen Seiten
+(Kontenzeilen mit Ansätzen, Fließtext mit T€/Mio. €-Angaben) und misst
+beide Extraktoren auf denselben Dokumenten.
+
+Verwendung:
+    python benchmarks/bench_amounts.py
+    python benchmarks/bench_amounts.py --docs 20 --pages 300
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from amounts import extract_amounts_batch  # noqa: E402
+from fetch_mcp_data import extract_numbers_from_text  # noqa: E402
+
+KONTEN = [
+    "Steuern und ähnliche Abgaben",
+    "Zuwendungen und allgemeine Umlagen",
+    "Personalaufwendungen",
+    "Aufwendungen für Sach- und Dienstleistungen",
+    "Transferaufwendungen",
+    "Zinsen und ähnliche Aufwendungen",
+]
+
+
+def german(value: float, decimals: int = 0) -> str:
+    text = f"{value:,.{decimals}f}"
+    return text.replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def synthetic_page(rng: random.Random) -> str:
+    lines = []
+    for _ in range(40):
+        konto = rng.choice(KONTEN)
+        values = [german(rng.uniform(-5e6, 2e7), rng.choice([0, 2])) for _ in range(6)]
+        lines.append(f"{rng.randint(1, 30)}. {konto} " + " ".join(values))
+    lines.append(
+        f"Die Gewerbesteuer wird mit {german(rng.uniform(1, 9), 1)} Mio. € veranschlagt, "
+        f"gegenüber {german(rng.uniform(1000, 9000))} T€ im Vorjahr (-{german(rng.uniform(1, 500))} EUR)."
+    )
+    return "\n".join(lines)
+
+
+def synthetic_corpus(docs: int, pages: int, seed: int = 42) -> list[str]:
+    """Erzeugt docs Dokumente mit je pages Seiten."""
+    rng = random.Random(seed)
+    return ["\f".join(synthetic_page(rng) for _ in range(pages)) for _ in range(docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Betragsextraktion")
+    parser.add_argument("--docs", type=int, default=5, help="Anzahl Dokumente")
+    parser.add_argument("--pages", type=int, default=300, help="Seiten je Dokument")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen (bester Lauf zählt)")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.docs, args.pages)
+    size_mb = sum(len(text) for text in corpus) / 1e6
+
+    def run_list():
+        return sum(len(extract_numbers_from_text(text)) for text in corpus)
+
+    def run_batch():
+        return len(extract_amounts_batch(corpus))
+
+    results = {}
+    for name, func in (("extract_numbers_from_text", run_list), ("extract_amounts_batch", run_batch)):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            count = func()
+            timings.append(time.perf_counter() - started)
+        results[name] = (min(timings), count)
+
+    print(f"Korpus: {args.docs} Dokumente x {args.pages} Seiten, {size_mb:.1f} MB")
+    baseline = results["extract_numbers_from_text"][0]
+    for name, (seconds, count) in results.items():
+        print(
+            f"  {name:<28} {seconds * 1000:>9.1f} ms  {count:>9} Treffer  "
+            f"{size_mb / seconds:>7.1f} MB/s  {baseline / seconds:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
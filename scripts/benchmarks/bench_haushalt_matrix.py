@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: yaml.safe_load + Dict-Zugriffe vs. gecachte Haushaltsmatrix.
+
+Erzeugt eine vergrößerte Haushalts-YAML (viele Positionen, lange Zeitreihe,
+wie mit Einzelposten und LSN-Historie zu erwarten) und misst den Start
+(Laden) sowie das Auslesen aller Jahre für die Sankey-Generatoren.
+
+Verwendung:
+    python benchmarks/bench_haushalt_matrix.py
+    python benchmarks/bench_haushalt_matrix.py --items 500 --years 40
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from haushalt_matrix import load_haushalt_matrix  # noqa: E402
+
+
+def synthetic_yaml(items: int, years: int, seed: int = 42) -> str:
+    """Haushalts-YAML mit items Positionen je Abschnitt und years Jahren."""
+    rng = random.Random(seed)
+    data = {"metadata": {"gemeinde": "Nordstemmen"}}
+    for section in ("ertraege", "aufwendungen"):
+        data[section] = {
+            f"{section}_{i}": {
+                "name": f"Position {i}",
+                "werte": {2030 - years + j: rng.randint(0, 20_000_000) for j in range(years)},
+                "einheit": "EUR",
+            }
+            for i in range(items)
+        }
+    return yaml.safe_dump(data, allow_unicode=True, sort_keys=False)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des Haushaltsmatrix-Caches")
+    parser.add_argument("--items", type=int, default=200, help="Positionen je Abschnitt")
+    parser.add_argument("--years", type=int, default=35, help="Anzahl Jahre")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen (bester Lauf zählt)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        yaml_path = Path(tmp) / "haushalt.yaml"
+        yaml_path.write_text(synthetic_yaml(args.items, args.years), encoding="utf-8")
+        cache_dir = Path(tmp) / "cache"
+        all_years = range(2030 - args.years, 2030)
+
+        def dict_walk():
+            with open(yaml_path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+            for year in all_years:
+                for section in ("ertraege", "aufwendungen"):
+                    [item.get("werte", {}).get(year, 0) for item in data[section].values()]
+
+        def matrix_cold():
+            matrix = load_haushalt_matrix(yaml_path, cache_dir, refresh=True)
+            for year in all_years:
+                matrix.column("ertraege", year), matrix.column("aufwendungen", year)
+
+        def matrix_cached():
+            matrix = load_haushalt_matrix(yaml_path, cache_dir)
+            for year in all_years:
+                matrix.column("ertraege", year), matrix.column("aufwendungen", year)
+
+        size_kb = yaml_path.stat().st_size / 1024
+        print(f"YAML: {2 * args.items} Positionen x {args.years} Jahre, {size_kb:.0f} KB")
+        baseline = None
+        for name, func in (("safe_load + dict", dict_walk),
+                           ("Matrix (ohne Cache)", matrix_cold),
+                           ("Matrix (Cache)", matrix_cached)):
+            seconds = best_of(func, args.repeat)
+            baseline = baseline or seconds
+            print(f"  {name:<22} {seconds * 1000:>9.1f} ms  {baseline / seconds:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
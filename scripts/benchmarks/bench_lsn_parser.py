@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BeautifulSoup-Parser vs. Streaming-Parser (lxml) für LSN-Ergebnisseiten.
+
+Nutzt die gespeicherten Fixture-Seiten in fixtures/lsn/ sowie eine daraus
+hochskalierte Landesseite (alle Gemeinden in einer Tabelle, mehrere MB).
+
+Verwendung:
+    python benchmarks/bench_lsn_parser.py
+    python benchmarks/bench_lsn_parser.py --regions 940 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lsn_parser  # noqa: E402
+from fetch_lsn_data import LSNApiClient  # noqa: E402
+from lsn_stub_server import format_cell, stub_value  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "lsn"
+
+
+def render_statewide_page(n_regions: int, years=range(1983, 2025)) -> str:
+    """Erzeugt eine Landesseite: eine Tabelle mit Zeilen je Gemeinde und Jahr."""
+    rows = []
+    for region in range(n_regions):
+        region_id = f"{region:09d}"
+        for year in years:
+            cells = "".join(
+                f"<td align=\"right\">{format_cell(stub_value('Z9200001', region_id, year, i))}</td>"
+                for i in range(4)
+            )
+            rows.append(f"<tr><td>{year}</td><td>Gemeinde {region_id}</td>{cells}</tr>")
+    return (
+        "<html><body><table border=\"1\">"
+        "<tr><th>Jahr</th><th>Niedersachsen</th><th>Grundsteuer A</th><th>Grundsteuer B</th>"
+        "<th>Gewerbesteuer</th><th>Gemeindeanteil Einkommensteuer</th></tr>"
+        + "\n".join(rows)
+        + "</table></body></html>"
+    )
+
+
+def best_of(func, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der LSN-Tabellenparser")
+    parser.add_argument("--regions", type=int, default=200, help="Gemeinden in der Landesseite")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen (bester Lauf zählt)")
+    args = parser.parse_args()
+
+    pages = {path.name: path.read_text(encoding="latin-1") for path in sorted(FIXTURE_DIR.glob("*.html"))}
+    pages[f"landesseite_{args.regions}"] = render_statewide_page(args.regions)
+
+    print(f"{'Seite':<32} {'Größe':>10} {'Zeilen':>8} {'bs4':>10} {'lxml':>10} {'Faktor':>8}")
+    for name, html in pages.items():
+        rows = len(lsn_parser.parse_html_table(html))
+        assert rows == len(LSNApiClient.parse_html_table_bs4(html)), f"Zeilenzahl weicht ab: {name}"
+        bs4_time = best_of(LSNApiClient.parse_html_table_bs4, html, args.repeat)
+        lxml_time = best_of(lsn_parser.parse_html_table, html, args.repeat)
+        print(
+            f"{name:<32} {len(html) / 1024:>8.0f}KB {rows:>8} "
+            f"{bs4_time * 1000:>8.1f}ms {lxml_time * 1000:>8.1f}ms {bs4_time / lxml_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
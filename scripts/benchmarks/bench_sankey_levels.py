@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: flache Sankey-Kanten vs. hierarchische Ebenendateien.
+
+Erzeugt Produktkonten-ähnliche Positionen (Teilhaushalt -> Produktbereich
+-> Produkt, schiefe Werteverteilung) und vergleicht die Kantenzahl eines
+flachen Diagramms mit der größten Ebenendatei sowie die Bauzeit.
+
+Verwendung:
+    python benchmarks/bench_sankey_levels.py
+    python benchmarks/bench_sankey_levels.py --products 50000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sankey_levels import DEFAULT_MAX_EDGES, DEFAULT_MIN_SHARE, build_levels  # noqa: E402
+
+
+def synthetic_items(products: int, teilhaushalte: int = 8, bereiche: int = 12, seed: int = 42) -> pd.DataFrame:
+    """Positionen mit Pareto-verteilten Werten."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(products):
+        th = rng.randrange(teilhaushalte)
+        pb = rng.randrange(bereiche)
+        rows.append((f"Teilhaushalt {th}", f"Produktbereich {th}.{pb}", f"Produkt {i}", rng.paretovariate(1.2) * 1000))
+    return pd.DataFrame(rows, columns=["teilhaushalt", "produktbereich", "produkt", "wert"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der hierarchischen Sankey-Ebenen")
+    parser.add_argument("--products", type=int, default=5000, help="Anzahl Produkte")
+    parser.add_argument("--min-share", type=float, default=DEFAULT_MIN_SHARE)
+    parser.add_argument("--max-edges", type=int, default=DEFAULT_MAX_EDGES)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.products)
+    started = time.perf_counter()
+    files = build_levels(items, "ausgaben", 2025, min_share=args.min_share, max_edges=args.max_edges)
+    elapsed = time.perf_counter() - started
+
+    largest = max(len(payload["links"]) for payload in files.values())
+    print(f"{len(items)} Positionen")
+    print(f"  flach:        {len(items):>7} Kanten in einem Diagramm")
+    print(f"  hierarchisch: {largest:>7} Kanten je Datei (max.), {len(files)} Dateien, {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
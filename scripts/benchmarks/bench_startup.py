@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Prüfung: "haushalt --help" muss unter einem Zeitbudget bleiben.
+
+Startet haushalt.py --help mehrfach als eigenen Prozess, vergleicht den
+Median mit dem Budget und prüft per -X importtime, dass keine schweren
+Abhängigkeiten (pandas, numpy, requests, ...) geladen werden. Exit-Code 1
+bei Überschreitung, damit die Prüfung in CI/Makefiles laufen kann.
+
+Verwendung:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 150 --runs 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HAUSHALT = Path(__file__).resolve().parent.parent / "haushalt.py"
+
+DEFAULT_BUDGET_MS = 150.0
+HEAVY_MODULES = {"pandas", "numpy", "requests", "yaml", "bs4", "lxml", "httpx", "pyarrow", "duckdb", "playwright"}
+
+
+def run_once(args: list[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def imported_modules(args: list[str]) -> set[str]:
+    """Top-Level-Module, die der Prozess importiert (aus -X importtime)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], check=True, capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startzeit von haushalt --help prüfen")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Erlaubter Median in ms (Standard: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--runs", type=int, default=10, help="Anzahl Starts")
+    args = parser.parse_args()
+
+    command = [str(HAUSHALT), "--help"]
+    run_once(command)  # Aufwärmen (Bytecode, Dateisystem-Cache)
+    interpreter = statistics.median(run_once(["-c", "pass"]) for _ in range(args.runs)) * 1000
+    median = statistics.median(run_once(command) for _ in range(args.runs)) * 1000
+    heavy = sorted(imported_modules(command) & HEAVY_MODULES)
+
+    print(f"python -c pass:   {interpreter:>7.1f} ms (Median aus {args.runs})")
+    print(f"haushalt --help:  {median:>7.1f} ms (Budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if median > args.budget_ms:
+        print("Budget überschritten!")
+        failed = True
+    if heavy:
+        print(f"Schwere Module beim Start geladen: {', '.join(heavy)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
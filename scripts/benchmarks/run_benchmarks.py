@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Suite für die Parse-, Extraktions- und Generierungspfade.
+
+Misst mit festen Eingaben:
+    - LSNApiClient.parse_html_table und lsn_parser.parse_zip_export auf den
+      aufgezeichneten LSN-Antworten in fixtures/lsn/
+    - extract_numbers_from_text und extract_structured_data auf den
+      JSON-RPC-Antworten in fixtures/mcp/ (search_documents, get_paper_by_reference)
+    - YAML-Laden und generate_*_sankey auf synthetischen Haushalts-YAMLs
+      mit 10, 1 000 und 100 000 Positionen (deterministisch erzeugt)
+    - Monte-Carlo-Szenarien (generate_szenarien) mit 100 000 Pfaden auf den
+      Planjahren der echten YAML-Datei
+    - Gemeindevergleich (generate_vergleich) auf einem synthetischen Würfel
+      mit 940 Gemeinden, 42 Jahren und 8 Merkmalen
+
+Jede Gruppe von Fällen (LSN, MCP, je Skalierung YAML/Sankey, Szenarien,
+Vergleich) läuft in einem eigenen Prozess, damit z.B. die Speicherlast
+des 100 000er-YAMLs nicht die Zeiten späterer Fälle verfälscht. Je Fall
+zählt der beste von mindestens --repeat Läufen; kurze Fälle werden
+wiederholt, bis insgesamt MIN_MEASURE_SECONDS gemessen sind. Mit --save-baseline werden
+die Zeiten in baselines.json gespeichert; ohne wird gegen die Baseline
+verglichen und mit Exit-Code 1 beendet, wenn ein Fall um mehr als
+--threshold langsamer ist (Abweichungen unter --min-delta-ms gelten als
+Rauschen). Gruppen mit einer vermeintlichen Regression werden bis zu
+--confirm Mal in einem neuen Prozess wiederholt; es zählt der beste Wert je
+Fall. Baselines gelten nur für die Maschine, auf der sie erstellt wurden.
+
+Verwendung:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --scales 10,1000 --filter sankey
+    python benchmarks/run_benchmarks.py --threshold 0.5 --json data/bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lsn_parser  # noqa: E402
+from fetch_lsn_data import LSNApiClient  # noqa: E402
+from fetch_mcp_data import extract_numbers_from_text, extract_structured_data, structured_content  # noqa: E402
+from generate_mermaid import (  # noqa: E402
+    generate_ausgaben_sankey,
+    generate_combined_sankey,
+    generate_einnahmen_sankey,
+)
+from generate_szenarien import DEFAULT_ANNAHMEN, Planbasis, plan_years, simulate, summarize  # noqa: E402
+from generate_vergleich import build_cube, compute_ranking, peer_groups  # noqa: E402
+from haushalt_matrix import load_haushalt_matrix  # noqa: E402
+from raw_store import raw_data_records  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+
+DEFAULT_SCALES = "10,1000,100000"
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 1.0
+SANKEY_YEAR = 2026
+YAML_YEARS = range(2024, 2030)
+# Suchen je Lauf für extract_structured_data (je 10 Treffer aus der Aufzeichnung)
+MCP_SEARCHES = 500
+SZENARIO_PFADE = 100_000
+# Größe des synthetischen Gemeindevergleichs (Gemeinden, Jahre, Merkmale)
+VERGLEICH_GROESSE = (940, 42, 8)
+# Kurze Fälle laufen, bis insgesamt so lange gemessen wurde (höchstens MAX_REPEAT Läufe)
+MIN_MEASURE_SECONDS = 3.0
+MAX_REPEAT = 200
+# Wiederholungen einer Gruppe in neuen Prozessen, bevor eine Regression gemeldet wird
+DEFAULT_CONFIRM = 2
+
+
+class Case(NamedTuple):
+    """Ein Benchmark-Fall: func wird ohne Argumente aufgerufen."""
+    name: str
+    func: Callable[[], object]
+    repeat: int | None = None  # None = --repeat
+
+
+def synthetic_yaml_text(items: int, seed: int = 42) -> str:
+    """
+    Haushalts-YAML mit items Positionen (je zur Hälfte Erträge und Aufwendungen).
+
+    Als Text erzeugt, da yaml.safe_dump für 100 000 Positionen zu langsam ist.
+    """
+    rng = random.Random(seed)
+    lines = ["metadata:", "  gemeinde: Nordstemmen"]
+    for section in ("ertraege", "aufwendungen"):
+        lines.append(f"{section}:")
+        for i in range(max(1, items // 2)):
+            lines += [f"  {section}_{i}:", f"    name: Position {i}", "    einheit: EUR", "    werte:"]
+            lines += [f"      {year}: {rng.randint(0, 20_000_000)}" for year in YAML_YEARS]
+    return "\n".join(lines) + "\n"
+
+
+def lsn_cases() -> list[Case]:
+    client = LSNApiClient()
+    cases = []
+    for path in sorted((FIXTURE_DIR / "lsn").glob("*.html")):
+        html = path.read_text(encoding="latin-1")
+        cases.append(Case(f"lsn.parse_html_table[{path.stem}]", lambda html=html: client.parse_html_table(html)))
+    for path in sorted((FIXTURE_DIR / "lsn").glob("*.zip")):
+        data = path.read_bytes()
+        cases.append(Case(f"lsn.parse_zip_export[{path.stem}]", lambda data=data: lsn_parser.parse_zip_export(data)))
+    return cases
+
+
+def mcp_cases() -> list[Case]:
+    with open(FIXTURE_DIR / "mcp" / "search_documents.json", "r", encoding="utf-8") as f:
+        results = structured_content(json.load(f)).get("results", [])
+    with open(FIXTURE_DIR / "mcp" / "get_paper_by_reference.json", "r", encoding="utf-8") as f:
+        paper = structured_content(json.load(f))
+
+    # Rohdaten eines großen Abrufs: die Treffer mit eindeutigen file_hash je Suche
+    data = {
+        "metadata": {"fetched_at": "2025-01-01T00:00:00", "source": "fixture"},
+        "searches": [
+            {
+                "query": f"Suche {i}",
+                "date_from": None,
+                "results": [{**result, "file_hash": f"{result['file_hash']}-{i}"} for result in results],
+            }
+            for i in range(MCP_SEARCHES)
+        ],
+        "papers": [paper],
+    }
+    records = list(raw_data_records(data))
+    excerpts = "\n".join(result["excerpt"] for result in results)
+
+    return [
+        Case("mcp.extract_numbers_from_text[paper]", lambda: extract_numbers_from_text(paper["text"])),
+        Case("mcp.extract_numbers_from_text[excerpts]", lambda: extract_numbers_from_text(excerpts)),
+        Case(f"mcp.extract_structured_data[{len(records)}]", lambda: extract_structured_data(iter(records))),
+    ]
+
+
+def sankey_cases(scales: list[int], workdir: Path) -> list[Case]:
+    cases = []
+    for items in scales:
+        path = workdir / f"haushalt_{items}.yaml"
+        path.write_text(synthetic_yaml_text(items), encoding="utf-8")
+        cache_dir = workdir / f"cache_{items}"
+        matrix = load_haushalt_matrix(path, cache_dir)
+        # Das Parsen großer YAMLs dauert Sekunden; einmal messen reicht
+        yaml_repeat = 1 if items >= 100_000 else None
+        cases += [
+            Case(f"yaml.load_haushalt_matrix[{items}]",
+                 lambda path=path: load_haushalt_matrix(path, cache_dir=None), yaml_repeat),
+            Case(f"yaml.load_haushalt_matrix_cache[{items}]",
+                 lambda path=path, cache_dir=cache_dir: load_haushalt_matrix(path, cache_dir)),
+            Case(f"sankey.generate_einnahmen_sankey[{items}]",
+                 lambda matrix=matrix: generate_einnahmen_sankey(matrix, SANKEY_YEAR)),
+            Case(f"sankey.generate_ausgaben_sankey[{items}]",
+                 lambda matrix=matrix: generate_ausgaben_sankey(matrix, SANKEY_YEAR)),
+            Case(f"sankey.generate_combined_sankey[{items}]",
+                 lambda matrix=matrix: generate_combined_sankey(matrix, SANKEY_YEAR)),
+        ]
+    return cases
+
+
+def szenario_cases() -> list[Case]:
+    matrix = load_haushalt_matrix(cache_dir=None)
+    basis = Planbasis(matrix, plan_years(matrix))
+
+    def run():
+        result = simulate(basis, DEFAULT_ANNAHMEN, SZENARIO_PFADE, seed=42)
+        return summarize(basis, result, DEFAULT_ANNAHMEN, SZENARIO_PFADE, seed=42)
+
+    return [Case(f"szenarien.simulate[{SZENARIO_PFADE}]", run)]
+
+
+def vergleich_frames(seed: int = 42) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Synthetische Langformat-Tabellen wie aus generate_vergleich.load_frames."""
+    regionen, jahre, merkmale = VERGLEICH_GROESSE
+    rng = np.random.default_rng(seed)
+    region_ids = np.array([f"254{i:06d}" for i in range(regionen)])
+    years = np.arange(2024 - jahre + 1, 2025)
+    namen = [f"Hebesatz {i}" if i % 4 == 0 else f"Steuer {i}" for i in range(merkmale)]
+    n = regionen * jahre * merkmale
+    werte = pd.DataFrame({
+        "tabelle": "Z9200001",
+        "region_id": np.repeat(region_ids, jahre * merkmale),
+        "jahr": np.tile(np.repeat(years, merkmale), regionen),
+        "merkmal": np.tile(namen, regionen * jahre),
+        "wert": rng.lognormal(13, 1, n),
+    })
+    einwohner = pd.DataFrame({
+        "region_id": np.repeat(region_ids, jahre),
+        "jahr": np.tile(years, regionen),
+        "wert": rng.integers(500, 60_000, regionen * jahre).astype(float),
+    })
+    return werte, einwohner
+
+
+def vergleich_cases() -> list[Case]:
+    werte, einwohner = vergleich_frames()
+    cube = build_cube(werte, einwohner)
+    ranking = compute_ranking(cube)
+    label = "x".join(str(size) for size in VERGLEICH_GROESSE)
+    return [
+        Case(f"vergleich.build_cube[{label}]", lambda: build_cube(werte, einwohner)),
+        Case(f"vergleich.compute_ranking[{label}]", lambda: compute_ranking(cube)),
+        Case(f"vergleich.peer_groups[{label}]", lambda: peer_groups(cube, ranking["z"])),
+    ]
+
+
+def case_groups(scales: list[int]) -> dict[str, Callable[[Path], list[Case]]]:
+    """Gruppen von Fällen, die je in einem eigenen Prozess gemessen werden (Argument: Arbeitsverzeichnis)."""
+    groups = {"lsn": lambda workdir: lsn_cases(), "mcp": lambda workdir: mcp_cases()}
+    for items in scales:
+        groups[f"sankey[{items}]"] = lambda workdir, items=items: sankey_cases([items], workdir)
+    groups["szenarien"] = lambda workdir: szenario_cases()
+    groups["vergleich"] = lambda workdir: vergleich_cases()
+    return groups
+
+
+def best_of(func: Callable[[], object], repeat: int, min_seconds: float = 0.0) -> float:
+    """Bester Lauf aus mindestens repeat Läufen, bei kurzen Fällen so vielen, dass min_seconds erreicht sind."""
+    timings = []
+    while len(timings) < repeat or (sum(timings) < min_seconds and len(timings) < MAX_REPEAT):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_group(factory: Callable[[Path], list[Case]], repeat: int, name_filter: str | None = None) -> dict[str, float]:
+    """Misst alle Fälle einer Gruppe im aktuellen Prozess."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = factory(Path(tmp))
+        if name_filter:
+            cases = [case for case in cases if name_filter in case.name]
+        for case in cases:
+            if case.repeat is not None:
+                results[case.name] = best_of(case.func, case.repeat)
+                continue
+            case.func()  # Aufwärmen (Imports, Caches)
+            results[case.name] = best_of(case.func, repeat, MIN_MEASURE_SECONDS)
+    return results
+
+
+def run_group_process(group: str, args) -> dict[str, float]:
+    """Misst eine Gruppe in einem frischen Python-Prozess (run_benchmarks.py --group)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "ergebnis.json"
+        command = [sys.executable, str(Path(__file__).resolve()), "--group", group,
+                   "--scales", args.scales, "--repeat", str(args.repeat), "--json", str(output)]
+        if args.filter:
+            command += ["--filter", args.filter]
+        subprocess.run(command, check=True)
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def load_baselines(path: Path = BASELINE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(results: dict[str, float], path: Path = BASELINE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "erstellt": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "maschine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+            "sekunden": {name: round(seconds, 6) for name, seconds in results.items()},
+        }, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def is_regression(seconds: float, baseline: float | None, threshold: float, min_delta_ms: float) -> bool:
+    if baseline is None:
+        return False
+    ratio = seconds / baseline if baseline > 0 else float("inf")
+    return ratio > 1 + threshold and (seconds - baseline) * 1000 > min_delta_ms
+
+
+def compare(results: dict[str, float], baselines: dict[str, float],
+            threshold: float, min_delta_ms: float) -> list[str]:
+    """Gibt die Tabelle aus; Rückgabe sind die Fälle mit Regression."""
+    regressions = []
+    print(f"{'Fall':<52} {'Zeit':>11} {'Baseline':>11} {'Faktor':>7}")
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<52} {seconds * 1000:>9.2f}ms {'-':>11} {'neu':>7}")
+            continue
+        ratio = seconds / baseline if baseline > 0 else float("inf")
+        regressed = is_regression(seconds, baseline, threshold, min_delta_ms)
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{name:<52} {seconds * 1000:>9.2f}ms {baseline * 1000:>9.2f}ms {ratio:>6.2f}x{marker}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark-Suite mit Baselines und Regressionsschwelle")
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help=f"Positionen der synthetischen YAMLs (Standard: {DEFAULT_SCALES})")
+    parser.add_argument("--filter", help="Nur Fälle, deren Name diesen Text enthält")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help=f"Mindestanzahl Wiederholungen (bester Lauf zählt; kurze Fälle bis {MIN_MEASURE_SECONDS:.0f}s)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Erlaubte Verlangsamung gegenüber der Baseline (Standard: {DEFAULT_THRESHOLD} = 25 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Kleinere absolute Abweichungen gelten nicht als Regression")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline-Datei")
+    parser.add_argument("--save-baseline", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--json", type=Path, help="Ergebnisse zusätzlich als JSON speichern")
+    parser.add_argument("--confirm", type=int, default=DEFAULT_CONFIRM,
+                        help=f"Gruppen mit Regression so oft neu messen (Standard: {DEFAULT_CONFIRM})")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Alle Gruppen im selben Prozess messen (schneller, aber weniger stabil)")
+    parser.add_argument("--group", help=argparse.SUPPRESS)  # intern: eine Gruppe messen, nur --json schreiben
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    groups = case_groups(scales)
+    if args.group:
+        results = run_group(groups[args.group], args.repeat, args.filter)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+        return
+
+    def measure(group: str) -> dict[str, float]:
+        started = time.perf_counter()
+        if args.in_process:
+            measured = run_group(groups[group], args.repeat, args.filter)
+        else:
+            measured = run_group_process(group, args)
+        if measured:
+            print(f"  {group}: {len(measured)} Fälle ({time.perf_counter() - started:.1f}s)")
+        return measured
+
+    by_group = {group: measure(group) for group in groups}
+    results = {name: seconds for measured in by_group.values() for name, seconds in measured.items()}
+
+    baselines = {} if args.save_baseline else load_baselines(args.baseline)
+    stored = baselines.get("sekunden", {})
+    for _ in range(args.confirm):
+        suspects = [
+            group for group, measured in by_group.items()
+            if any(is_regression(results[name], stored.get(name), args.threshold, args.min_delta_ms)
+                   for name in measured)
+        ]
+        if not suspects:
+            break
+        print(f"  Erneut gemessen (mögliche Regression): {', '.join(suspects)}")
+        for group in suspects:
+            for name, seconds in measure(group).items():
+                results[name] = min(results[name], seconds)
+    print()
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({name: round(seconds, 6) for name, seconds in results.items()}, f, indent=2)
+
+    if args.save_baseline:
+        stored = load_baselines(args.baseline).get("sekunden", {})
+        save_baselines({**stored, **results}, args.baseline)
+        compare(results, {}, args.threshold, args.min_delta_ms)
+        print(f"\nBaseline gespeichert: {args.baseline}")
+        return
+
+    if baselines:
+        print(f"Baseline vom {baselines['erstellt']} ({baselines['maschine']}, Python {baselines['python']})")
+    regressions = compare(results, stored, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} Regression(en) über {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n{len(results)} Fälle, keine Regression")
+
+
+if __name__ == "__main__":
+    main()
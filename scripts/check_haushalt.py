@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Konsistenzprüfung der Haushaltsdaten (Pre-Build-Gate).
+
+Lädt alle Jahresdateien aus src/content/haushalte/ und die YAML-Datei in je
+eine Haushaltsmatrix und prüft vektorisiert über alle Jahre:
+
+    - Schema jeder Jahresdatei (wie src/content/config.ts)
+    - Summenidentitäten: Summe der Erträge = gesamtertraege,
+      Summe der Aufwendungen = gesamtaufwendungen,
+      gesamtertraege - gesamtaufwendungen = jahresergebnis
+    - Übereinstimmung YAML (ertraege, aufwendungen, zusammenfassung) und JSON
+    - typ-Verlauf: lückenlose Jahre, Ist-Jahre vor Plan-Jahren, Übergang
+      passend zu YAML-Angaben wie "typ: ist_2024_plan_ab_2025"
+
+Jeder Verstoß wird mit Prüfung, Feld, Jahr, erwartetem und tatsächlichem
+Wert ausgegeben. Der Exit-Code ist 1, sobald eine Abweichung die Toleranz
+überschreitet. Abweichungen, die aus den Quellen so übernommen sind (z.B.
+fehlende Ertragsarten in den LSN-Zeitreihen vor 2024), stehen mit Grund und
+Differenz je Jahr im Abschnitt bekannte_abweichungen der YAML-Datei und
+brechen das Gate nicht, solange die Differenz unverändert bleibt.
+Mit --years werden nur diese Jahre geladen und geprüft.
+
+Verwendung:
+    python check_haushalt.py
+    python check_haushalt.py --years 2024-2029
+    python check_haushalt.py --toleranz 1 --toleranz-prozent 0.1
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from generate_mermaid import parse_years
+from haushalt_matrix import CONTENT_DIR, YAML_PATH, HaushaltMatrix, load_haushalt_matrix, load_records
+from haushalt_schema import GROUPS, validate_haushalt
+
+# Abschnitt der YAML-Datei -> Gruppe der Jahresdateien
+YAML_SECTIONS = {"ertraege": "ertraege", "aufwendungen": "aufwendungen", "zusammenfassung": "summen"}
+
+# Summenidentitäten: Summenfeld = Summe der Felder (Vorzeichen je Feld)
+IDENTITIES = {
+    "gesamtertraege": [("ertraege", key, 1) for key in GROUPS["ertraege"]],
+    "gesamtaufwendungen": [("aufwendungen", key, 1) for key in GROUPS["aufwendungen"]],
+    "jahresergebnis": [("summen", "gesamtertraege", 1), ("summen", "gesamtaufwendungen", -1)],
+}
+
+TYP_RE = re.compile(r"ist_(\d{4})_plan_ab_(\d{4})")
+
+
+class KnownDeviation(NamedTuple):
+    """Dokumentierte Abweichung aus bekannte_abweichungen der YAML-Datei."""
+    pruefung: str
+    feld: str
+    jahre: frozenset[int]
+    differenz: float | dict[int, float] | None
+    grund: str
+
+
+class Finding(NamedTuple):
+    """Ein Verstoß gegen eine Prüfung."""
+    pruefung: str
+    feld: str
+    jahr: int | None
+    erwartet: float | str | None
+    wert: float | str | None
+
+    def format(self) -> str:
+        jahr = self.jahr if self.jahr is not None else "-"
+        if isinstance(self.erwartet, (int, float)) and isinstance(self.wert, (int, float)):
+            diff = self.wert - self.erwartet
+            return (f"  {self.pruefung:<10} {jahr:<5} {self.feld:<42} "
+                    f"erwartet {self.erwartet:>14,.0f}  ist {self.wert:>14,.0f}  ({diff:+,.0f})")
+        return f"  {self.pruefung:<10} {jahr:<5} {self.feld:<42} erwartet {self.erwartet}, ist {self.wert}"
+
+
+def _row_index(matrix: HaushaltMatrix) -> dict[tuple[str, str], int]:
+    return {(section, key): i for i, (section, key) in enumerate(zip(matrix.sections, matrix.keys))}
+
+
+def _exceeds(diff: np.ndarray, reference: np.ndarray, tolerance: float, tolerance_pct: float) -> np.ndarray:
+    """Abweichungen über max(toleranz, toleranz_prozent * |Bezugswert|); NaN zählt nicht."""
+    limit = np.maximum(tolerance, np.abs(reference) * tolerance_pct / 100)
+    with np.errstate(invalid="ignore"):
+        return np.abs(diff) > limit
+
+
+def check_schema(records: list[dict]) -> list[Finding]:
+    return [
+        Finding("schema", error, record.get("jahr"), None, None)
+        for record in records for error in validate_haushalt(record)
+    ]
+
+
+def check_identities(matrix: HaushaltMatrix, tolerance: float, tolerance_pct: float) -> list[Finding]:
+    """Summenidentitäten für alle Jahre als eine Matrixmultiplikation."""
+    rows = _row_index(matrix)
+    targets = list(IDENTITIES)
+    coefficients = np.zeros((len(targets), len(matrix.keys)))
+    for t, target in enumerate(targets):
+        for section, key, sign in IDENTITIES[target]:
+            coefficients[t, rows[(section, key)]] = sign
+
+    target_rows = [rows[("summen", target)] for target in targets]
+    expected = coefficients @ np.nan_to_num(matrix.values)
+    # Identitäten mit fehlenden Summanden nicht bewerten (das meldet die Schemaprüfung)
+    incomplete = (np.abs(coefficients) @ np.isnan(matrix.values)) > 0
+    expected[incomplete] = np.nan
+    actual = matrix.values[target_rows]
+
+    bad = _exceeds(actual - expected, actual, tolerance, tolerance_pct)
+    return [
+        Finding("summe", f"summen.{targets[t]}", int(matrix.years[j]), float(expected[t, j]), float(actual[t, j]))
+        for t, j in zip(*np.nonzero(bad))
+    ]
+
+
+def check_yaml_agreement(content: HaushaltMatrix, source: HaushaltMatrix,
+                         tolerance: float, tolerance_pct: float) -> list[Finding]:
+    """Vergleicht alle Zellen, die in YAML und JSON vorhanden sind."""
+    rows = _row_index(content)
+    pairs = [
+        (i, rows[(YAML_SECTIONS[section], key)])
+        for i, (section, key) in enumerate(zip(source.sections, source.keys))
+        if (YAML_SECTIONS.get(section), key) in rows
+    ]
+    if not pairs:
+        return []
+    yaml_rows, json_rows = (np.array(idx) for idx in zip(*pairs))
+    years, yaml_cols, json_cols = np.intersect1d(source.years, content.years, return_indices=True)
+    yaml_values = source.values[np.ix_(yaml_rows, yaml_cols)]
+    json_values = content.values[np.ix_(json_rows, json_cols)]
+
+    bad = _exceeds(json_values - yaml_values, yaml_values, tolerance, tolerance_pct)
+    return [
+        Finding("yaml", f"{content.sections[json_rows[r]]}.{content.keys[json_rows[r]]}", int(years[c]),
+                float(yaml_values[r, c]), float(json_values[r, c]))
+        for r, c in zip(*np.nonzero(bad))
+    ]
+
+
+def check_typ(content: HaushaltMatrix, source: HaushaltMatrix) -> list[Finding]:
+    """Lückenlose Jahre, Ist vor Plan und Übergang wie in der YAML-Datei angegeben."""
+    findings = []
+    years = content.years
+    typ = np.array([content.metadata["typ"].get(int(year)) for year in years])
+
+    for j in np.flatnonzero(np.diff(years) != 1):
+        findings.append(Finding("typ", "jahr (Lücke)", int(years[j + 1]), str(years[j] + 1), str(years[j + 1])))
+
+    ist = typ == "ist"
+    last_ist = np.flatnonzero(ist)[-1] if ist.any() else -1
+    for j in np.flatnonzero(~ist[:last_ist + 1]):
+        findings.append(Finding("typ", "typ (Plan vor letztem Ist-Jahr)", int(years[j]), "ist", typ[j]))
+
+    transitions = {
+        match.groups() for row in source.rows
+        if (match := TYP_RE.fullmatch(str(row.get("typ", ""))))
+    }
+    by_year = dict(zip(years.tolist(), typ.tolist()))
+    for last_ist_year, first_plan_year in sorted(transitions):
+        for year, expected in ((int(last_ist_year), "ist"), (int(first_plan_year), "plan")):
+            if year in by_year and by_year[year] != expected:
+                findings.append(Finding("typ", "typ (YAML-Angabe)", year, expected, by_year[year]))
+    return findings
+
+
+def load_known_deviations(source: HaushaltMatrix) -> list[KnownDeviation]:
+    """
+    Liest bekannte_abweichungen.
+
+    jahre als "2010-2023" oder einzelnes Jahr; differenz als Zahl für alle
+    diese Jahre oder als Zuordnung Jahr -> Differenz (dann ohne jahre).
+    """
+    known = []
+    for entry in source.metadata.get("bekannte_abweichungen") or []:
+        differenz = entry.get("differenz")
+        if isinstance(differenz, dict):
+            differenz = {int(year): value for year, value in differenz.items()}
+            years = frozenset(differenz)
+        else:
+            years = frozenset(parse_years(str(entry["jahre"])))
+        known.append(KnownDeviation(entry["pruefung"], entry["feld"], years, differenz, entry.get("grund", "")))
+    return known
+
+
+def is_known(finding: Finding, known: list[KnownDeviation], tolerance: float = 1.0) -> bool:
+    """
+    True, wenn der Befund dokumentiert ist.
+
+    Mit differenz muss die Abweichung (ist - erwartet) bis auf die Toleranz
+    übereinstimmen, damit geänderte Daten wieder auffallen.
+    """
+    for entry in known:
+        if (entry.pruefung, entry.feld) != (finding.pruefung, finding.feld) or finding.jahr not in entry.jahre:
+            continue
+        if entry.differenz is None:
+            return True
+        differenz = entry.differenz[finding.jahr] if isinstance(entry.differenz, dict) else entry.differenz
+        if isinstance(finding.erwartet, (int, float)) and isinstance(finding.wert, (int, float)):
+            return abs(finding.wert - finding.erwartet - differenz) <= tolerance
+    return False
+
+
+def run_checks(records: list[dict], source: HaushaltMatrix, years: list[int] | None = None,
+               tolerance: float = 1.0, tolerance_pct: float = 0.0) -> list[Finding]:
+    """Alle Prüfungen; years begrenzt Jahresdateien und YAML-Spalten vorab auf diese Jahre."""
+    if years:
+        records = [record for record in records if record.get("jahr") in set(years)]
+        source = source.select_years(years)
+    content = HaushaltMatrix.from_records(records)
+    findings = check_schema(records)
+    findings += check_identities(content, tolerance, tolerance_pct)
+    findings += check_yaml_agreement(content, source, tolerance, tolerance_pct)
+    findings += check_typ(content, source)
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konsistenz der Haushaltsdaten prüfen")
+    parser.add_argument("--content-dir", type=Path, default=CONTENT_DIR, help="Jahresdateien (JSON)")
+    parser.add_argument("--yaml", type=Path, default=YAML_PATH, help="YAML-Haushaltsdaten")
+    parser.add_argument("--years", help="Nur diese Jahre prüfen, z.B. 2024-2029")
+    parser.add_argument("--toleranz", type=float, default=1.0, help="Erlaubte Abweichung in EUR (Rundung)")
+    parser.add_argument("--toleranz-prozent", type=float, default=0.0,
+                        help="Erlaubte Abweichung in Prozent des Bezugswerts")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    records = load_records(args.content_dir)
+    source = load_haushalt_matrix(args.yaml)
+    years = parse_years(args.years) if args.years else None
+    findings = run_checks(records, source, years, args.toleranz, args.toleranz_prozent)
+    known = load_known_deviations(source)
+    documented = [f for f in findings if is_known(f, known, args.toleranz)]
+    findings = [f for f in findings if f not in documented]
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for finding in sorted(findings, key=lambda f: (f.pruefung, f.jahr or 0, f.feld)):
+        print(finding.format())
+    checked = sum(1 for record in records if not years or record.get("jahr") in years)
+    print(f"{checked} Jahresdateien geprüft, {len(findings)} Abweichung(en), "
+          f"{len(documented)} bekannt ({elapsed:.0f} ms)")
+    sys.exit(1 if findings else 0)
+
+
+if __name__ == "__main__":
+    main()
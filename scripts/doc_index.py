@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Lokaler Volltextindex über die abgerufenen Ratsdokumente (SQLite FTS5).
+
+Baut aus dem Rohdatenspeicher (raw_store.py) einen invertierten Index über
+Titel, Referenz, Auszug und Text der Drucksachen, optional auch über den
+Text bereits heruntergeladener PDFs (data/pdf/). Wörter werden vor dem
+Indexieren mit einem deutschen Stemmer (Snowball) auf ihren Stamm
+reduziert, sodass "Haushaltspläne" auch "Haushaltsplan" findet.
+
+Der Index wird inkrementell aufgebaut, eine Zeile je Anlage (file_hash)
+wie bei den Suchtreffern des MCP-Servers: bekannte Anlagen werden
+übersprungen, eine Drucksache (über oparl_id bzw. Referenz zugeordnet)
+ergänzt alle Anlagen ihrer Vorlage um den Volltext. search_documents()
+liefert Treffer in derselben Form wie das MCP-Tool search_documents
+(siehe fetch_mcp_data.search_haushalt_documents) - offline und ohne
+Last auf dem öffentlichen MCP-Proxy.
+
+Verwendung:
+    python doc_index.py --build
+    python doc_index.py --build --pdf          # inkl. Text lokaler PDFs
+    python doc_index.py "Haushaltssicherungskonzept"
+    python doc_index.py "Kreisumlage" --date-from 2023-01-01 --limit 5 --json
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Iterable
+
+from raw_store import DATA_DIR, RAW_STORE_PATH, RawStore
+
+INDEX_PATH = DATA_DIR / "mcp_index.sqlite"
+
+# PRAGMA user_version; ein Index mit anderer Version wird neu aufgebaut
+INDEX_VERSION = 2
+
+# Felder einer Drucksache, die Volltext enthalten können
+TEXT_FIELDS = ("text", "content", "full_text", "markdown", "body", "excerpt")
+
+# Felder eines Suchtreffers (Spalten der Tabelle dokumente)
+DOCUMENT_FIELDS = ("file_hash", "oparl_id", "title", "reference", "date", "pdf_url", "excerpt")
+
+WORD_RE = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dokumente (
+    id INTEGER PRIMARY KEY,
+    schluessel TEXT UNIQUE NOT NULL,
+    art TEXT NOT NULL,
+    file_hash TEXT,
+    oparl_id TEXT,
+    title TEXT,
+    reference TEXT,
+    date TEXT,
+    pdf_url TEXT,
+    excerpt TEXT
+);
+CREATE INDEX IF NOT EXISTS dokumente_date ON dokumente(date);
+CREATE INDEX IF NOT EXISTS dokumente_oparl_id ON dokumente(oparl_id);
+CREATE INDEX IF NOT EXISTS dokumente_reference ON dokumente(reference);
+CREATE TABLE IF NOT EXISTS drucksachen (
+    id INTEGER PRIMARY KEY,
+    oparl_id TEXT,
+    reference TEXT,
+    text TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS volltext USING fts5(titel, referenz, text, tokenize='unicode61');
+"""
+
+
+# --- Deutscher Stemmer (Snowball-Algorithmus) ---
+
+VOWELS = "aeiouyäöü"
+S_ENDING = "bdfghklmnrt"
+ST_ENDING = "bdfghklmnt"
+
+
+def _region(word: str, start: int) -> int:
+    """Beginn von R1/R2: nach der ersten Nicht-Vokal-auf-Vokal-Folge ab start."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _longest(word: str, suffixes: tuple[str, ...]) -> str | None:
+    for suffix in suffixes:
+        if word.endswith(suffix):
+            return suffix
+    return None
+
+
+def stem(word: str) -> str:
+    """Snowball-Stemmer für Deutsch (ein kleingeschriebenes Wort)."""
+    word = word.replace("ß", "ss")
+    # u und y zwischen Vokalen gelten als Konsonanten (Großbuchstaben als Markierung)
+    chars = list(word)
+    for i in range(1, len(chars) - 1):
+        if chars[i] in "uy" and chars[i - 1] in VOWELS and chars[i + 1] in VOWELS:
+            chars[i] = chars[i].upper()
+    word = "".join(chars)
+
+    r1 = _region(word, 0)
+    r2 = _region(word, r1)
+    r1 = max(r1, 3)
+
+    # Schritt 1
+    suffix = _longest(word, ("ern", "em", "er", "en", "es", "e", "s"))
+    if suffix and len(word) - len(suffix) >= r1:
+        if suffix == "s":
+            if len(word) >= 2 and word[-2] in S_ENDING:
+                word = word[:-1]
+        else:
+            word = word[:-len(suffix)]
+            if suffix in ("en", "es", "e") and word.endswith("niss"):
+                word = word[:-1]
+
+    # Schritt 2
+    suffix = _longest(word, ("est", "en", "er", "st"))
+    if suffix and len(word) - len(suffix) >= r1:
+        if suffix != "st":
+            word = word[:-len(suffix)]
+        elif len(word) >= 6 and word[-3] in ST_ENDING:
+            word = word[:-2]
+
+    # Schritt 3
+    suffix = _longest(word, ("heit", "keit", "lich", "isch", "end", "ung", "ig", "ik"))
+    if suffix and len(word) - len(suffix) >= r2:
+        base = word[:-len(suffix)]
+        if suffix in ("end", "ung"):
+            word = base
+            if word.endswith("ig") and len(word) - 2 >= r2 and not word.endswith("eig"):
+                word = word[:-2]
+        elif suffix in ("ig", "ik", "isch"):
+            if not base.endswith("e"):
+                word = base
+        elif suffix in ("lich", "heit"):
+            word = base
+            if (word.endswith("er") or word.endswith("en")) and len(word) - 2 >= r1:
+                word = word[:-2]
+        elif suffix == "keit":
+            word = base
+            for inner in ("lich", "ig"):
+                if word.endswith(inner) and len(word) - len(inner) >= r2:
+                    word = word[:-len(inner)]
+                    break
+
+    return word.lower().translate(str.maketrans("äöü", "aou"))
+
+
+def stem_text(text: str) -> str:
+    """Text als Folge von Wortstämmen (für Index und Suchanfrage)."""
+    return " ".join(stem(word) for word in WORD_RE.findall(text.lower()))
+
+
+# --- Index ---
+
+def document_text(record: dict, pdf_text: bool = False) -> str:
+    """Volltext eines Datensatzes: Auszug/Textfelder, optional Text des lokalen PDFs."""
+    daten = record["daten"]
+    parts = [daten[field] for field in TEXT_FIELDS if isinstance(daten.get(field), str)]
+    if pdf_text and daten.get("pdf_url"):
+        parts.append(_pdf_text(daten["pdf_url"]))
+    return "\n".join(part for part in parts if part)
+
+
+def _pdf_text(url: str) -> str:
+    """Text eines bereits heruntergeladenen PDFs (leer, wenn nicht vorhanden)."""
+    from extract_haushalt_pdf import PdfReader, pdf_path
+
+    path = pdf_path(url)
+    if PdfReader is None or not path.exists():
+        return ""
+    return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+
+
+def connect(path: Path = INDEX_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    if connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        connection.executescript(
+            "DROP TABLE IF EXISTS dokumente; DROP TABLE IF EXISTS drucksachen; DROP TABLE IF EXISTS volltext;"
+        )
+        connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+# Kennungen einer Vorlage; Drucksachen von get_paper_by_reference haben keinen
+# file_hash, aber oparl_id und Referenz wie die Suchtreffer ihrer Anlagen.
+PAPER_FIELDS = ("oparl_id", "reference")
+
+
+def _key(daten: dict) -> str:
+    """Schlüssel einer Zeile: file_hash der Anlage, ohne Anlage die Vorlage."""
+    return next((daten[field] for field in ("file_hash", *PAPER_FIELDS) if daten.get(field)), "")
+
+
+def _paper_rows(connection: sqlite3.Connection, daten: dict) -> list[sqlite3.Row]:
+    """Zeilen in dokumente, die zur Vorlage (oparl_id bzw. Referenz) gehören."""
+    for field in PAPER_FIELDS:
+        if daten.get(field):
+            rows = connection.execute(f"SELECT * FROM dokumente WHERE {field} = ?", (daten[field],)).fetchall()
+            if rows:
+                return rows
+    return []
+
+
+def _paper_text(connection: sqlite3.Connection, daten: dict) -> str | None:
+    """Indexierter Volltext der Drucksache zur Vorlage (None, wenn noch nicht abgerufen)."""
+    for field in PAPER_FIELDS:
+        if daten.get(field):
+            row = connection.execute(f"SELECT text FROM drucksachen WHERE {field} = ?", (daten[field],)).fetchone()
+            if row is not None:
+                return row["text"]
+    return None
+
+
+def _index_text(connection: sqlite3.Connection, rowid: int, daten: dict, pdf_text: bool,
+                paper_text: str | None, replace: bool):
+    """Volltext einer Zeile: eigener Text der Anlage und, falls vorhanden, der Drucksache."""
+    if replace:
+        connection.execute("DELETE FROM volltext WHERE rowid = ?", (rowid,))
+    text = stem_text(document_text({"daten": daten}, pdf_text))
+    connection.execute(
+        "INSERT INTO volltext (rowid, titel, referenz, text) VALUES (?, ?, ?, ?)",
+        (rowid, stem_text(daten.get("title") or ""), stem_text(daten.get("reference") or ""),
+         f"{text} {paper_text}" if paper_text else text),
+    )
+
+
+def _update_row(connection: sqlite3.Connection, row: sqlite3.Row, daten: dict, art: str,
+                pdf_text: bool, paper_text: str | None):
+    """Ergänzt eine Zeile; vorhandene Angaben (z.B. file_hash, pdf_url, Auszug) bleiben erhalten."""
+    merged = {field: row[field] or daten.get(field) or "" for field in DOCUMENT_FIELDS}
+    for field in ("title", "date", *PAPER_FIELDS):
+        merged[field] = daten.get(field) or merged[field]
+    connection.execute(
+        f"UPDATE dokumente SET schluessel = ?, art = ?, {', '.join(f'{field} = ?' for field in DOCUMENT_FIELDS)}"
+        " WHERE id = ?",
+        (_key(merged), art, *(merged[field] for field in DOCUMENT_FIELDS), row["id"]),
+    )
+    _index_text(connection, row["id"], merged, pdf_text, paper_text, replace=True)
+
+
+def update_index(
+    connection: sqlite3.Connection,
+    records: Iterable[dict],
+    pdf_text: bool = False
+) -> tuple[int, int]:
+    """
+    Nimmt alle noch unbekannten Anlagen und Drucksachen aus dem Datensatzstrom auf.
+
+    Jeder Suchtreffer ist eine Anlage und bekommt eine eigene Zeile
+    (Schlüssel file_hash). Der Volltext einer Drucksache wird allen
+    Anlagen ihrer Vorlage (gleiche oparl_id bzw. Referenz) zugeordnet,
+    auch später eintreffenden. Eine Drucksache ohne bekannte Anlage
+    bekommt eine eigene Zeile, die die erste Anlage übernimmt.
+
+    Returns:
+        (neu indexierte, aktualisierte) Zeilen
+    """
+    known = {row[0] for row in connection.execute("SELECT schluessel FROM dokumente")}
+    added = updated = 0
+    with connection:
+        for record in records:
+            if record["art"] not in ("treffer", "drucksache"):
+                continue
+            daten = record["daten"]
+            key = _key(daten)
+            if not key:
+                continue
+
+            if record["art"] == "drucksache":
+                if _paper_text(connection, daten) is not None:
+                    continue
+                paper_text = stem_text(document_text(record))
+                connection.execute(
+                    "INSERT INTO drucksachen (oparl_id, reference, text) VALUES (?, ?, ?)",
+                    (daten.get("oparl_id") or "", daten.get("reference") or "", paper_text),
+                )
+                rows = _paper_rows(connection, daten)
+                for row in rows:
+                    _update_row(connection, row, daten, "drucksache", pdf_text, paper_text)
+                updated += len(rows)
+                if rows:
+                    continue
+            elif key in known:
+                continue
+            else:
+                paper_text = _paper_text(connection, daten)
+                # Drucksache ohne Anlage: ihre Zeile wird zur ersten Anlage
+                placeholder = next((row for row in _paper_rows(connection, daten) if not row["file_hash"]), None)
+                if placeholder is not None:
+                    known.discard(placeholder["schluessel"])
+                    _update_row(connection, placeholder, daten, "drucksache" if paper_text is not None else "treffer",
+                                pdf_text, paper_text)
+                    known.add(key)
+                    updated += 1
+                    continue
+
+            art = "drucksache" if paper_text is not None else "treffer"
+            cursor = connection.execute(
+                "INSERT INTO dokumente (schluessel, art, file_hash, oparl_id, title, reference, date, pdf_url,"
+                " excerpt) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, art, *(daten.get(field) or "" for field in DOCUMENT_FIELDS)),
+            )
+            _index_text(connection, cursor.lastrowid, daten, pdf_text,
+                        None if record["art"] == "drucksache" else paper_text, replace=False)
+            known.add(key)
+            added += 1
+    return added, updated
+
+
+def _match_expression(query: str, operator: str) -> str:
+    terms = dict.fromkeys(stem_text(query).split())
+    return f" {operator} ".join(f'"{term}"' for term in terms)
+
+
+def search_documents(
+    connection: sqlite3.Connection,
+    query: str,
+    limit: int = 10,
+    date_from: str = None,
+    date_to: str = None
+) -> list[dict]:
+    """
+    Sucht im lokalen Index; Ergebnisform wie das MCP-Tool search_documents.
+
+    Alle Suchwörter müssen vorkommen; gibt es so keinen Treffer, reicht eines.
+    Sortiert nach BM25 (Titel und Referenz stärker gewichtet als der Text).
+    """
+    conditions, params = [], []
+    if date_from:
+        conditions.append("d.date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("d.date <= ?")
+        params.append(date_to)
+    where = "".join(f" AND {condition}" for condition in conditions)
+
+    for operator in ("AND", "OR"):
+        expression = _match_expression(query, operator)
+        if not expression:
+            return []
+        rows = connection.execute(
+            "SELECT d.*, bm25(volltext, 5.0, 5.0, 1.0) AS rang FROM volltext"
+            " JOIN dokumente d ON d.id = volltext.rowid"
+            f" WHERE volltext MATCH ?{where} ORDER BY rang LIMIT ?",
+            [expression, *params, limit],
+        ).fetchall()
+        if rows:
+            break
+
+    return [
+        {
+            "title": row["title"],
+            "reference": row["reference"],
+            "date": row["date"],
+            "pdf_url": row["pdf_url"],
+            "oparl_id": row["oparl_id"],
+            "file_hash": row["file_hash"],
+            "excerpt": row["excerpt"],
+            "score": round(-row["rang"], 4),
+        }
+        for row in rows
+    ]
+
+
+def search_local_documents(query: str, limit: int = 10, date_from: str = None) -> list:
+    """Wie fetch_mcp_data.search_haushalt_documents, aber gegen den lokalen Index."""
+    connection = connect()
+    try:
+        return search_documents(connection, query, limit, date_from)
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokale Volltextsuche über die Ratsdokumente")
+    parser.add_argument("query", nargs="?", help="Suchanfrage")
+    parser.add_argument("--build", action="store_true", help="Index aus dem Rohdatenspeicher aktualisieren")
+    parser.add_argument("--pdf", action="store_true", help="Beim Aufbau auch den Text lokaler PDFs indexieren")
+    parser.add_argument("--store", type=Path, default=RAW_STORE_PATH, help="Rohdatenspeicher (NDJSON)")
+    parser.add_argument("--index", type=Path, default=INDEX_PATH, help="SQLite-Index")
+    parser.add_argument("--limit", type=int, default=10, help="Maximale Trefferzahl")
+    parser.add_argument("--date-from", help="Nur Dokumente ab diesem Datum (YYYY-MM-DD)")
+    parser.add_argument("--date-to", help="Nur Dokumente bis zu diesem Datum (YYYY-MM-DD)")
+    parser.add_argument("--json", action="store_true", help="Treffer als JSON ausgeben")
+    args = parser.parse_args()
+
+    if not args.build and not args.query:
+        parser.error("Suchanfrage oder --build angeben")
+
+    connection = connect(args.index)
+    if args.build:
+        started = time.perf_counter()
+        try:
+            added, updated = update_index(connection, RawStore(args.store).iter_records(), args.pdf)
+        except ImportError as e:
+            # zstandard fehlt für einen .zst-Speicher
+            print(e)
+            sys.exit(1)
+        total = connection.execute("SELECT COUNT(*) FROM dokumente").fetchone()[0]
+        print(f"{added} Dokumente neu indexiert, {updated} aktualisiert, {total} insgesamt "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms): {args.index}")
+
+    if args.query:
+        started = time.perf_counter()
+        results = search_documents(connection, args.query, args.limit, args.date_from, args.date_to)
+        elapsed = (time.perf_counter() - started) * 1000
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            for result in results:
+                print(f"  {result['date'][:10]:<10}  {result['reference']:<14}  {result['title'][:70]}")
+            print(f"{len(results)} Treffer ({elapsed:.1f} ms)")
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Export der Jahresdateien src/content/haushalte/{jahr}.json aus der YAML-Datei.
+
+Die YAML-Datei (data/haushalt_nordstemmen.yaml) ist die einzige Quelle:
+ertraege und aufwendungen liefern die Positionen, zusammenfassung die
+summen, der Abschnitt jahre typ, quelle und quelle_url je Jahr.
+
+Der Export ist inkrementell: je Jahr wird der Hash des erzeugten Inhalts
+mit dem Manifest des letzten Laufs (data/cache/haushalte_export.json)
+verglichen, und nur Jahre mit geänderten Werten werden geschrieben -
+atomar über eine temporäre Datei. Eine geänderte Zahl in der YAML-Datei
+ändert damit genau eine Jahresdatei, und Astro muss nur diesen einen
+Eintrag der Content-Collection neu laden.
+
+Verwendung:
+    python export_haushalte.py
+    python export_haushalte.py --years 2024-2029
+    python export_haushalte.py --check       # nur prüfen, Exit-Code 1 bei Abweichung
+    python export_haushalte.py --force       # Manifest ignorieren
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from check_haushalt import YAML_SECTIONS
+from generate_mermaid import parse_years, write_if_changed
+from haushalt_matrix import CONTENT_DIR, DATA_DIR, YAML_PATH, HaushaltMatrix, load_haushalt_matrix
+from haushalt_schema import GROUPS, validate_haushalt
+
+MANIFEST_PATH = DATA_DIR / "cache" / "haushalte_export.json"
+MANIFEST_VERSION = 1
+
+# Felder je Jahr aus dem YAML-Abschnitt jahre (in dieser Reihenfolge)
+YEAR_FIELDS = ("typ", "quelle", "quelle_url")
+
+
+def _number(value: float) -> int | float:
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def build_records(matrix: HaushaltMatrix, years: list[int] | None = None) -> tuple[dict[int, dict], list[str]]:
+    """
+    Baut die Jahresdatensätze (Schema config.ts) aus der Haushaltsmatrix.
+
+    Returns:
+        (Datensätze nach Jahr, Fehlermeldungen für nicht exportierbare Jahre)
+    """
+    # Nach dem Matrix-Cache (JSON) sind die Jahresschlüssel Text
+    jahre = {int(year): entry for year, entry in (matrix.metadata.get("jahre") or {}).items()}
+    rows = {(YAML_SECTIONS.get(section), key): i for i, (section, key) in enumerate(zip(matrix.sections, matrix.keys))}
+
+    records, errors = {}, []
+    for year in years or [int(year) for year in matrix.years]:
+        if year not in jahre:
+            errors.append(f"{year}: fehlt im Abschnitt jahre")
+            continue
+        column = matrix.year_column(year)
+        if column is None:
+            errors.append(f"{year}: keine Werte")
+            continue
+        record = {"jahr": year, **{field: jahre[year][field] for field in YEAR_FIELDS if field in jahre[year]}}
+        missing = []
+        for group, keys in GROUPS.items():
+            record[group] = {}
+            for key in keys:
+                i = rows.get((group, key))
+                if i is None or np.isnan(column[i]):
+                    missing.append(f"{group}.{key}")
+                else:
+                    record[group][key] = _number(column[i])
+        if missing:
+            errors.append(f"{year}: Werte fehlen ({', '.join(missing)})")
+            continue
+        invalid = validate_haushalt(record)
+        if invalid:
+            errors.append(f"{year}: {'; '.join(invalid)}")
+            continue
+        records[year] = record
+    return records, errors
+
+
+def serialize(record: dict) -> str:
+    """Inhalt einer Jahresdatei (Format wie die bisherigen Dateien)."""
+    return json.dumps(record, ensure_ascii=False, indent=2) + "\n"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, str]:
+    """Inhalts-Hash je Jahr aus dem letzten Export (leer, wenn keins vorhanden)."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("jahre", {})
+
+
+def save_manifest(hashes: dict[str, str], path: Path = MANIFEST_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = json.dumps({"version": MANIFEST_VERSION, "jahre": dict(sorted(hashes.items()))}, indent=2) + "\n"
+    write_if_changed(path, content)
+
+
+def export_records(
+    records: dict[int, dict],
+    output_dir: Path = CONTENT_DIR,
+    manifest: dict[str, str] | None = None,
+    check: bool = False
+) -> tuple[dict[int, str], dict[str, str]]:
+    """
+    Schreibt die Jahresdateien, deren Inhalt sich geändert hat.
+
+    Ein Jahr gilt als unverändert, wenn der Inhalts-Hash dem Manifest
+    entspricht und die Datei existiert; sonst entscheidet write_if_changed
+    anhand des Dateiinhalts. Mit check=True wird nichts geschrieben.
+
+    Returns:
+        (Status je Jahr: "geschrieben", "unverändert" oder "abweichend",
+         neue Manifest-Einträge)
+    """
+    manifest = manifest or {}
+    status, hashes = {}, dict(manifest)
+    for year, record in sorted(records.items()):
+        content = serialize(record)
+        digest = content_hash(content)
+        path = output_dir / f"{year}.json"
+        if check:
+            current = path.read_text(encoding="utf-8") if path.exists() else None
+            status[year] = "unverändert" if current == content else "abweichend"
+            continue
+        if manifest.get(str(year)) == digest and path.exists():
+            status[year] = "unverändert"
+        else:
+            status[year] = "geschrieben" if write_if_changed(path, content) else "unverändert"
+        hashes[str(year)] = digest
+    return status, hashes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jahresdateien aus der YAML-Datei exportieren (inkrementell)")
+    parser.add_argument("--yaml", type=Path, default=YAML_PATH, help="YAML-Haushaltsdaten")
+    parser.add_argument("--output-dir", type=Path, default=CONTENT_DIR, help="Zielverzeichnis der Jahresdateien")
+    parser.add_argument("--years", help="Nur diese Jahre exportieren, z.B. 2024-2029")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST_PATH, help="Hash-Manifest des letzten Exports")
+    parser.add_argument("--force", action="store_true", help="Manifest ignorieren und alle Dateien vergleichen")
+    parser.add_argument("--check", action="store_true",
+                        help="Nichts schreiben; Exit-Code 1, wenn eine Datei vom Export abweicht")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    matrix = load_haushalt_matrix(args.yaml)
+    years = parse_years(args.years) if args.years else None
+    records, errors = build_records(matrix, years)
+    for error in errors:
+        print(f"  Fehler: {error}")
+
+    manifest = {} if args.force else load_manifest(args.manifest)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    status, hashes = export_records(records, args.output_dir, manifest, args.check)
+    if not args.check:
+        save_manifest(hashes, args.manifest)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for year, state in status.items():
+        if state != "unverändert":
+            print(f"  {state.capitalize()}: {args.output_dir / f'{year}.json'}")
+    counts = {state: list(status.values()).count(state) for state in ("geschrieben", "abweichend", "unverändert")}
+    print(", ".join(f"{count} {state}" for state, count in counts.items() if count or state == "unverändert")
+          + f" ({elapsed:.0f} ms)")
+    sys.exit(1 if errors or counts["abweichend"] else 0)
+
+
+if __name__ == "__main__":
+    main()
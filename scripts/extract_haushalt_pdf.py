@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Extrahiert den Ergebnishaushalt aus Haushaltsplan-PDFs.
+
+Nimmt die pdf_url der Dokumente aus data/haushalt_extracted.yaml (erzeugt
+von fetch_mcp_data.py), lädt die PDFs nach data/pdf/, sucht die Seiten des
+(Gesamt-)Ergebnishaushalts und ordnet die Tabellenzeilen den Schlüsseln
+aus src/content/config.ts zu. Teilergebnis- und Finanzhaushalte werden
+übersprungen, eine Tabelle darf über mehrere Seiten gehen.
+
+Die Seiten werden als Strom verarbeitet: jede Seite wird in einem
+Prozesspool gelesen und geparst, zurück kommen nur die erkannten Zeilen.
+Jedes Feld der Ausgabe führt die Seite(n), aus denen es stammt.
+
+Verwendung:
+    pip install pypdf
+    python extract_haushalt_pdf.py
+    python extract_haushalt_pdf.py --workers 8
+
+    # Offline mit lokalen PDFs (z.B. dem Fixture aus haushalt_pdf_stub.py)
+    python extract_haushalt_pdf.py --offline --pdf benchmarks/fixtures/pdf/haushaltsplan_2026.pdf
+
+Ausgabe:
+    - data/pdf_extrakt/{jahr}.json (Schema wie src/content/haushalte/{jahr}.json,
+      zusätzlich "provenienz" mit Datei und Seiten je Feld)
+    - data/pdf_extrakt/plan/{jahr}.json (letzter Planansatz für Jahre mit Ist-Werten)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+import yaml
+
+from amounts import extract_amounts
+from haushalt_schema import AUFWENDUNGEN_KEYS, ERTRAEGE_KEYS, validate_haushalt
+from http_cache import CacheMiss, ResponseCache, add_cache_arguments, cache_from_args
+from transport import Transport, add_transport_arguments, guard_from_args
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+PDF_DIR = DATA_DIR / "pdf"
+OUTPUT_DIR = DATA_DIR / "pdf_extrakt"
+EXTRACTED_PATH = DATA_DIR / "haushalt_extracted.yaml"
+
+# Seiten je Auftrag an einen Worker-Prozess
+PAGE_CHUNKSIZE = 8
+
+# Dokumente, deren PDF heruntergeladen wird
+HAUSHALT_DOC_RE = re.compile(r"haushalt", re.IGNORECASE)
+
+# Zeilen des Ergebnishaushalts -> (Gruppe, Schlüssel); mehrere Zeilen
+# eines Schlüssels werden addiert (z.B. aktives Personal + Versorgung)
+ROW_PREFIX = r"^\s*(?:\d{1,2}\.?\s+)?(?:=\s*)?"
+ROW_RULES = [
+    ("ertraege", "steuern_und_abgaben", r"Steuern und ähnliche Abgaben"),
+    ("ertraege", "zuwendungen_und_umlagen", r"Zuwendungen und allgemeine Umlagen"),
+    ("ertraege", "aufloesungsertraege_sonderposten", r"Auflösungserträge aus Sonderposten"),
+    ("ertraege", "sonstige_ertraege", r"sonstige Transfererträge"),
+    ("ertraege", "oeffentlich_rechtliche_entgelte", r"öffentlich-rechtliche Entgelte"),
+    ("ertraege", "privatrechtliche_entgelte", r"privatrechtliche Entgelte"),
+    ("ertraege", "kostenerstattungen", r"Kostenerstattungen und Kostenumlagen"),
+    ("ertraege", "zinsen_finanzertraege", r"Zinsen und ähnliche Finanzerträge"),
+    ("ertraege", "sonstige_ertraege", r"aktivierte Eigenleistungen"),
+    ("ertraege", "sonstige_ertraege", r"Bestandsveränderungen"),
+    ("ertraege", "sonstige_ertraege", r"sonstige ordentliche Erträge"),
+    ("summen", "gesamtertraege", r"Summe (?:der )?ordentlichen? Erträge"),
+    ("aufwendungen", "personalaufwendungen", r"(?:Aufwendungen für aktives Personal|Personalaufwendungen)"),
+    ("aufwendungen", "personalaufwendungen", r"(?:Aufwendungen für Versorgung|Versorgungsaufwendungen)"),
+    ("aufwendungen", "sach_und_dienstleistungen", r"Aufwendungen für Sach- und Dienstleistungen"),
+    ("aufwendungen", "abschreibungen", r"Abschreibungen"),
+    ("aufwendungen", "zinsen_aufwendungen", r"Zinsen und ähnliche Aufwendungen"),
+    ("aufwendungen", "transferaufwendungen", r"Transferaufwendungen"),
+    ("aufwendungen", "sonstige_aufwendungen", r"sonstige ordentliche Aufwendungen"),
+    ("summen", "gesamtaufwendungen", r"Summe (?:der )?ordentlichen? Aufwendungen"),
+    ("summen", "jahresergebnis", r"ordentliches Ergebnis"),
+]
+ROW_PATTERNS = [
+    (group, key, re.compile(ROW_PREFIX + label, re.IGNORECASE))
+    for group, key, label in ROW_RULES
+]
+
+# Spaltenkopf, z.B. "Ergebnis 2024  Ansatz 2025  Ansatz 2026  Planung 2027";
+# steht die Spaltenart in der Zeile darüber, ordnet COLUMN_LABEL_RE sie zu
+COLUMN_RE = re.compile(r"(?:(Ergebnis|Ansatz|Planung|Plan)\s+)?\b((?:19|20)\d{2})\b")
+COLUMN_LABEL_RE = re.compile(r"\b(Ergebnis|Ansatz|Planung|Plan)\b")
+
+# Leere Zelle ("-" zwischen Spalten) = 0
+EMPTY_CELL_RE = re.compile(r"(?<=\s\s)[-–](?=\s\s|\s*$)")
+
+# Seitenart aus den ersten Zeilen (Überschrift)
+HEADING_LINES = 5
+PAGE_KINDS = [
+    ("teil", re.compile(r"Teil(?:ergebnis)?haushalt", re.IGNORECASE)),
+    ("ergebnis", re.compile(r"Ergebnishaushalt|Ergebnisplan", re.IGNORECASE)),
+    ("finanz", re.compile(r"Finanzhaushalt|Finanzplan", re.IGNORECASE)),
+]
+
+_readers: dict[str, "PdfReader"] = {}
+
+
+def page_kind(lines: list[str]) -> str | None:
+    """Art der Seite anhand der Überschrift: ergebnis, finanz, teil oder None."""
+    heading = "\n".join(lines[:HEADING_LINES])
+    for kind, pattern in PAGE_KINDS:
+        if pattern.search(heading):
+            return kind
+    return None
+
+
+def parse_columns(line: str, previous: str = "") -> list[tuple[int, str]]:
+    """
+    Jahresspalten eines Tabellenkopfs als (jahr, typ); 'Ergebnis' = Ist-Wert.
+
+    Zweizeilige Köpfe (Spaltenart über dem Jahr) werden erkannt, wenn die
+    Zeile darüber genau eine Spaltenart je Jahr enthält.
+    """
+    found = COLUMN_RE.findall(line)
+    labels = COLUMN_LABEL_RE.findall(previous)
+    if found and not any(label for label, _ in found) and len(labels) == len(found):
+        found = [(label, year) for label, (_, year) in zip(labels, found)]
+    return [(int(year), "ist" if label == "Ergebnis" else "plan") for label, year in found]
+
+
+def match_row(line: str) -> tuple[str, str, re.Match] | None:
+    """Erste passende Zeilenregel als (gruppe, schlüssel, treffer)."""
+    for group, key, pattern in ROW_PATTERNS:
+        match = pattern.match(line)
+        if match:
+            return group, key, match
+    return None
+
+
+def parse_page(text: str, page_number: int) -> dict:
+    """
+    Parst eine Seite: Seitenart, Jahresspalten und erkannte Tabellenzeilen.
+
+    Returns:
+        {"seite", "art", "spalten": [(jahr, typ)], "zeilen": [(gruppe, schlüssel, werte)],
+         "unvollstaendig": [Zeilenbezeichnungen mit zu wenigen Werten]}
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    scan = {"seite": page_number, "art": page_kind(lines), "spalten": [], "zeilen": [], "unvollstaendig": []}
+
+    previous = ""
+    for line in lines:
+        # Umbrochene Bezeichnung: Zeile ohne Werte mit der folgenden verbinden
+        row = match_row(f"{previous.rstrip()} {line.strip()}") if previous else None
+        if row is not None:
+            line = f"{previous.rstrip()} {line.strip()}"
+        else:
+            row = match_row(line)
+        if row is None:
+            if not scan["spalten"]:
+                columns = parse_columns(line, previous)
+                if len(columns) >= 2:
+                    scan["spalten"] = columns
+            previous = line
+            continue
+        previous = ""
+        if not scan["spalten"]:
+            continue
+
+        group, key, match = row
+        values = extract_amounts(EMPTY_CELL_RE.sub("0", line[match.end():]))
+        if len(values) < len(scan["spalten"]):
+            scan["unvollstaendig"].append(line.strip()[:60])
+            continue
+        scan["zeilen"].append((group, key, [round(v) for v in values[:len(scan["spalten"])].tolist()]))
+
+    return scan
+
+
+def _reader(path: str) -> "PdfReader":
+    """PdfReader je Datei, einmal pro Worker-Prozess geöffnet."""
+    if path not in _readers:
+        _readers[path] = PdfReader(path)
+    return _readers[path]
+
+
+def scan_page(task: tuple[str, int]) -> tuple[str, dict]:
+    """Worker: extrahiert den Text einer Seite (1-basiert) und parst ihn."""
+    path, page_number = task
+    text = _reader(path).pages[page_number - 1].extract_text(extraction_mode="layout") or ""
+    return path, parse_page(text, page_number)
+
+
+def iter_page_scans(paths: list[Path], workers: int) -> Iterator[tuple[str, dict]]:
+    """Liefert die geparsten Seiten aller PDFs in Dokument- und Seitenreihenfolge."""
+    tasks = [
+        (str(path), page_number)
+        for path in paths
+        for page_number in range(1, len(PdfReader(path).pages) + 1)
+    ]
+    print(f"  {len(tasks)} Seiten in {len(paths)} PDF(s), {workers} Prozess(e)")
+    if workers <= 1:
+        yield from map(scan_page, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(scan_page, tasks, chunksize=PAGE_CHUNKSIZE)
+
+
+def collect_tables(scans: Iterator[tuple[str, dict]]) -> dict[str, list[dict]]:
+    """
+    Fasst die Seiten je Datei zu Ergebnishaushalt-Tabellen zusammen.
+
+    Eine Tabelle beginnt auf einer Seite mit Überschrift "Ergebnishaushalt"
+    und setzt sich auf folgenden Seiten ohne eigene Überschrift fort.
+
+    Returns:
+        {datei: [{"spalten", "felder": {(gruppe, schlüssel): {jahr: wert}},
+                  "seiten": {(gruppe, schlüssel): [seite]}}]}
+    """
+    tables: dict[str, list[dict]] = {}
+    current: dict[str, dict | None] = {}
+
+    for path, scan in scans:
+        for label in scan["unvollstaendig"]:
+            print(f"  Warnung: {Path(path).name} S. {scan['seite']}: zu wenige Werte in '{label}'")
+        if not scan["zeilen"]:
+            if scan["art"] is not None:
+                current[path] = None
+            continue
+
+        table = current.get(path)
+        if scan["art"] == "ergebnis" or (scan["art"] is None and table is not None):
+            if table is None or scan["art"] == "ergebnis" and table["spalten"] != scan["spalten"]:
+                table = {"spalten": scan["spalten"], "felder": {}, "seiten": {}}
+                tables.setdefault(path, []).append(table)
+                current[path] = table
+        else:
+            current[path] = None
+            continue
+
+        years = [year for year, _ in scan["spalten"]]
+        for group, key, values in scan["zeilen"]:
+            field = table["felder"].setdefault((group, key), {})
+            for year, value in zip(years, values):
+                field[year] = field.get(year, 0) + value
+            pages = table["seiten"].setdefault((group, key), [])
+            if scan["seite"] not in pages:
+                pages.append(scan["seite"])
+
+    return tables
+
+
+def build_record(table: dict, year: int, typ: str, source: dict) -> tuple[dict, dict]:
+    """
+    Baut den Jahresdatensatz (Schema config.ts) und die Provenienz je Feld.
+
+    Fehlende Summen werden aus den Einzelzeilen berechnet.
+    """
+    record = {"jahr": year, "typ": typ, "quelle": source["quelle"]}
+    if source.get("quelle_url"):
+        record["quelle_url"] = source["quelle_url"]
+    provenance = {}
+
+    for group, keys in (("ertraege", ERTRAEGE_KEYS), ("aufwendungen", AUFWENDUNGEN_KEYS)):
+        record[group] = {}
+        for key in keys:
+            if year in table["felder"].get((group, key), {}):
+                record[group][key] = table["felder"][(group, key)][year]
+                provenance[f"{group}.{key}"] = {"datei": source["datei"], "seiten": table["seiten"][(group, key)]}
+
+    computed = {
+        "gesamtertraege": sum(record["ertraege"].values()),
+        "gesamtaufwendungen": sum(record["aufwendungen"].values()),
+    }
+    computed["jahresergebnis"] = computed["gesamtertraege"] - computed["gesamtaufwendungen"]
+    record["summen"] = {}
+    for key, value in computed.items():
+        row = table["felder"].get(("summen", key), {})
+        if year in row:
+            record["summen"][key] = row[year]
+            provenance[f"summen.{key}"] = {"datei": source["datei"], "seiten": table["seiten"][("summen", key)]}
+        else:
+            record["summen"][key] = value
+            provenance[f"summen.{key}"] = {"berechnet": True}
+
+    return record, provenance
+
+
+def consistency_warnings(record: dict) -> list[str]:
+    """Abweichungen zwischen Summenzeilen und Einzelzeilen (nur Hinweise)."""
+    warnings = []
+    for group, key in (("ertraege", "gesamtertraege"), ("aufwendungen", "gesamtaufwendungen")):
+        difference = record["summen"][key] - sum(record[group].values())
+        if difference:
+            warnings.append(f"summen.{key} weicht um {difference:+,} EUR von der Summe der Zeilen ab")
+    return warnings
+
+
+def extract_years(
+    tables: dict[str, list[dict]],
+    sources: dict[str, dict],
+    typ_filter: str | None = None
+) -> dict[int, tuple[dict, dict]]:
+    """
+    Wählt je Jahr den besten Wert: Ist vor Plan, sonst das neueste Dokument.
+
+    Args:
+        typ_filter: nur Spalten dieses Typs berücksichtigen ("plan"/"ist")
+
+    Returns:
+        {jahr: (datensatz, provenienz)}
+    """
+    candidates = []
+    for path, path_tables in tables.items():
+        source = sources[path]
+        for table in path_tables:
+            for year, typ in table["spalten"]:
+                if typ_filter and typ != typ_filter:
+                    continue
+                candidates.append((typ == "ist", source.get("datum", ""), year, typ, table, source))
+
+    result = {}
+    for is_ist, datum, year, typ, table, source in sorted(candidates, key=lambda c: (c[0], c[1]), reverse=True):
+        if year not in result:
+            result[year] = build_record(table, year, typ, source)
+    return dict(sorted(result.items()))
+
+
+def load_documents(path: Path = EXTRACTED_PATH) -> list[dict]:
+    """Haushaltsdokumente mit PDF aus den extrahierten MCP-Daten, neueste zuerst."""
+    if not path.exists():
+        print(f"  {path} fehlt (erst fetch_mcp_data.py ausführen)")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        extracted = yaml.safe_load(f) or {}
+    documents = [
+        doc for doc in extracted.get("dokumente", [])
+        if doc.get("pdf_url") and HAUSHALT_DOC_RE.search(f"{doc.get('titel', '')} {doc.get('referenz', '')}")
+    ]
+    return sorted(documents, key=lambda doc: doc.get("datum", ""), reverse=True)
+
+
+def pdf_path(url: str) -> Path:
+    """Lokaler Pfad eines PDFs in data/pdf/ (Dateiname aus dem URL-Hash)."""
+    return PDF_DIR / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}.pdf"
+
+
+def download_pdf(
+    url: str,
+    transport: Transport,
+    cache: ResponseCache | None = None,
+    refresh: bool = False
+) -> Path | None:
+    """
+    Lädt ein PDF nach data/pdf/; vorhandene Dateien werden genutzt.
+
+    Der Download läuft über die gemeinsame Transportschicht (Rate-Limit,
+    Wiederholungen, Circuit-Breaker) und, falls aktiv, über den HTTP-Cache.
+    """
+    path = pdf_path(url)
+    if path.exists() and not refresh:
+        return path
+
+    if cache is not None:
+        response = cache.request(transport.request, "GET", url, refresh=refresh)
+    else:
+        response = transport.request("GET", url)
+    response.raise_for_status()
+    if not response.content.startswith(b"%PDF"):
+        print(f"  Kein PDF: {url}")
+        return None
+    PDF_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(response.content)
+    tmp_path.replace(path)
+    return path
+
+
+def download_documents(
+    documents: list[dict],
+    transport: Transport,
+    cache: ResponseCache | None = None,
+    refresh: bool = False
+) -> dict[str, dict]:
+    """Lädt die PDFs parallel herunter; Ergebnis: {lokaler Pfad: Quelle}."""
+    def fetch(doc):
+        try:
+            return doc, download_pdf(doc["pdf_url"], transport, cache, refresh)
+        except CacheMiss:
+            print(f"  Nicht lokal vorhanden (--offline): {doc['pdf_url']}")
+            return doc, None
+        except requests.RequestException as e:
+            print(f"  Fehler beim Download von {doc.get('referenz', doc['pdf_url'])}: {e}")
+            return doc, None
+
+    sources = {}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for doc, path in executor.map(fetch, documents):
+            if path is None:
+                continue
+            title = " - ".join(part for part in (doc.get("referenz"), doc.get("titel")) if part)
+            sources[str(path)] = {
+                "datei": path.name,
+                "quelle": title or path.name,
+                "quelle_url": doc["pdf_url"],
+                "datum": doc.get("datum", ""),
+            }
+    return sources
+
+
+def save_years(years: dict[int, tuple[dict, dict]], output_dir: Path = OUTPUT_DIR) -> int:
+    """Prüft und speichert die Jahresdateien; ungültige Datensätze werden nicht geschrieben."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for year, (record, provenance) in years.items():
+        errors = validate_haushalt(record)
+        if errors:
+            print(f"  {year}: ungültig, nicht gespeichert ({'; '.join(errors)})")
+            continue
+        for warning in consistency_warnings(record):
+            print(f"  {year}: Hinweis: {warning}")
+        with open(output_dir / f"{year}.json", "w", encoding="utf-8") as f:
+            json.dump({**record, "provenienz": provenance}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        written += 1
+        print(f"  {year} ({record['typ']}): {record['quelle']}")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ergebnishaushalt aus Haushaltsplan-PDFs extrahieren")
+    parser.add_argument("--pdf", type=Path, nargs="+", help="Lokale PDF-Dateien statt der MCP-Dokumente")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl Worker-Prozesse für die Seiten")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Zielverzeichnis der Jahresdateien")
+    add_cache_arguments(parser)
+    add_transport_arguments(parser, rate=1.0)
+    args = parser.parse_args()
+
+    if PdfReader is None:
+        print("pypdf nicht installiert!")
+        print("Installation: pip install pypdf")
+        return
+
+    print("=" * 60)
+    print("Ergebnishaushalt aus Haushaltsplan-PDFs")
+    print("=" * 60)
+
+    if args.pdf:
+        sources = {
+            str(path): {"datei": path.name, "quelle": path.stem, "datum": ""}
+            for path in args.pdf
+        }
+    else:
+        transport = Transport(guard=guard_from_args(args), timeout=(10.0, 120.0))
+        sources = download_documents(load_documents(), transport, cache_from_args(args), args.refresh)
+        if args.metrics:
+            transport.guard.metrics.save(args.metrics)
+            print(f"Messwerte gespeichert: {args.metrics}")
+    if not sources:
+        print("Keine PDFs gefunden.")
+        return
+
+    started = time.perf_counter()
+    scans = iter_page_scans([Path(path) for path in sources], args.workers)
+    tables = collect_tables(scans)
+    elapsed = time.perf_counter() - started
+    table_count = sum(len(path_tables) for path_tables in tables.values())
+    print(f"  {table_count} Ergebnishaushalt-Tabelle(n) gefunden ({elapsed:.1f}s)")
+
+    years = extract_years(tables, sources)
+    written = save_years(years, args.output_dir)
+    print(f"\n{written} Jahresdatei(en) gespeichert in {args.output_dir}")
+
+    # Letzter Planansatz abgerechneter Jahre für den Plan-Ist-Vergleich (generate_analytics.py)
+    plans = {
+        year: result for year, result in extract_years(tables, sources, typ_filter="plan").items()
+        if year in years and years[year][0]["typ"] == "ist"
+    }
+    if plans:
+        written = save_years(plans, args.output_dir / "plan")
+        print(f"{written} Plandatei(en) gespeichert in {args.output_dir / 'plan'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,37 @@ Zwei Methoden verfügbar:
 2. Browser-basiert (Playwright) - Für komplexe Navigationen
 
 Verwendung:
-    pip install requests beautifulsoup4 pandas openpyxl
+    pip install requests beautifulsoup4 lxml pandas openpyxl
     python fetch_lsn_data.py
 
-    # Optional für Browser-Automatisierung:
+    # Batch-Modus: mehrere Gemeinden und Tabellen parallel
+    python fetch_lsn_data.py --batch --regions 254026000 254021000 \
+        --tables Z9200001 Z9200002 --workers 4
+
+    # Optional für Browser-Automatisierung (headless, Fallback zum requests-Pfad):
     pip install playwright
     playwright install chromium
-    python fetch_lsn_data.py --browser
+    python fetch_lsn_data.py --browser --regions 254026000 --tables Z9200001 --workers 3
 
 Ausgabe:
     - data/lsn_steuereinnahmen_nordstemmen.csv
     - data/lsn_steuereinnahmen_nordstemmen.xlsx
+    - data/lsn_batch.csv (Batch-Modus, alle Regionen und Tabellen im Langformat)
+    - data/lsn_browser.csv (Browser-Modus, gleiches Langformat)
+    - data/lsn_warehouse/ (alle Modi: Parquet je Tabelle und Region mit
+      Abrufzeitpunkt, abfragbar mit lsn_warehouse.py; --no-warehouse)
 """
 
 import argparse
+import queue
+import random
 import re
+import statistics
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 import json
@@ -31,6 +46,16 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
+import lsn_warehouse
+from http_cache import ResponseCache, add_cache_arguments, cache_from_args
+from instrumentation import REPORT, add_instrumentation_arguments, instrumented
+from transport import RequestGuard, Transport, add_transport_arguments, guard_from_args
+
+try:
+    import lsn_parser  # Streaming-Parser, benötigt lxml
+except ImportError:
+    lsn_parser = None
+
 # Konfiguration
 LSN_BASE_URL = "https://www1.nls.niedersachsen.de/statistik"
 GEMEINDE_NAME = "Nordstemmen"
@@ -45,8 +70,71 @@ TABLES = {
     "K9200001": "Steuereinnahmen (Einzeljahr)",
     "Z9200002": "Steuerkraft und Hebesätze (Zeitreihe)",
     "K9200002": "Steuerkraft und Hebesätze (Einzeljahr)",
+    "A100001G": "Bevölkerungsstand (Zeitreihe)",
 }
 
+# Bevölkerungsstand für Werte je Einwohner (generate_analytics.py, generate_vergleich.py)
+EINWOHNER_TABELLE = "A100001G"
+EINWOHNER_MERKMAL = "Bevölkerung insgesamt"
+
+# Polling auf die Ergebnisseite nach dem Meta-Refresh
+POLL_INITIAL_DELAY = 0.25  # Sekunden, solange keine Statistik vorliegt
+POLL_MIN_DELAY = 0.05
+POLL_MAX_DELAY = 4.0
+POLL_BACKOFF = 2.0
+POLL_DEADLINE = 60.0  # Gesamtbudget je Tabelle
+
+META_REFRESH_RE = re.compile(r"http-equiv=[\"']?refresh", re.IGNORECASE)
+TABLE_TAG_RE = re.compile(r"<table\b", re.IGNORECASE)
+
+
+class GenerationStats:
+    """
+    Gemessene Generierungsdauer der LSN-Tabellen je Tabellen-ID.
+
+    Wird von mehreren Sessions gemeinsam genutzt (thread-sicher). Der
+    Median der letzten Messungen bestimmt die erste Wartezeit beim
+    nächsten Abruf derselben Tabelle. Wartezeiten im Transport (Rate-Limit,
+    Backoff) beim Pollen zählen nicht zur Generierungsdauer und werden
+    getrennt geführt.
+    """
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._waits: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, table_id: str, seconds: float, waited: float = 0.0):
+        """Speichert eine Generierungsdauer (ohne Transport-Wartezeit) und die Wartezeit selbst."""
+        with self._lock:
+            self._samples.setdefault(table_id, deque(maxlen=self.window)).append(seconds)
+            self._waits.setdefault(table_id, deque(maxlen=self.window)).append(waited)
+
+    def first_delay(self, table_id: str) -> float:
+        """Erste Wartezeit vor dem Polling (knapp unter dem bisherigen Median)."""
+        with self._lock:
+            samples = list(self._samples.get(table_id, ()))
+        if not samples:
+            return POLL_INITIAL_DELAY
+        return min(max(statistics.median(samples) * 0.8, POLL_MIN_DELAY), POLL_MAX_DELAY)
+
+    def summary(self) -> dict:
+        """Kennzahlen je Tabelle (Anzahl, Median, Maximum, Median der Transport-Wartezeit in Sekunden)."""
+        with self._lock:
+            snapshot = {table_id: list(samples) for table_id, samples in self._samples.items()}
+            waits = {table_id: list(samples) for table_id, samples in self._waits.items()}
+        return {
+            table_id: {
+                "anzahl": len(samples),
+                "median_s": round(statistics.median(samples), 3),
+                "max_s": round(max(samples), 3),
+                "wartezeit_median_s": round(statistics.median(waits[table_id]), 3),
+            }
+            for table_id, samples in snapshot.items()
+            if samples
+        }
+
 
 class LSNApiClient:
     """
@@ -56,29 +144,88 @@ class LSNApiClient:
     der Web-Oberfläche.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        base_url: str = LSN_BASE_URL,
+        stats: GenerationStats | None = None,
+        cache: ResponseCache | None = None,
+        guard: RequestGuard | None = None
+    ):
+        self.base_url = base_url
+        self.stats = stats or GenerationStats()
+        self.cache = cache
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         })
+        self.transport = Transport(
+            self.session, guard,
+            session_expired=self.is_session_expired,
+            renew_session=self.renew_session
+        )
         self._session_initialized = False
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        HTTP-Anfrage über den Transport, bei aktivem Cache über den Cache.
+
+        Die LSN-Session wird erst gestartet, wenn eine Anfrage tatsächlich
+        ans Netz geht - ein Lauf mit warmem Cache braucht keinen Handshake.
+        """
+        if self.cache is not None and not kwargs.get("refresh"):
+            cached = self.cache.lookup(method, url, data=kwargs.get("data"), json=kwargs.get("json"))
+            if cached is not None:
+                return cached
+        if not self._session_initialized:
+            self.start_session()
+        if self.cache is None:
+            kwargs.pop("accept", None)
+            kwargs.pop("refresh", None)
+            return self.transport.request(method, url, **kwargs)
+        return self.cache.request(self.transport.request, method, url, **kwargs)
+
+    def is_session_expired(self, response: requests.Response) -> bool:
+        """
+        Abgelaufene LSN-Session: Unterseiten antworten dann mit 404 oder
+        leiten auf die Startseite default.asp um (siehe docs/LSN_DATENBANK.md).
+        """
+        requested = response.request.url if response.request else response.url
+        if "/default.asp" in requested:
+            return False
+        return response.status_code == 404 or (
+            bool(response.history) and response.url.split("?")[0].endswith("/default.asp")
+        )
+
+    def renew_session(self) -> bool:
+        """Verwirft die Cookies und startet eine neue Session."""
+        print("LSN-Session abgelaufen, starte neu...")
+        self.session.cookies.clear()
+        self._session_initialized = False
+        return self.start_session()
+
     def start_session(self) -> bool:
         """Initialisiert eine LSN-Session."""
+        if self.cache is not None and self.cache.offline:
+            # Offline werden nur gecachte Antworten genutzt, keine Session nötig
+            self._session_initialized = True
+            return True
+
         print("Starte LSN-Session...")
         try:
-            # Schritt 1: Hauptseite laden
-            response = self.session.get(f"{LSN_BASE_URL}/default.asp")
-            if not response.ok:
-                print(f"Fehler beim Laden der Hauptseite: {response.status_code}")
-                return False
-
-            # Schritt 2: Session aktivieren durch Form-Submit
-            response = self.session.post(
-                f"{LSN_BASE_URL}/default.asp",
-                data={"LOGIN1": "WEITER"},
-                allow_redirects=True
-            )
+            with REPORT.phase("session_start"):
+                # Schritt 1: Hauptseite laden
+                response = self.transport.request("GET", f"{self.base_url}/default.asp")
+                if not response.ok:
+                    print(f"Fehler beim Laden der Hauptseite: {response.status_code}")
+                    return False
+
+                # Schritt 2: Session aktivieren durch Form-Submit
+                response = self.transport.request(
+                    "POST",
+                    f"{self.base_url}/default.asp",
+                    data={"LOGIN1": "WEITER"},
+                    allow_redirects=True
+                )
 
             if response.ok:
                 self._session_initialized = True
@@ -94,7 +241,8 @@ class LSNApiClient:
         self,
         table_id: str,
         region_id: str = GEMEINDE_LSN_ID,
-        level: int = 5  # 5 = Mitgliedsgemeinde
+        level: int = 5,  # 5 = Mitgliedsgemeinde
+        refresh: bool = False
     ) -> tuple[str, str]:
         """
         Ruft eine Tabelle für eine Region ab.
@@ -103,25 +251,26 @@ class LSNApiClient:
             table_id: Tabellen-ID (z.B. Z9200001)
             region_id: LSN-Regions-ID (z.B. 254026000)
             level: Gebietsebene (1-5)
+            refresh: Gecachte Antworten ignorieren
 
         Returns:
             Tuple aus (HTML-Content, Download-URL)
         """
-        if not self._session_initialized:
-            self.start_session()
-
         print(f"Rufe Tabelle {table_id} für Region {region_id} ab...")
 
         # POST an mustertabelle.asp
-        response = self.session.post(
-            f"{LSN_BASE_URL}/html/mustertabelle.asp",
-            data={
-                "DT": table_id,
-                "UG": region_id,
-                "LN": str(level),
-                "LN2": "1",
-            }
-        )
+        with REPORT.phase("table_request"):
+            response = self._request(
+                "POST",
+                f"{self.base_url}/html/mustertabelle.asp",
+                data={
+                    "DT": table_id,
+                    "UG": region_id,
+                    "LN": str(level),
+                    "LN2": "1",
+                },
+                refresh=refresh
+            )
 
         if not response.ok:
             print(f"Fehler bei Tabellenabfrage: {response.status_code}")
@@ -141,30 +290,105 @@ class LSNApiClient:
             return response.text, ""
 
         result_path = match.group(1)
-        result_url = f"{LSN_BASE_URL}{result_path}"
+        result_url = f"{self.base_url}{result_path}"
 
-        # Warte auf Tabellen-Generierung
-        print("Warte auf Tabellen-Generierung...")
-        time.sleep(2)
+        # Warte auf Tabellen-Generierung und lade Ergebnis
+        with REPORT.phase("wait"):
+            result_response = self.wait_for_result(result_url, table_id)
 
-        # Lade Ergebnis
-        result_response = self.session.get(result_url)
+        # Gecachte Redirect-URL kann zu einer abgelaufenen Session gehören
+        stale = result_response is None or not result_response.ok
+        if stale and getattr(response, "from_cache", False) and not self.cache.offline:
+            return self.fetch_table(table_id, region_id, level, refresh=True)
+
+        if result_response is None:
+            return "", ""
 
         if not result_response.ok:
             print(f"Fehler beim Laden des Ergebnisses: {result_response.status_code}")
             return "", ""
 
         # Extrahiere Download-URL für ZIP
-        result_soup = BeautifulSoup(result_response.text, "html.parser")
-        download_link = result_soup.find("a", href=re.compile(r"\.zip$"))
+        with REPORT.phase("parse"):
+            result_soup = BeautifulSoup(result_response.text, "html.parser")
+            download_link = result_soup.find("a", href=re.compile(r"\.zip$"))
         download_url = ""
         if download_link:
-            download_url = f"{LSN_BASE_URL}{download_link['href']}"
+            download_url = f"{self.base_url}{download_link['href']}"
 
         return result_response.text, download_url
 
+    @staticmethod
+    def is_result_ready(html_content: str) -> bool:
+        """Prüft, ob die Ergebnisseite fertig ist (Tabelle statt Warteseite)."""
+        return (
+            not META_REFRESH_RE.search(html_content)
+            and TABLE_TAG_RE.search(html_content) is not None
+        )
+
+    def wait_for_result(
+        self,
+        result_url: str,
+        table_id: str,
+        deadline: float = POLL_DEADLINE
+    ) -> requests.Response | None:
+        """
+        Pollt die Ergebnisseite, bis die Tabelle generiert ist.
+
+        Exponentielles Backoff mit Jitter, beginnend bei der aus
+        früheren Abrufen gelernten Generierungsdauer.
+
+        Returns:
+            Antwort der Ergebnisseite, oder None bei Überschreitung der Deadline
+        """
+        if self.cache is not None:
+            cached = self.cache.lookup("GET", result_url)
+            if cached is not None or self.cache.offline:
+                return cached or self._request("GET", result_url)
+
+        print("Warte auf Tabellen-Generierung...")
+        started = time.monotonic()
+        waited = 0.0  # Rate-Limit und Backoff im Transport, nicht Teil der Generierungsdauer
+        delay = self.stats.first_delay(table_id)
+
+        while True:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                print(f"Zeitüberschreitung bei Tabelle {table_id} nach {deadline:.0f}s")
+                return None
+
+            # Jitter: zufällig zwischen halber und voller Wartezeit
+            time.sleep(min(delay * random.uniform(0.5, 1.0), remaining))
+
+            response = self._request(
+                "GET", result_url, accept=lambda r: self.is_result_ready(r.text)
+            )
+            waited += getattr(response, "wartezeit", 0.0)
+            if not response.ok or self.is_result_ready(response.text):
+                if response.ok:
+                    self.stats.record(table_id, time.monotonic() - started - waited, waited)
+                return response
+
+            delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+
     def parse_html_table(self, html_content: str) -> pd.DataFrame:
-        """Parst eine HTML-Tabelle zu einem DataFrame."""
+        """
+        Parst eine HTML-Tabelle zu einem DataFrame.
+
+        Nutzt den Streaming-Parser (lxml, typisierte Spalten), sonst
+        BeautifulSoup als Fallback.
+        """
+        with REPORT.phase("parse"):
+            if lsn_parser is not None:
+                df = lsn_parser.parse_html_table(html_content)
+            else:
+                df = self.parse_html_table_bs4(html_content)
+        REPORT.count("rows", len(df))
+        return df
+
+    @staticmethod
+    def parse_html_table_bs4(html_content: str) -> pd.DataFrame:
+        """Parst eine HTML-Tabelle mit BeautifulSoup (Textspalten, ohne lxml)."""
         soup = BeautifulSoup(html_content, "html.parser")
 
         # Finde die Haupt-Datentabelle
@@ -207,7 +431,8 @@ class LSNApiClient:
     def download_zip(self, url: str, output_path: Path) -> bool:
         """Lädt eine ZIP-Datei herunter."""
         try:
-            response = self.session.get(url)
+            with REPORT.phase("download"):
+                response = self._request("GET", url)
             if response.ok:
                 output_path.write_bytes(response.content)
                 print(f"ZIP gespeichert: {output_path}")
@@ -216,32 +441,261 @@ class LSNApiClient:
             print(f"Download-Fehler: {e}")
         return False
 
+    def fetch_zip_table(self, url: str) -> pd.DataFrame:
+        """
+        Lädt den ZIP-Export und parst die enthaltene XLSX/CSV-Datei im Speicher.
+
+        Liefert dasselbe Schema wie parse_html_table.
+        """
+        if lsn_parser is None:
+            print("ZIP-Import benötigt lxml: pip install lxml")
+            return pd.DataFrame()
 
-def fetch_steuereinnahmen_zeitreihe(client: LSNApiClient) -> pd.DataFrame:
+        try:
+            with REPORT.phase("download"):
+                response = self._request("GET", url)
+            if not response.ok:
+                print(f"Fehler beim ZIP-Download: {response.status_code}")
+                return pd.DataFrame()
+            with REPORT.phase("parse"):
+                df = lsn_parser.parse_zip_export(response.content)
+            REPORT.count("rows", len(df))
+            return df
+        except Exception as e:
+            print(f"ZIP-Import-Fehler: {e}")
+        return pd.DataFrame()
+
+    def fetch_table_frame(
+        self,
+        table_id: str,
+        region_id: str = GEMEINDE_LSN_ID,
+        prefer_zip: bool = False
+    ) -> pd.DataFrame:
+        """
+        Ruft eine Tabelle ab und liefert sie als DataFrame.
+
+        Nutzt die HTML-Ergebnisseite und den ZIP-Export als gleichwertige
+        Quellen: mit prefer_zip zuerst den ZIP-Export, sonst die
+        HTML-Tabelle. Die jeweils andere Quelle dient als Fallback.
+        """
+        html, download_url = self.fetch_table(table_id, region_id=region_id)
+        if not html:
+            return pd.DataFrame()
+
+        df = pd.DataFrame()
+        if prefer_zip and download_url:
+            df = self.fetch_zip_table(download_url)
+        if df.empty:
+            df = self.parse_html_table(html)
+        if df.empty and download_url and not prefer_zip:
+            df = self.fetch_zip_table(download_url)
+        return df
+
+
+def fetch_steuereinnahmen_zeitreihe(client: LSNApiClient, prefer_zip: bool = False) -> pd.DataFrame:
     """
     Ruft die Steuereinnahmen-Zeitreihe für Nordstemmen ab.
     Tabelle Z9200001 enthält Daten ab 1983.
     """
-    html, download_url = client.fetch_table("Z9200001")
+    return client.fetch_table_frame("Z9200001", prefer_zip=prefer_zip)
 
-    if not html:
-        return pd.DataFrame()
 
-    # Parse HTML
-    df = client.parse_html_table(html)
+class LSNSessionPool:
+    """
+    Pool von LSN-Sessions für parallele Abrufe.
+
+    Jede Session (LSNApiClient) wird zu einem Zeitpunkt nur von einem
+    Thread genutzt. Sessions werden bei Bedarf bis zur Obergrenze
+    ``size`` erzeugt und danach wiederverwendet.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        base_url: str = LSN_BASE_URL,
+        cache: ResponseCache | None = None,
+        guard: RequestGuard | None = None
+    ):
+        if size < 1:
+            raise ValueError("Pool-Größe muss mindestens 1 sein")
+        self.size = size
+        self.base_url = base_url
+        self.cache = cache
+        # Rate-Limit und Circuit-Breaker gelten für alle Sessions gemeinsam
+        self.guard = guard or RequestGuard()
+        self.stats = GenerationStats()
+        self._idle: queue.Queue[LSNApiClient] = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_client(self) -> LSNApiClient | None:
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        # Die Session startet erst mit der ersten Anfrage, die nicht aus dem Cache kommt
+        return LSNApiClient(base_url=self.base_url, stats=self.stats, cache=self.cache, guard=self.guard)
+
+    @contextmanager
+    def acquire(self):
+        """Leiht eine Session aus dem Pool aus (blockiert, wenn alle belegt sind)."""
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            client = self._create_client() or self._idle.get()
+        try:
+            yield client
+        finally:
+            self._idle.put(client)
+
+
+def table_to_long_format(df: pd.DataFrame, table_id: str, region_id: str) -> pd.DataFrame:
+    """
+    Überführt eine LSN-Tabelle ins Langformat.
+
+    Die erste Spalte enthält das Jahr, alle weiteren Spalten werden
+    zu (merkmal, wert)-Paaren.
+    """
+    year_column = df.columns[0]
+    long_df = df.melt(id_vars=[year_column], var_name="merkmal", value_name="wert")
+    long_df = long_df.rename(columns={year_column: "jahr"})
+    long_df.insert(0, "region_id", region_id)
+    long_df.insert(0, "tabelle", table_id)
+    return long_df
+
+
+def fetch_region_table(
+    pool: LSNSessionPool,
+    table_id: str,
+    region_id: str,
+    prefer_zip: bool = False
+) -> pd.DataFrame:
+    """Ruft eine Tabelle für eine Region über eine Pool-Session ab."""
+    with pool.acquire() as client:
+        df = client.fetch_table_frame(table_id, region_id=region_id, prefer_zip=prefer_zip)
 
     if df.empty:
-        # Fallback: Versuche ZIP-Download
-        if download_url:
-            zip_path = DATA_DIR / "lsn_steuereinnahmen.zip"
-            if client.download_zip(download_url, zip_path):
-                print(f"ZIP heruntergeladen: {zip_path}")
-                print("Bitte manuell extrahieren und Excel-Datei öffnen")
+        return df
+    return table_to_long_format(df, table_id, region_id)
+
+
+def fetch_batch(
+    region_ids: list[str],
+    table_ids: list[str],
+    max_workers: int = 4,
+    base_url: str = LSN_BASE_URL,
+    cache: ResponseCache | None = None,
+    prefer_zip: bool = False,
+    guard: RequestGuard | None = None
+) -> pd.DataFrame:
+    """
+    Ruft alle Kombinationen aus Regionen und Tabellen parallel ab.
+
+    Args:
+        region_ids: LSN-Regions-IDs (z.B. ["254026000", ...])
+        table_ids: Tabellen-IDs (z.B. ["Z9200001", "Z9200002"])
+        max_workers: Maximale Anzahl gleichzeitiger LSN-Sessions
+        base_url: Basis-URL der LSN-Online Datenbank (oder des Stub-Servers)
+        cache: Optionaler HTTP-Antwort-Cache (von allen Sessions geteilt)
+        prefer_zip: ZIP-Export statt HTML-Tabelle als primäre Quelle
+        guard: Gemeinsames Rate-Limit, Circuit-Breaker und Messwerte
+
+    Returns:
+        Konsolidierter DataFrame im Langformat
+        (tabelle, region_id, jahr, merkmal, wert)
+    """
+    pool = LSNSessionPool(size=max_workers, base_url=base_url, cache=cache, guard=guard)
+    jobs = [(table_id, region_id) for region_id in region_ids for table_id in table_ids]
+    frames = []
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_region_table, pool, table_id, region_id, prefer_zip): (table_id, region_id)
+            for table_id, region_id in jobs
+        }
+        for future in as_completed(futures):
+            table_id, region_id = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"Fehler bei {table_id}/{region_id}: {e}")
+                failed.append((table_id, region_id))
+                continue
+            if df.empty:
+                print(f"Keine Daten für {table_id}/{region_id}")
+                failed.append((table_id, region_id))
+                continue
+            frames.append(df)
+
+    print(f"{len(jobs) - len(failed)}/{len(jobs)} Abfragen erfolgreich")
+    for table_id, stats in pool.stats.summary().items():
+        print(f"  Generierungsdauer {table_id}: Median {stats['median_s']}s, Max {stats['max_s']}s "
+              f"(zusätzlich Rate-Limit/Backoff: Median {stats['wartezeit_median_s']}s)")
 
-    return df
+    if not frames:
+        return pd.DataFrame(columns=["tabelle", "region_id", "jahr", "merkmal", "wert"])
+    result = pd.concat(frames, ignore_index=True)
+    return result.sort_values(["tabelle", "region_id", "jahr", "merkmal"], ignore_index=True)
 
 
-def main_api():
+def store_in_warehouse(df: pd.DataFrame, abruf: str, quelle_url: str, warehouse_dir: Path | None):
+    """Übernimmt Langformat-Daten ins LSN-Warehouse (idempotent)."""
+    if warehouse_dir is None or df.empty:
+        return
+    if lsn_warehouse.pa is None:
+        print("pyarrow nicht installiert - Warehouse nicht aktualisiert")
+        print("Installation: pip install pyarrow")
+        return
+    with REPORT.phase("write"):
+        counts = lsn_warehouse.upsert_frame(df, abruf, quelle_url, warehouse_dir=warehouse_dir)
+    print(f"Warehouse: {counts['zeilen_neu']} neue, {counts['zeilen_geaendert']} geänderte Zeilen, "
+          f"{counts['partitionen_geschrieben']} von "
+          f"{counts['partitionen_geschrieben'] + counts['partitionen_unveraendert']} Partitionen geschrieben "
+          f"({warehouse_dir})")
+
+
+def main_batch(
+    region_ids: list[str],
+    table_ids: list[str],
+    max_workers: int,
+    base_url: str,
+    cache: ResponseCache | None = None,
+    prefer_zip: bool = False,
+    guard: RequestGuard | None = None,
+    warehouse_dir: Path | None = lsn_warehouse.WAREHOUSE_DIR
+):
+    """Hauptfunktion für den Batch-Abruf mehrerer Regionen und Tabellen."""
+    print("=" * 60)
+    print("LSN-Online Datenbank - Batch-Modus")
+    print(f"Regionen: {len(region_ids)}, Tabellen: {len(table_ids)}, Sessions: {max_workers}")
+    print("=" * 60)
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    guard = guard or RequestGuard()
+    df = fetch_batch(
+        region_ids, table_ids,
+        max_workers=max_workers, base_url=base_url, cache=cache, prefer_zip=prefer_zip, guard=guard
+    )
+    if cache is not None:
+        print(cache.summary())
+    print(guard.metrics.summary())
+
+    csv_path = DATA_DIR / "lsn_batch.csv"
+    with REPORT.phase("write"):
+        df.to_csv(csv_path, index=False, encoding="utf-8")
+    print(f"CSV gespeichert: {csv_path} ({len(df)} Zeilen)")
+    store_in_warehouse(df, "batch", base_url, warehouse_dir)
+
+
+def main_api(
+    base_url: str = LSN_BASE_URL,
+    cache: ResponseCache | None = None,
+    prefer_zip: bool = False,
+    guard: RequestGuard | None = None,
+    warehouse_dir: Path | None = lsn_warehouse.WAREHOUSE_DIR
+):
     """Hauptfunktion für API-basierten Abruf."""
     print("=" * 60)
     print("LSN-Online Datenbank - API-Client")
@@ -251,26 +705,30 @@ def main_api():
 
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    client = LSNApiClient()
-
-    if not client.start_session():
-        print("Konnte keine Session starten!")
-        return
+    client = LSNApiClient(base_url=base_url, cache=cache, guard=guard)
 
     # Abruf Steuereinnahmen-Zeitreihe
     print("\n--- Steuereinnahmen (Zeitreihe) ---")
-    df = fetch_steuereinnahmen_zeitreihe(client)
+    try:
+        df = fetch_steuereinnahmen_zeitreihe(client, prefer_zip=prefer_zip)
+    except requests.RequestException as e:
+        # Verbindungsfehler, offener Circuit-Breaker oder fehlender Cache-Eintrag (--offline)
+        print(f"Abruf fehlgeschlagen: {e}")
+        df = pd.DataFrame()
 
     if not df.empty:
         # Speichere als CSV
         csv_path = DATA_DIR / "lsn_steuereinnahmen_nordstemmen.csv"
-        df.to_csv(csv_path, index=False, encoding="utf-8")
+        with REPORT.phase("write"):
+            df.to_csv(csv_path, index=False, encoding="utf-8")
         print(f"CSV gespeichert: {csv_path}")
 
         # Speichere als Excel
         xlsx_path = DATA_DIR / "lsn_steuereinnahmen_nordstemmen.xlsx"
-        df.to_excel(xlsx_path, index=False)
+        with REPORT.phase("write"):
+            df.to_excel(xlsx_path, index=False)
         print(f"Excel gespeichert: {xlsx_path}")
+        store_in_warehouse(table_to_long_format(df, "Z9200001", GEMEINDE_LSN_ID), "api", base_url, warehouse_dir)
 
         # Zeige Vorschau
         print(f"\nDaten-Vorschau ({len(df)} Zeilen):")
@@ -297,88 +755,34 @@ def main_api():
     print(f"\nMetadaten gespeichert: {meta_path}")
 
 
-async def main_browser():
-    """Hauptfunktion für Browser-basierten Abruf mit Playwright."""
+async def main_browser(
+    region_ids: list[str],
+    table_ids: list[str],
+    workers: int = 3,
+    base_url: str = LSN_BASE_URL,
+    warehouse_dir: Path | None = lsn_warehouse.WAREHOUSE_DIR
+):
+    """Hauptfunktion für den Browser-Abruf (headless Playwright-Pool, ohne Interaktion)."""
     try:
-        from playwright.async_api import async_playwright
+        from lsn_browser import fetch_batch_browser
     except ImportError:
         print("Playwright nicht installiert!")
         print("Installation: pip install playwright && playwright install chromium")
         return
 
     print("=" * 60)
-    print("LSN-Online Datenbank - Browser-Modus (Playwright)")
-    print(f"Gemeinde: {GEMEINDE_NAME}")
+    print("LSN-Online Datenbank - Browser-Modus (Playwright, headless)")
+    print(f"Regionen: {len(region_ids)}, Tabellen: {len(table_ids)}, Browser-Kontexte: {workers}")
     print("=" * 60)
 
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    screenshots_dir = DATA_DIR / "screenshots"
-    screenshots_dir.mkdir(exist_ok=True)
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)  # headless=True für Server
-        context = await browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            locale="de-DE"
-        )
-        page = await context.new_page()
-
-        try:
-            # 1. Startseite laden
-            print("Lade Startseite...")
-            await page.goto(f"{LSN_BASE_URL}/default.asp")
-            await page.screenshot(path=screenshots_dir / "01_start.png")
-
-            # 2. Session starten
-            print("Starte Session...")
-            await page.click('input[value="WEITER"]')
-            await page.wait_for_load_state("networkidle")
-            await page.screenshot(path=screenshots_dir / "02_hauptseite.png")
-
-            # 3. Navigiere zu Menü "Staat & Gesellschaft"
-            print("Navigiere zu Staat & Gesellschaft...")
-            frame = page.frame_locator("frame[name='haupt']").frame_locator("iframe")
-            await frame.get_by_role("button", name="Staat & Gesellschaft").click()
-            await page.wait_for_timeout(2000)
-            await page.screenshot(path=screenshots_dir / "03_staat_gesellschaft.png")
-
-            # 4. Finde und klicke auf Steuereinnahmen-Tabelle
-            print("Suche Steuereinnahmen-Tabelle...")
-            # Die Tabelle wird via JavaScript geladen
-            await frame.get_by_text("Z9200001").click()
-            await page.wait_for_timeout(2000)
-            await page.screenshot(path=screenshots_dir / "04_tabelle_param.png")
-
-            # 5. Wähle Nordstemmen
-            print(f"Wähle {GEMEINDE_NAME}...")
-            # Setze Ebene auf Mitgliedsgemeinde
-            await frame.get_by_text("Mitgliedsgemeinde").click()
-            await page.wait_for_timeout(2000)
-
-            # Filter auf Nordstemmen
-            await frame.locator('input[name="RANGE0"]').fill(GEMEINDE_KURZFORM)
-            await frame.locator('input[name="RANGE1"]').fill(GEMEINDE_KURZFORM)
-            await frame.get_by_text("OK").click()
-            await page.wait_for_timeout(2000)
-            await page.screenshot(path=screenshots_dir / "05_gemeinde_filter.png")
-
-            # 6. Checkbox aktivieren und Tabelle generieren
-            await frame.locator(f'input[value="{GEMEINDE_LSN_ID}"]').check()
-            # Klicke auf "Weiter" oder ähnlichen Button
-            await page.screenshot(path=screenshots_dir / "06_vor_generierung.png")
-
-            print("\n=== HINWEIS ===")
-            print("Browser-Modus offen für manuelle Interaktion.")
-            print("Screenshots wurden in data/screenshots/ gespeichert.")
-            print("Drücke Enter zum Beenden...")
-            input()
+    df = await fetch_batch_browser(region_ids, table_ids, workers=workers, base_url=base_url)
 
-        except Exception as e:
-            print(f"Fehler: {e}")
-            await page.screenshot(path=screenshots_dir / "error.png")
-
-        finally:
-            await browser.close()
+    csv_path = DATA_DIR / "lsn_browser.csv"
+    with REPORT.phase("write"):
+        df.to_csv(csv_path, index=False, encoding="utf-8")
+    print(f"CSV gespeichert: {csv_path} ({len(df)} Zeilen)")
+    store_in_warehouse(df, "browser", base_url, warehouse_dir)
 
 
 def main():
@@ -391,14 +795,71 @@ def main():
         action="store_true",
         help="Browser-Modus mit Playwright verwenden"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Mehrere Regionen und Tabellen parallel abrufen"
+    )
+    parser.add_argument(
+        "--regions",
+        nargs="+",
+        default=[GEMEINDE_LSN_ID],
+        help="LSN-Regions-IDs für den Batch-Modus"
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        default=list(TABLES),
+        help="Tabellen-IDs für den Batch-Modus"
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=4,
+        help="Maximale Anzahl paralleler LSN-Sessions (im Browser-Modus: Browser-Kontexte)"
+    )
+    parser.add_argument(
+        "--base-url",
+        default=LSN_BASE_URL,
+        help="Basis-URL der LSN-Online Datenbank (z.B. lokaler Stub-Server)"
+    )
+    parser.add_argument(
+        "--zip",
+        action="store_true",
+        help="ZIP-Export (XLSX/CSV) statt HTML-Tabelle als primäre Quelle nutzen"
+    )
+    parser.add_argument(
+        "--warehouse",
+        type=Path,
+        default=lsn_warehouse.WAREHOUSE_DIR,
+        help="Verzeichnis des LSN-Warehouse (Parquet)"
+    )
+    parser.add_argument(
+        "--no-warehouse",
+        action="store_true",
+        help="Abgerufene Tabellen nicht ins Warehouse übernehmen"
+    )
+    add_cache_arguments(parser)
+    add_transport_arguments(parser)
+    add_instrumentation_arguments(parser)
 
     args = parser.parse_args()
-
-    if args.browser:
-        import asyncio
-        asyncio.run(main_browser())
-    else:
-        main_api()
+    cache = cache_from_args(args)
+    guard = guard_from_args(args)
+    warehouse_dir = None if args.no_warehouse else args.warehouse
+
+    with instrumented("fetch_lsn_data", args):
+        if args.browser:
+            import asyncio
+            asyncio.run(main_browser(args.regions, args.tables, args.workers, args.base_url, warehouse_dir))
+        elif args.batch:
+            main_batch(args.regions, args.tables, args.workers, args.base_url, cache, args.zip, guard, warehouse_dir)
+        else:
+            main_api(args.base_url, cache, args.zip, guard, warehouse_dir)
+            print(guard.metrics.summary())
+    if args.metrics:
+        guard.metrics.save(args.metrics)
+        print(f"Messwerte gespeichert: {args.metrics}")
 
 
 if __name__ == "__main__":
@@ -4,22 +4,45 @@ Script zum Abrufen von Haushaltsdaten vom MCP Server Nordstemmen.
 
 Verwendung:
     python fetch_mcp_data.py
+    python fetch_mcp_data.py --offline   # nur HTTP-Cache, kein Netzwerk
+    python fetch_mcp_data.py --refresh   # Cache ignorieren und neu abrufen
+    python fetch_mcp_data.py --serial    # ohne httpx, Anfragen nacheinander
+    python fetch_mcp_data.py --incremental  # nur neue Dokumente (data/mcp_manifest.json)
+    python fetch_mcp_data.py --store data/mcp_raw.ndjson.zst  # zstd-komprimiert
 
 Ausgabe:
-    - data/haushalt_mcp_raw.json  (Rohdaten)
+    - data/mcp_raw.ndjson  (Rohdaten, append-only, siehe raw_store.py)
     - data/haushalt_extracted.yaml (Strukturierte Daten)
 """
 
-import json
-import requests
+import argparse
 import yaml
 from pathlib import Path
 from datetime import datetime
+from typing import Callable, Iterable
 import re
+import sys
+
+from http_cache import ResponseCache, add_cache_arguments, cache_from_args
+from instrumentation import REPORT, add_instrumentation_arguments, instrumented
+from raw_store import RAW_STORE_PATH, RawStore, open_store
+from transport import Transport, add_transport_arguments, guard_from_args
 
 MCP_URL = "https://nordstemmen-mcp.levinkeller.de/mcp"  # NOTE: This proxy may be unavailable. Use Claude Code MCP integration instead.
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Höchstzahl Treffer je Suchanfrage (Parameter limit der Suche)
+SEARCH_LIMIT = 10
+
+# Optionaler HTTP-Cache für call_mcp (wird in main() gesetzt)
+CACHE: ResponseCache | None = None
+
+# Transport mit Rate-Limit, Wiederholungen und Circuit-Breaker (main() setzt die Schalter)
+TRANSPORT = Transport(timeout=60)
+
+# Empfänger für Rohdatensätze: sink(art, daten, **felder), z.B. RawStore.append
+Sink = Callable[..., None]
+
 
 def call_mcp(method: str, params: dict = None) -> dict:
     """Ruft MCP Server JSON-RPC Endpunkt auf."""
@@ -31,17 +54,35 @@ def call_mcp(method: str, params: dict = None) -> dict:
     if params:
         payload["params"] = params
 
-    response = requests.post(
-        MCP_URL,
-        json=payload,
-        headers={"Content-Type": "application/json"},
-        timeout=60
-    )
+    with REPORT.phase("mcp_call"):
+        if CACHE is not None:
+            response = CACHE.request(
+                TRANSPORT.request,
+                "POST",
+                MCP_URL,
+                json=payload,
+                headers={"Content-Type": "application/json"}
+            )
+        else:
+            response = TRANSPORT.request(
+                "POST",
+                MCP_URL,
+                json=payload,
+                headers={"Content-Type": "application/json"}
+            )
     response.raise_for_status()
-    return response.json()
+    with REPORT.phase("parse"):
+        return response.json()
+
+
+def structured_content(result: dict) -> dict:
+    """Liefert structuredContent einer tools/call-Antwort (leer bei Fehlern)."""
+    if "result" in result and "structuredContent" in result["result"]:
+        return result["result"]["structuredContent"]
+    return {}
 
 
-def search_haushalt_documents(query: str, limit: int = 10, date_from: str = None) -> list:
+def search_haushalt_documents(query: str, limit: int = SEARCH_LIMIT, date_from: str = None) -> list:
     """Sucht nach Haushaltsdokumenten."""
     args = {"query": query, "limit": limit}
     if date_from:
@@ -52,9 +93,7 @@ def search_haushalt_documents(query: str, limit: int = 10, date_from: str = None
         "arguments": args
     })
 
-    if "result" in result and "structuredContent" in result["result"]:
-        return result["result"]["structuredContent"]["results"]
-    return []
+    return structured_content(result).get("results", [])
 
 
 def get_paper(reference: str) -> dict:
@@ -64,19 +103,22 @@ def get_paper(reference: str) -> dict:
         "arguments": {"reference": reference}
     })
 
-    if "result" in result and "structuredContent" in result["result"]:
-        return result["result"]["structuredContent"]
-    return {}
+    return structured_content(result)
 
 
-def extract_numbers_from_text(text: str) -> dict:
+# Pattern für deutsche Zahlendarstellung
+NUMBER_PATTERN = re.compile(r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*(?:€|EUR)?')
+
+
+def extract_numbers_from_text(text: str) -> list[float]:
     """
     Extrahiert Zahlen aus Haushaltstext.
     Erkennt Muster wie "13.783.548,35" oder "13446200"
+
+    Für große Textmengen, Vorzeichen und Einheiten (T€, Mio. €) siehe
+    amounts.extract_amounts_batch.
     """
-    # Pattern für deutsche Zahlendarstellung
-    pattern = r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*(?:€|EUR)?'
-    matches = re.findall(pattern, text)
+    matches = NUMBER_PATTERN.findall(text)
 
     numbers = []
     for match in matches:
@@ -90,11 +132,29 @@ def extract_numbers_from_text(text: str) -> dict:
     return numbers
 
 
-def fetch_all_haushalt_data():
-    """Hauptfunktion: Holt alle Haushaltsdaten."""
-    print("Starte Datenabfrage vom MCP Server...")
-
-    all_data = {
+# Suchanfragen für verschiedene Haushaltsjahre
+SEARCHES = [
+    {"query": "Haushaltsplan 2025 Ergebnishaushalt Finanzhaushalt", "date_from": "2024-01-01"},
+    {"query": "Haushaltsplan 2024 Ergebnishaushalt", "date_from": "2023-01-01"},
+    {"query": "Haushaltsplan 2023 Haushalt", "date_from": "2022-01-01"},
+    {"query": "Haushaltsplan 2022 2021 2020", "date_from": "2019-01-01"},
+    {"query": "Jahresrechnung Jahresabschluss", "date_from": "2020-01-01"},
+    {"query": "Haushaltssicherungskonzept", "date_from": "2023-01-01"},
+]
+
+# Wichtige Drucksachen, die direkt abgerufen werden
+IMPORTANT_PAPERS = [
+    "DS 89/2024",      # Haushaltsplan 2025
+    "DS 85/2023",      # Haushaltsplan 2024
+    "DS 36/2023",      # Nachtragshaushalt 2023
+    "DS 26/2025",      # Jahresabschluss 2024
+    "DS 103/2025",     # Haushaltsplan 2026
+]
+
+
+def new_raw_data() -> dict:
+    """Leere Rohdatenstruktur mit Metadaten."""
+    return {
         "metadata": {
             "fetched_at": datetime.now().isoformat(),
             "source": MCP_URL,
@@ -104,100 +164,215 @@ def fetch_all_haushalt_data():
         "papers": []
     }
 
-    # Suchanfragen für verschiedene Haushaltsjahre
-    searches = [
-        {"query": "Haushaltsplan 2025 Ergebnishaushalt Finanzhaushalt", "date_from": "2024-01-01"},
-        {"query": "Haushaltsplan 2024 Ergebnishaushalt", "date_from": "2023-01-01"},
-        {"query": "Haushaltsplan 2023 Haushalt", "date_from": "2022-01-01"},
-        {"query": "Haushaltsplan 2022 2021 2020", "date_from": "2019-01-01"},
-        {"query": "Jahresrechnung Jahresabschluss", "date_from": "2020-01-01"},
-        {"query": "Haushaltssicherungskonzept", "date_from": "2023-01-01"},
-    ]
+
+def add_search(all_data: dict, search: dict, results: list[dict], sink: Sink | None = None):
+    """
+    Nimmt die Treffer einer Suche auf.
+
+    Mit sink werden die Treffer sofort weitergereicht und nicht in
+    all_data behalten (dort steht dann nur result_count).
+    """
+    entry = {
+        "query": search["query"],
+        "date_from": search.get("date_from"),
+        "result_count": len(results),
+        "results": results
+    }
+    if sink is not None:
+        sink("suche", {k: v for k, v in entry.items() if k != "results"})
+        for result in results:
+            sink("treffer", result, query=search["query"])
+        entry["results"] = []
+    all_data["searches"].append(entry)
+
+
+def add_paper(all_data: dict, paper: dict, sink: Sink | None = None):
+    """Nimmt eine Drucksache auf (mit sink nur als Referenz in all_data)."""
+    if sink is not None:
+        sink("drucksache", paper)
+        paper = {"reference": paper.get("reference", "")}
+    all_data["papers"].append(paper)
+
+
+def fetch_all_haushalt_data(
+    searches: list[dict] = SEARCHES,
+    papers: list[str] = IMPORTANT_PAPERS,
+    sink: Sink | None = None
+):
+    """Hauptfunktion: Holt alle Haushaltsdaten."""
+    print("Starte Datenabfrage vom MCP Server...")
+
+    all_data = new_raw_data()
+    if sink is not None:
+        sink("lauf", all_data["metadata"])
 
     for search in searches:
         print(f"  Suche: {search['query'][:50]}...")
         try:
             results = search_haushalt_documents(
                 search["query"],
-                limit=10,
+                limit=SEARCH_LIMIT,
                 date_from=search.get("date_from")
             )
-            all_data["searches"].append({
-                "query": search["query"],
-                "date_from": search.get("date_from"),
-                "result_count": len(results),
-                "results": results
-            })
+            add_search(all_data, search, results, sink)
         except Exception as e:
             print(f"    Fehler: {e}")
 
     # Wichtige Drucksachen direkt abrufen
-    important_papers = [
-        "DS 89/2024",      # Haushaltsplan 2025
-        "DS 85/2023",      # Haushaltsplan 2024
-        "DS 36/2023",      # Nachtragshaushalt 2023
-        "DS 26/2025",      # Jahresabschluss 2024
-        "DS 103/2025",     # Haushaltsplan 2026
-    ]
-
-    for ref in important_papers:
+    for ref in papers:
         print(f"  Hole Drucksache: {ref}...")
         try:
             paper = get_paper(ref)
             if paper:
-                all_data["papers"].append(paper)
+                add_paper(all_data, paper, sink)
         except Exception as e:
             print(f"    Fehler: {e}")
 
     return all_data
 
 
-def save_data(data: dict):
-    """Speichert die Daten."""
+def save_data(store: RawStore):
+    """Extrahiert die strukturierten Daten aus dem Rohdatenspeicher (als Stream)."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Rohdaten als JSON
-    json_path = DATA_DIR / "haushalt_mcp_raw.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"Rohdaten gespeichert: {json_path}")
+    store.flush()
+    print(f"Rohdaten gespeichert: {store.path}")
 
     # Extrahierte Daten als YAML
-    extracted = extract_structured_data(data)
+    with REPORT.phase("parse"):
+        extracted = extract_structured_data(store.iter_records())
+    REPORT.count("rows", len(extracted["dokumente"]))
     yaml_path = DATA_DIR / "haushalt_extracted.yaml"
-    with open(yaml_path, "w", encoding="utf-8") as f:
+    with REPORT.phase("write"), open(yaml_path, "w", encoding="utf-8") as f:
         yaml.dump(extracted, f, allow_unicode=True, default_flow_style=False)
     print(f"Strukturierte Daten gespeichert: {yaml_path}")
 
 
-def extract_structured_data(data: dict) -> dict:
-    """Extrahiert strukturierte Haushaltsdaten aus den Rohdaten."""
+def document_key(result: dict) -> str:
+    """Eindeutiger Schlüssel eines Suchtreffers (file_hash, sonst oparl_id)."""
+    return result.get("file_hash") or result.get("oparl_id") or ""
+
+
+def fetch_data(
+    searches: list[dict] = SEARCHES,
+    papers: list[str] = IMPORTANT_PAPERS,
+    serial: bool = False,
+    concurrency: int = 8,
+    sink: Sink | None = None
+) -> dict:
+    """Holt die Daten parallel (httpx) oder seriell; sink erhält die Datensätze beim Eintreffen."""
+    if not serial:
+        try:
+            import asyncio
+            from mcp_async import fetch_all_haushalt_data_async
+        except ImportError:
+            print("httpx nicht installiert, nutze serielle Abfrage (pip install httpx)")
+        else:
+            return asyncio.run(fetch_all_haushalt_data_async(
+                searches, papers, max_concurrency=concurrency, cache=CACHE, guard=TRANSPORT.guard, sink=sink
+            ))
+    return fetch_all_haushalt_data(searches, papers, sink)
+
+
+def extract_structured_data(records: Iterable[dict]) -> dict:
+    """
+    Extrahiert strukturierte Haushaltsdaten aus einem Strom von Rohdatensätzen
+    (RawStore.iter_records(); altes JSON über raw_store.raw_data_records).
+    """
     extracted = {
-        "metadata": data["metadata"],
+        "metadata": {},
         "dokumente": [],
         "haushaltsjahre": {}
     }
 
     # Sammle alle gefundenen Dokumente
     seen_hashes = set()
-    for search in data.get("searches", []):
-        for result in search.get("results", []):
-            file_hash = result.get("file_hash", "")
-            if file_hash and file_hash not in seen_hashes:
-                seen_hashes.add(file_hash)
-                extracted["dokumente"].append({
-                    "titel": result.get("title", ""),
-                    "referenz": result.get("reference", ""),
-                    "datum": result.get("date", ""),
-                    "pdf_url": result.get("pdf_url", ""),
-                    "oparl_id": result.get("oparl_id", ""),
-                    "excerpt": result.get("excerpt", "")[:500] if result.get("excerpt") else ""
-                })
+    for record in records:
+        if record["art"] == "lauf":
+            # Erster Lauf liefert die Metadaten, spätere nur den Synchronisationsstand
+            if extracted["metadata"]:
+                extracted["metadata"]["synced_at"] = record["daten"].get("fetched_at")
+            else:
+                extracted["metadata"] = dict(record["daten"])
+            continue
+        if record["art"] != "treffer":
+            continue
+        result = record["daten"]
+        file_hash = document_key(result)
+        if file_hash and file_hash not in seen_hashes:
+            seen_hashes.add(file_hash)
+            extracted["dokumente"].append({
+                "titel": result.get("title", ""),
+                "referenz": result.get("reference", ""),
+                "datum": result.get("date", ""),
+                "pdf_url": result.get("pdf_url", ""),
+                "oparl_id": result.get("oparl_id", ""),
+                "excerpt": result.get("excerpt", "")[:500] if result.get("excerpt") else ""
+            })
 
     return extracted
 
 
-if __name__ == "__main__":
-    data = fetch_all_haushalt_data()
-    save_data(data)
+def main():
+    """Haupteinstiegspunkt."""
+    global CACHE, TRANSPORT
+
+    parser = argparse.ArgumentParser(
+        description="Haushaltsdaten vom MCP Server Nordstemmen abrufen"
+    )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=int,
+        default=8,
+        help="Maximale Anzahl paralleler Anfragen (asynchroner Client)"
+    )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Anfragen nacheinander ausführen (ohne httpx)"
+    )
+    parser.add_argument(
+        "--incremental", "-i",
+        action="store_true",
+        help="Nur neue Dokumente abrufen und in die vorhandenen Rohdaten einfügen"
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=RAW_STORE_PATH,
+        help="Rohdatenspeicher (NDJSON, Endung .zst für zstd-Kompression)"
+    )
+    add_cache_arguments(parser)
+    add_transport_arguments(parser)
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    CACHE = cache_from_args(args)
+    TRANSPORT = Transport(guard=guard_from_args(args), timeout=60)
+
+    try:
+        with instrumented("fetch_mcp_data", args), open_store(args.store) as store:
+            if args.incremental:
+                from mcp_sync import incremental_sync
+                incremental_sync(
+                    lambda searches, papers, sink: fetch_data(searches, papers, args.serial, args.concurrency, sink),
+                    store
+                )
+            else:
+                # Vollständiger Abruf ersetzt die bisherigen Rohdaten
+                store.clear()
+                fetch_data(serial=args.serial, concurrency=args.concurrency, sink=store.append)
+            save_data(store)
+            if CACHE is not None:
+                print(CACHE.summary())
+            print(TRANSPORT.guard.metrics.summary())
+    except ImportError as e:
+        # zstandard fehlt für einen .zst-Speicher
+        print(e)
+        sys.exit(1)
+    if args.metrics:
+        TRANSPORT.guard.metrics.save(args.metrics)
+        print(f"Messwerte gespeichert: {args.metrics}")
     print("\nFertig!")
+
+
+if __name__ == "__main__":
+    main()
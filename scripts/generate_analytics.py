@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Vorberechnete Kennzahlen für die Astro-Seiten.
+
+Die Seiten (analyse, einnahmen, ausgaben, haushalt/[year]) lesen bisher alle
+Jahresdateien aus src/content/haushalte/ und berechnen Summen, Anteile und
+Vergleiche beim Build in Template-Schleifen. Dieses Skript überführt die
+Jahresdateien einmal in die Haushaltsmatrix (Positionen x Jahre) und
+berechnet alle Kennzahlen in einem vektorisierten Durchlauf:
+
+    - Anteile an Gesamterträgen bzw. -aufwendungen
+    - Veränderung zum Vorjahr (absolut und relativ)
+    - Werte je Einwohner (LSN-Bevölkerungsstand aus dem Warehouse, Tabelle
+      EINWOHNER_TABELLE, sonst metadata.einwohner)
+    - CAGR über die Ist-Jahre und über den Planungszeitraum
+    - Wachstum erstes -> letztes Ist-Jahr (Tabellen der Analyse-Seite)
+    - Plan-Ist-Abweichungen (plan_ist), nur wenn extract_haushalt_pdf.py
+      Planwerte für abgerechnete Jahre unter data/pdf_extrakt/plan/
+      abgelegt hat; die Jahresdateien selbst enthalten für abgerechnete
+      Jahre nur Ist-Werte, ohne PDF-Extraktion fehlt der Abschnitt
+
+Ergebnis ist eine kompakte JSON-Datei (spaltenorientiert, ein Array je
+Position), die die Seiten direkt importieren. Optional wird das Langformat
+zusätzlich als Parquet geschrieben.
+
+Verwendung:
+    python generate_analytics.py
+    python generate_analytics.py --parquet data/analytics.parquet
+
+Ausgabe:
+    - src/data/analytics.json
+
+Die Datei enthält den Hash der Jahresdateien (quellen_sha256); der
+Astro-Build bricht ab, wenn er nicht mehr zu src/content/haushalte/ passt
+(siehe src/lib/analytics.ts). Nach jeder Datenänderung also dieses
+Skript ausführen (oder: python haushalt.py render analytics).
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_mermaid import write_if_changed
+from haushalt_matrix import CONTENT_DIR, HaushaltMatrix, load_haushalt_matrix, load_records
+from haushalt_schema import GROUPS
+
+ROOT_DIR = Path(__file__).parent.parent
+DATA_DIR = ROOT_DIR / "data"
+PLAN_DIR = DATA_DIR / "pdf_extrakt" / "plan"
+WAREHOUSE_DIR = DATA_DIR / "lsn_warehouse"
+OUTPUT_PATH = ROOT_DIR / "src" / "data" / "analytics.json"
+
+ARTIFACT_VERSION = 1
+
+# Bezugsgröße der Anteile je Gruppe (Zeile in "summen")
+SHARE_TOTALS = {"ertraege": "gesamtertraege", "aufwendungen": "gesamtaufwendungen"}
+
+
+def parse_einwohner(value) -> float | None:
+    """metadata.einwohner wie 12500 oder "~12500"."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    digits = re.sub(r"\D", "", str(value or ""))
+    return float(digits) if digits else None
+
+
+def load_einwohner(years: np.ndarray, fallback: float | None,
+                   warehouse_dir: Path = WAREHOUSE_DIR) -> tuple[np.ndarray, list[str]]:
+    """
+    Einwohnerzahl je Jahr.
+
+    Jahre mit LSN-Bevölkerungsstand (Merkmal EINWOHNER_MERKMAL der Tabelle
+    EINWOHNER_TABELLE im Warehouse) nutzen diesen, Jahre außerhalb der
+    LSN-Zeitreihe den nächstgelegenen LSN-Wert, ohne LSN-Daten gilt
+    metadata.einwohner für alle Jahre.
+
+    Returns:
+        (einwohner, quelle je Jahr: "lsn", "lsn_fortgeschrieben" oder "metadata")
+    """
+    einwohner = np.full(len(years), np.nan if fallback is None else fallback)
+    quelle = ["metadata"] * len(years)
+
+    import lsn_warehouse
+    from fetch_lsn_data import EINWOHNER_MERKMAL, EINWOHNER_TABELLE, GEMEINDE_LSN_ID
+
+    if lsn_warehouse.pa is None or not lsn_warehouse.partition_path(
+            EINWOHNER_TABELLE, GEMEINDE_LSN_ID, warehouse_dir).exists():
+        return einwohner, quelle
+
+    df = lsn_warehouse.read_partition(EINWOHNER_TABELLE, GEMEINDE_LSN_ID, warehouse_dir)
+    series = df[df["merkmal"] == EINWOHNER_MERKMAL].dropna(subset=["wert"]).groupby("jahr")["wert"].first()
+    if series.empty:
+        return einwohner, quelle
+
+    lsn_years = series.index.to_numpy(dtype=np.int64)
+    nearest = np.abs(years[:, None] - lsn_years[None, :]).argmin(axis=1)
+    einwohner = series.to_numpy(dtype=float)[nearest]
+    exact = np.isin(years, lsn_years)
+    quelle = ["lsn" if hit else "lsn_fortgeschrieben" for hit in exact]
+    return einwohner, quelle
+
+
+def content_digest(content_dir: Path = CONTENT_DIR) -> str:
+    """
+    SHA-256 über die Jahresdateien (Dateiname und Inhalt, nach Namen sortiert).
+
+    src/lib/analytics.ts berechnet denselben Hash beim Build und bricht ab,
+    wenn analytics.json zu anderen Jahresdateien gehört.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(content_dir.glob("*.json"), key=lambda p: p.name):
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+def _cagr(start: np.ndarray, end: np.ndarray, periods: int) -> np.ndarray:
+    """Jährliche Wachstumsrate; NaN, wenn ein Randwert nicht positiv ist."""
+    result = np.full(start.shape, np.nan)
+    if periods <= 0:
+        return result
+    valid = (start > 0) & (end > 0)
+    result[valid] = (end[valid] / start[valid]) ** (1 / periods) - 1
+    return result
+
+
+def compute_metrics(matrix: HaushaltMatrix, einwohner: np.ndarray, plan: HaushaltMatrix | None = None) -> dict:
+    """
+    Alle Kennzahlen in einem Durchlauf über die Matrix (Positionen x Jahre).
+
+    Returns:
+        {kennzahl: ndarray} mit Positionen x Jahre bzw. je Position
+    """
+    values = matrix.values
+    years = matrix.years
+    typ = np.array([matrix.metadata["typ"].get(int(year), "") for year in years])
+    ist = typ == "ist"
+
+    # Anteile: Zeilenindex der Bezugssumme je Position (-1 = kein Anteil)
+    row_of = {(s, k): i for i, (s, k) in enumerate(zip(matrix.sections, matrix.keys))}
+    total_rows = np.array([row_of.get(("summen", SHARE_TOTALS.get(s, "")), -1) for s in matrix.sections])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(total_rows[:, None] >= 0, values / values[total_rows], np.nan)
+
+        delta = np.full(values.shape, np.nan)
+        delta[:, 1:] = np.diff(values, axis=1)
+        previous = np.full(values.shape, np.nan)
+        previous[:, 1:] = values[:, :-1]
+        delta_pct = np.where(previous != 0, delta / np.abs(previous), np.nan)
+
+        per_capita = values / einwohner[None, :]
+
+    ist_cols = np.flatnonzero(ist)
+    first_ist, last_ist = (ist_cols[0], ist_cols[-1]) if len(ist_cols) else (0, 0)
+    start, end = values[:, first_ist], values[:, last_ist]
+    metrics = {
+        "typ": typ,
+        "anteil": shares,
+        "veraenderung": delta,
+        "veraenderung_prozent": delta_pct,
+        "pro_kopf": per_capita,
+        "cagr_ist": _cagr(start, end, int(years[last_ist] - years[first_ist])),
+        "cagr_plan": _cagr(end, values[:, -1], int(years[-1] - years[last_ist])),
+        "start": start,
+        "ende": end,
+        "erstes_ist": int(years[first_ist]),
+        "letztes_ist": int(years[last_ist]),
+    }
+
+    if plan is not None:
+        # Planwerte auf die Jahre der Ist-Matrix ausrichten, nur abgerechnete Jahre vergleichen
+        plan_values = np.full(values.shape, np.nan)
+        plan_rows = {(s, k): i for i, (s, k) in enumerate(zip(plan.sections, plan.keys))}
+        rows = np.array([plan_rows.get(pair, -1) for pair in zip(matrix.sections, matrix.keys)])
+        cols = np.searchsorted(years, plan.years)
+        in_range = (cols < len(years)) & (years[np.minimum(cols, len(years) - 1)] == plan.years)
+        plan_values[np.ix_(rows >= 0, cols[in_range])] = plan.values[np.ix_(rows[rows >= 0], np.flatnonzero(in_range))]
+        plan_values[:, ~ist] = np.nan
+        metrics["plan"] = plan_values
+        metrics["plan_quelle"] = plan.metadata["quelle"]
+    return metrics
+
+
+def _number(value: float, digits: int | None = None) -> int | float | None:
+    """Zahl für JSON: NaN -> null, ohne digits als ganze Zahl."""
+    if np.isnan(value):
+        return None
+    return int(round(value)) if digits is None else round(float(value), digits)
+
+
+def _clean(values: np.ndarray, digits: int | None = None) -> list:
+    """ndarray -> JSON-Liste (NaN -> null, gerundet)."""
+    return [_number(v, digits) for v in values.tolist()]
+
+
+def build_artifact(matrix: HaushaltMatrix, metrics: dict, einwohner: np.ndarray, einwohner_quelle: list[str],
+                   quellen_sha256: str = "") -> dict:
+    """Kompakte, spaltenorientierte Darstellung für die Astro-Seiten."""
+    years = matrix.years.tolist()
+    gruppen = {}
+    for group in GROUPS:
+        rows = matrix.section_rows(group)
+        entry = {}
+        for i in rows:
+            key = matrix.keys[i]
+            start, end = metrics["start"][i], metrics["ende"][i]
+            entry[key] = {
+                "werte": _clean(matrix.values[i]),
+                "veraenderung": _clean(metrics["veraenderung"][i]),
+                "veraenderung_prozent": _clean(metrics["veraenderung_prozent"][i], 4),
+                "pro_kopf": _clean(metrics["pro_kopf"][i], 2),
+                "cagr_ist": _number(metrics["cagr_ist"][i], 4),
+                "cagr_plan": _number(metrics["cagr_plan"][i], 4),
+                "wachstum": {
+                    "start": _number(start),
+                    "ende": _number(end),
+                    "veraenderung": _number(end - start),
+                    "prozent": _number((end / start - 1) * 100 if start > 0 else 0.0, 1),
+                },
+            }
+            if group in SHARE_TOTALS:
+                entry[key]["anteil"] = _clean(metrics["anteil"][i], 4)
+        gruppen[group] = entry
+
+    # Reihenfolge nach absolutem Wachstum (Analyse-Seite), bei Gleichstand Schema-Reihenfolge
+    wachstum = {}
+    for group in SHARE_TOTALS:
+        rows = matrix.section_rows(group)
+        order = np.argsort(-np.nan_to_num(metrics["ende"] - metrics["start"])[rows], kind="stable")
+        wachstum[group] = [matrix.keys[rows[j]] for j in order]
+
+    ergebnis_row = matrix.section_rows("summen")[list(GROUPS["summen"]).index("jahresergebnis")]
+    ergebnis = matrix.values[ergebnis_row]
+    ist = metrics["typ"] == "ist"
+    plan_jahre = (metrics["typ"] == "plan") & ~np.isnan(ergebnis)
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "quellen_sha256": quellen_sha256,
+        "jahre": years,
+        "typ": metrics["typ"].tolist(),
+        "erstes_ist": metrics["erstes_ist"],
+        "letztes_ist": metrics["letztes_ist"],
+        "einwohner": _clean(einwohner),
+        "einwohner_quelle": einwohner_quelle,
+        "gruppen": gruppen,
+        "wachstum": wachstum,
+        "ergebnis": {
+            "ist_jahre": int(ist.sum()),
+            "ueberschuss_jahre": int((ist & (ergebnis >= 0)).sum()),
+            "defizit_jahre": int((ist & (ergebnis < 0)).sum()),
+            "kumuliert_ist": int(np.nansum(ergebnis[ist])),
+            "max_betrag": int(np.nanmax(np.abs(ergebnis))),
+            "plan_min": int(ergebnis[plan_jahre].min()) if plan_jahre.any() else None,
+            "plan_max": int(ergebnis[plan_jahre].max()) if plan_jahre.any() else None,
+        },
+    }
+
+    if "plan" in metrics:
+        artifact["plan_ist"] = []
+        rows, cols = np.nonzero(~np.isnan(metrics["plan"]) & ~np.isnan(matrix.values))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            planned, actual = metrics["plan"][i, j], matrix.values[i, j]
+            artifact["plan_ist"].append({
+                "jahr": years[j],
+                "gruppe": matrix.sections[i],
+                "schluessel": matrix.keys[i],
+                "plan": int(planned),
+                "ist": int(actual),
+                "abweichung": int(actual - planned),
+                "abweichung_prozent": round((actual / planned - 1) * 100, 1) if planned else None,
+                "plan_quelle": metrics["plan_quelle"].get(years[j]),
+            })
+    return artifact
+
+
+def long_frame(matrix: HaushaltMatrix, metrics: dict, einwohner: np.ndarray) -> pd.DataFrame:
+    """Langformat (gruppe, schluessel, jahr, typ, wert, Kennzahlen) für Parquet."""
+    rows, cols = np.nonzero(~np.isnan(matrix.values))
+    frame = pd.DataFrame({
+        "gruppe": np.array(matrix.sections, dtype=object)[rows],
+        "schluessel": np.array(matrix.keys, dtype=object)[rows],
+        "jahr": matrix.years[cols],
+        "typ": metrics["typ"][cols],
+        "wert": matrix.values[rows, cols],
+        "einwohner": einwohner[cols],
+    })
+    for name in ("anteil", "veraenderung", "veraenderung_prozent", "pro_kopf", "plan"):
+        if name in metrics:
+            frame[name] = metrics[name][rows, cols]
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kennzahlen für die Astro-Seiten vorberechnen")
+    parser.add_argument("--content-dir", type=Path, default=CONTENT_DIR, help="Jahresdateien (JSON)")
+    parser.add_argument("--plan-dir", type=Path, default=PLAN_DIR,
+                        help="Planwerte abgerechneter Jahre (von extract_haushalt_pdf.py)")
+    parser.add_argument("--warehouse", type=Path, default=WAREHOUSE_DIR,
+                        help="LSN-Warehouse mit dem Bevölkerungsstand (lsn_warehouse.py)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Ziel-JSON")
+    parser.add_argument("--parquet", type=Path, help="Zusätzlich das Langformat als Parquet schreiben")
+    args = parser.parse_args()
+
+    records = load_records(args.content_dir)
+    if not records:
+        print(f"Keine Jahresdateien in {args.content_dir}")
+        return
+    matrix = HaushaltMatrix.from_records(records)
+    print(f"{len(records)} Jahresdateien ({matrix.years[0]}-{matrix.years[-1]})")
+
+    plan_records = load_records(args.plan_dir) if args.plan_dir.exists() else []
+    plan = HaushaltMatrix.from_records(plan_records) if plan_records else None
+    if plan_records:
+        print(f"{len(plan_records)} Plandateien für den Plan-Ist-Vergleich")
+    else:
+        print(f"Keine Plandateien in {args.plan_dir}, Plan-Ist-Vergleich entfällt "
+              f"(zuerst extract_haushalt_pdf.py ausführen)")
+
+    fallback = parse_einwohner(load_haushalt_matrix().metadata.get("metadata", {}).get("einwohner"))
+    einwohner, einwohner_quelle = load_einwohner(matrix.years, fallback, args.warehouse)
+    print(f"Einwohner: {', '.join(sorted(set(einwohner_quelle)))}")
+
+    metrics = compute_metrics(matrix, einwohner, plan)
+    artifact = build_artifact(matrix, metrics, einwohner, einwohner_quelle, content_digest(args.content_dir))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    content = json.dumps(artifact, ensure_ascii=False, separators=(",", ":")) + "\n"
+    changed = write_if_changed(args.output, content)
+    print(f"{'Gespeichert' if changed else 'Unverändert'}: {args.output} ({len(content) / 1024:.1f} KB)")
+
+    if args.parquet:
+        try:
+            long_frame(matrix, metrics, einwohner).to_parquet(args.parquet, index=False)
+        except ImportError:
+            print("pyarrow nicht installiert!")
+            print("Installation: pip install pyarrow")
+            return
+        print(f"Gespeichert: {args.parquet}")
+
+
+if __name__ == "__main__":
+    main()
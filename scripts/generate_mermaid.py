@@ -2,134 +2,145 @@
 """
 Script zum Generieren von Mermaid Sankey-Diagrammen aus den YAML-Haushaltsdaten.
 
+Die Flüsse aller angeforderten Jahre werden in einem Durchlauf über die
+Haushaltsmatrix gesammelt; Einnahmen-, Ausgaben- und Gesamtansicht werden
+aus derselben Flussliste erzeugt. Die Dateien werden parallel geschrieben,
+unveränderte Dateien (gleicher Inhalts-Hash) bleiben unberührt, damit ihr
+Änderungsdatum keinen unnötigen Astro-Rebuild auslöst.
+
 Verwendung:
     python generate_mermaid.py
+    python generate_mermaid.py --years 2010-2029
+    python generate_mermaid.py --years 2024,2026
 
 Ausgabe:
-    - docs/generated/sankey_einnahmen.md
-    - docs/generated/sankey_ausgaben.md
+    - website/docs/generated/sankey_{jahr}.md
 """
 
-import yaml
+import argparse
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from haushalt_matrix import HaushaltMatrix, load_haushalt_matrix, load_yaml
+from instrumentation import REPORT, add_instrumentation_arguments, instrumented
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 OUTPUT_DIR = Path(__file__).parent.parent / "website" / "docs" / "generated"
 
+DEFAULT_YEARS = "2024-2026"
+HAUSHALT_NODE = "Haushalt Nordstemmen"
+GEMEINDE_NODE = "Gemeinde Nordstemmen"
+
+# Richtung eines Flusses -> Abschnitt der Haushaltsmatrix
+FLOW_SECTIONS = (("einnahmen", "ertraege"), ("ausgaben", "aufwendungen"))
+
+
+class Flow(NamedTuple):
+    """Ein Fluss im Sankey-Diagramm (Wert in EUR)."""
+    year: int
+    richtung: str  # "einnahmen" oder "ausgaben"
+    name: str
+    value: float
+
 
 def load_haushalt_data() -> dict:
     """Lädt die Haushaltsdaten aus der YAML-Datei."""
-    yaml_path = DATA_DIR / "haushalt_nordstemmen.yaml"
-    with open(yaml_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return load_yaml(DATA_DIR / "haushalt_nordstemmen.yaml")
 
 
-def format_number(value: int) -> str:
+def format_number(value: float) -> str:
     """Formatiert Zahl für Mermaid (in Tausend EUR)."""
     return str(round(value / 1000))
 
 
-def generate_einnahmen_sankey(data: dict, year: int = 2025) -> str:
-    """Generiert Mermaid Sankey für Einnahmen."""
-    ertraege = data.get("ertraege", {})
-
-    lines = [
-        "```mermaid",
-        "sankey-beta",
-        "",
-        f"%% Einnahmen {year}",
+def parse_years(spec: str) -> list[int]:
+    """Jahresangabe wie "2010-2029", "2024,2026" oder "2025" als sortierte Liste."""
+    years = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = (int(year) for year in part.split("-", 1))
+            years.update(range(first, last + 1))
+        elif part:
+            years.add(int(part))
+    return sorted(years)
+
+
+def collect_flows(matrix: HaushaltMatrix, years: list[int]) -> dict[int, list[Flow]]:
+    """
+    Sammelt die positiven Flüsse aller Jahre in einem Durchlauf.
+
+    Returns:
+        {jahr: [Flow]} mit Einnahmen vor Ausgaben, jeweils in YAML-Reihenfolge
+    """
+    flows = {year: [] for year in years}
+    for richtung, section in FLOW_SECTIONS:
+        names = matrix.names(section)
+        block = matrix.year_block(section, years)
+        cols, rows = np.nonzero(block.T > 0)
+        for col, row in zip(cols.tolist(), rows.tolist()):
+            flows[years[col]].append(Flow(years[col], richtung, names[row], float(block[row, col])))
+    return flows
+
+
+def _mermaid(lines: list[str]) -> str:
+    return "\n".join(["```mermaid", "sankey-beta", "", *lines, "```"])
+
+
+def render_einnahmen(flows: list[Flow], year: int) -> str:
+    """Mermaid Sankey für Einnahmen aus der Flussliste eines Jahres."""
+    return _mermaid([f"%% Einnahmen {year}"] + [
+        f"{flow.name},{HAUSHALT_NODE},{format_number(flow.value)}"
+        for flow in flows if flow.richtung == "einnahmen"
+    ])
+
+
+def render_ausgaben(flows: list[Flow], year: int) -> str:
+    """Mermaid Sankey für Ausgaben aus der Flussliste eines Jahres."""
+    return _mermaid([f"%% Ausgaben {year}"] + [
+        f"{HAUSHALT_NODE},{flow.name},{format_number(flow.value)}"
+        for flow in flows if flow.richtung == "ausgaben"
+    ])
+
+
+def render_combined(flows: list[Flow], year: int) -> str:
+    """Kombiniertes Mermaid Sankey aus der Flussliste eines Jahres."""
+    lines = [f"%% Haushalt {year} - Gesamtübersicht", "", "%% Einnahmen zur Gemeinde"]
+    lines += [
+        f"{flow.name},{GEMEINDE_NODE},{format_number(flow.value)}"
+        for flow in flows if flow.richtung == "einnahmen"
     ]
+    lines += ["", "%% Ausgaben von der Gemeinde"]
+    lines += [
+        f"{GEMEINDE_NODE},{flow.name},{format_number(flow.value)}"
+        for flow in flows if flow.richtung == "ausgaben"
+    ]
+    return _mermaid(lines)
 
-    for key, item in ertraege.items():
-        name = item.get("name", key)
-        value = item.get("werte", {}).get(year, 0)
-        if value > 0:
-            lines.append(f"{name},Haushalt Nordstemmen,{format_number(value)}")
 
-    lines.append("```")
-    return "\n".join(lines)
+def generate_einnahmen_sankey(matrix: HaushaltMatrix, year: int = 2025) -> str:
+    """Generiert Mermaid Sankey für Einnahmen."""
+    return render_einnahmen(collect_flows(matrix, [year])[year], year)
 
 
-def generate_ausgaben_sankey(data: dict, year: int = 2025) -> str:
+def generate_ausgaben_sankey(matrix: HaushaltMatrix, year: int = 2025) -> str:
     """Generiert Mermaid Sankey für Ausgaben."""
-    aufwendungen = data.get("aufwendungen", {})
-
-    lines = [
-        "```mermaid",
-        "sankey-beta",
-        "",
-        f"%% Ausgaben {year}",
-    ]
+    return render_ausgaben(collect_flows(matrix, [year])[year], year)
 
-    for key, item in aufwendungen.items():
-        name = item.get("name", key)
-        value = item.get("werte", {}).get(year, 0)
-        if value > 0:
-            lines.append(f"Haushalt Nordstemmen,{name},{format_number(value)}")
 
-    lines.append("```")
-    return "\n".join(lines)
-
-
-def generate_combined_sankey(data: dict, year: int = 2025) -> str:
+def generate_combined_sankey(matrix: HaushaltMatrix, year: int = 2025) -> str:
     """Generiert kombiniertes Sankey für Ein- und Ausgaben."""
-    ertraege = data.get("ertraege", {})
-    aufwendungen = data.get("aufwendungen", {})
-
-    lines = [
-        "```mermaid",
-        "sankey-beta",
-        "",
-        f"%% Haushalt {year} - Gesamtübersicht",
-        "",
-        "%% Einnahmen zur Gemeinde",
-    ]
-
-    for key, item in ertraege.items():
-        name = item.get("name", key)
-        value = item.get("werte", {}).get(year, 0)
-        if value > 0:
-            lines.append(f"{name},Gemeinde Nordstemmen,{format_number(value)}")
+    return render_combined(collect_flows(matrix, [year])[year], year)
 
-    lines.append("")
-    lines.append("%% Ausgaben von der Gemeinde")
 
-    for key, item in aufwendungen.items():
-        name = item.get("name", key)
-        value = item.get("werte", {}).get(year, 0)
-        if value > 0:
-            lines.append(f"Gemeinde Nordstemmen,{name},{format_number(value)}")
-
-    lines.append("```")
-    return "\n".join(lines)
-
-
-def main():
-    """Hauptprogramm."""
-    print("Lade Haushaltsdaten...")
-    data = load_haushalt_data()
-
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Generiere Diagramme für verschiedene Jahre
-    for year in [2024, 2025, 2026]:
-        print(f"\nGeneriere Diagramme für {year}...")
-
-        # Einnahmen
-        einnahmen = generate_einnahmen_sankey(data, year)
-        print(f"  Einnahmen Sankey ({year}):")
-        print(einnahmen[:200] + "...")
-
-        # Ausgaben
-        ausgaben = generate_ausgaben_sankey(data, year)
-        print(f"  Ausgaben Sankey ({year}):")
-        print(ausgaben[:200] + "...")
-
-        # Kombiniert
-        combined = generate_combined_sankey(data, year)
-
-        # Speichere in Datei
-        md_content = f"""---
+def render_markdown(flows: list[Flow], year: int) -> str:
+    """Markdown-Seite mit allen drei Ansichten eines Jahres."""
+    return f"""---
 title: Automatisch generierte Sankey-Diagramme {year}
 ---
 
@@ -139,21 +150,63 @@ Diese Diagramme wurden automatisch aus `data/haushalt_nordstemmen.yaml` generier
 
 ## Einnahmen
 
-{einnahmen}
+{render_einnahmen(flows, year)}
 
 ## Ausgaben
 
-{ausgaben}
+{render_ausgaben(flows, year)}
 
 ## Gesamtübersicht
 
-{combined}
+{render_combined(flows, year)}
 """
-        output_path = OUTPUT_DIR / f"sankey_{year}.md"
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(md_content)
-        print(f"  Gespeichert: {output_path}")
 
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Schreibt die Datei nur bei geändertem Inhalts-Hash (atomar). True = geschrieben."""
+    data = content.encode("utf-8")
+    if path.exists() and hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest():
+        return False
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def main():
+    """Hauptprogramm."""
+    parser = argparse.ArgumentParser(description="Mermaid Sankey-Diagramme aus den Haushaltsdaten erzeugen")
+    parser.add_argument("--years", default=DEFAULT_YEARS,
+                        help=f"Jahre, z.B. 2010-2029 oder 2024,2026 (Standard: {DEFAULT_YEARS})")
+    parser.add_argument("--workers", type=int, default=4, help="Parallele Schreibvorgänge")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Zielverzeichnis")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented("generate_mermaid", args):
+        print("Lade Haushaltsdaten...")
+        with REPORT.phase("yaml_load"):
+            matrix = load_haushalt_matrix()
+        years = parse_years(args.years)
+
+        with REPORT.phase("render"):
+            flows = collect_flows(matrix, years)
+            pages = {}
+            for year in years:
+                if not flows[year]:
+                    print(f"  {year}: keine Daten, übersprungen")
+                    continue
+                pages[args.output_dir / f"sankey_{year}.md"] = render_markdown(flows[year], year)
+        REPORT.count("rows", sum(len(year_flows) for year_flows in flows.values()))
+
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        with REPORT.phase("write"), ThreadPoolExecutor(max_workers=args.workers) as executor:
+            written = dict(zip(pages, executor.map(write_if_changed, pages, pages.values())))
+        REPORT.count("bytes", sum(len(content.encode("utf-8")) for content in pages.values()))
+
+        for path, changed in written.items():
+            print(f"  {'Gespeichert' if changed else 'Unverändert'}: {path}")
+        print(f"\n{sum(written.values())} geschrieben, {len(written) - sum(written.values())} unverändert")
     print("\nFertig!")
 
 
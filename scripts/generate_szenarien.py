@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Monte-Carlo-Szenarien für die Planjahre der Haushaltssicherung.
+
+Ausgangspunkt sind die Planwerte der YAML-Datei (Jahre mit typ "plan" im
+Abschnitt jahre). Je Pfad und Planjahr werden unsichere Größen gezogen und
+als Abweichung vom Plan auf das Jahresergebnis gerechnet:
+
+    gewerbesteuer      Faktor auf die geplante Gewerbesteuer (lognormal,
+                       Schocks über die Jahre korreliert - "sehr volatil")
+    uebrige_steuern    Faktor auf die übrigen Steuern und Abgaben
+                       (Gemeindeanteile Einkommen-/Umsatzsteuer u.a.)
+    hebesaetze         Änderung der Hebesätze in Punkten ab einem Jahr;
+                       das Aufkommen ändert sich proportional zum Hebesatz
+                       (steuern_detail: Grundsteuer A/B, Gewerbesteuer)
+    personal_wachstum  zusätzliches Wachstum der Personalaufwendungen je
+                       Jahr gegenüber dem Plan (kumuliert)
+    zins_aenderung     Zinsänderung in Prozentpunkten je Jahr (kumuliert)
+                       auf die zinsvariablen Schulden: Höchstbetrag der
+                       Liquiditätskredite zuzüglich Kreditaufnahme ab dem
+                       ersten Planjahr
+
+Alle Pfade werden als NumPy-Arrays (Jahre x Pfade) gleichzeitig gerechnet;
+nur über die Planjahre läuft eine Schleife. 200 000 Pfade dauern wenige
+hundert Millisekunden, sodass Annahmen interaktiv variiert werden können.
+
+Verteilungen werden als Objekte angegeben, eine Zahl gilt als fester Wert:
+    {"verteilung": "normal", "mittel": 0.0, "sd": 0.015}
+    {"verteilung": "lognormal", "sd": 0.25, "persistenz": 0.5}   (Mittel 1)
+    {"verteilung": "dreieck", "min": 0, "modus": 20, "max": 60}
+    {"verteilung": "gleich", "min": 0, "max": 40}
+    {"verteilung": "fest", "wert": 0}
+
+Eigene Annahmen (JSON, überschreibt DEFAULT_ANNAHMEN je Schlüssel):
+    {"hebesaetze": {"ab_jahr": 2026, "gewerbesteuer": {"verteilung": "dreieck",
+                    "min": 0, "modus": 20, "max": 40}}}
+
+Verwendung:
+    python generate_szenarien.py
+    python generate_szenarien.py --pfade 500000 --seed 7
+    python generate_szenarien.py --annahmen szenario_hebesatz.json --output /tmp/szenarien.json
+
+Ausgabe:
+    - src/data/szenarien.json (Quantile und Defizit-Wahrscheinlichkeit je
+      Planjahr, kumuliert, Histogramme und Streuung je Einflussgröße),
+      dargestellt im Abschnitt "Szenarien für die Planjahre" der Analyse-Seite
+"""
+
+import argparse
+import copy
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from generate_mermaid import write_if_changed
+from haushalt_matrix import YAML_PATH, HaushaltMatrix, load_haushalt_matrix
+
+ROOT_DIR = Path(__file__).parent.parent
+OUTPUT_PATH = ROOT_DIR / "src" / "data" / "szenarien.json"
+
+ARTIFACT_VERSION = 1
+DEFAULT_PFADE = 200_000
+DEFAULT_SEED = 42
+QUANTILE = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+HISTOGRAMM_KLASSEN = 40
+
+# Steuern mit Hebesatz (Schlüssel in steuern_detail)
+HEBESATZ_STEUERN = ("grundsteuer_a", "grundsteuer_b", "gewerbesteuer")
+
+DEFAULT_ANNAHMEN = {
+    "gewerbesteuer": {"verteilung": "lognormal", "sd": 0.25, "persistenz": 0.5},
+    "uebrige_steuern": {"verteilung": "lognormal", "sd": 0.04, "persistenz": 0.5},
+    "hebesaetze": {
+        "ab_jahr": None,  # None = erstes Planjahr
+        "grundsteuer_a": 0,
+        "grundsteuer_b": 0,
+        "gewerbesteuer": 0,
+    },
+    "personal_wachstum": {"verteilung": "normal", "mittel": 0.0, "sd": 0.015},
+    "zins_aenderung": {"verteilung": "normal", "mittel": 0.0, "sd": 0.5},
+}
+
+
+def merge_annahmen(overrides: dict) -> dict:
+    """DEFAULT_ANNAHMEN mit eigenen Angaben (eine Ebene tief für hebesaetze)."""
+    annahmen = copy.deepcopy(DEFAULT_ANNAHMEN)
+    for key, value in overrides.items():
+        if key not in annahmen:
+            raise ValueError(f"Unbekannte Annahme: {key}")
+        if key == "hebesaetze":
+            annahmen[key].update(value)
+        else:
+            annahmen[key] = value
+    return annahmen
+
+
+def sample(spec, rng: np.random.Generator, size) -> np.ndarray:
+    """Unabhängige Ziehungen aus einer Verteilungsangabe."""
+    if isinstance(spec, (int, float)):
+        return np.full(size, float(spec))
+    kind = spec.get("verteilung", "fest")
+    if kind == "fest":
+        return np.full(size, float(spec.get("wert", 0.0)))
+    if kind == "normal":
+        return rng.normal(spec.get("mittel", 0.0), spec["sd"], size)
+    if kind == "lognormal":
+        sd = spec["sd"]
+        return rng.lognormal(-sd * sd / 2, sd, size)
+    if kind == "dreieck":
+        return rng.triangular(spec["min"], spec["modus"], spec["max"], size)
+    if kind == "gleich":
+        return rng.uniform(spec["min"], spec["max"], size)
+    raise ValueError(f"Unbekannte Verteilung: {kind}")
+
+
+def sample_paths(spec, rng: np.random.Generator, paths: int, years: int) -> np.ndarray:
+    """
+    Ziehungen je Jahr und Pfad (Jahre x Pfade, je Jahr zusammenhängend im Speicher).
+
+    Normal- und Lognormalverteilungen mit "persistenz" (0..1) folgen einem
+    AR(1)-Prozess über die Jahre; die Randverteilung je Jahr bleibt gleich.
+    """
+    rho = spec.get("persistenz", 0.0) if isinstance(spec, dict) else 0.0
+    kind = spec.get("verteilung") if isinstance(spec, dict) else "fest"
+    if not rho or kind not in ("normal", "lognormal"):
+        return sample(spec, rng, (years, paths))
+
+    z = rng.standard_normal((years, paths))
+    scale = np.sqrt(1 - rho * rho)
+    for t in range(1, years):
+        z[t] *= scale
+        z[t] += rho * z[t - 1]
+    sd = spec["sd"]
+    if kind == "lognormal":
+        return np.exp(sd * z - sd * sd / 2)
+    return spec.get("mittel", 0.0) + sd * z
+
+
+class Planbasis:
+    """Planwerte der Planjahre aus der Haushaltsmatrix (je Größe ein Array über die Jahre)."""
+
+    def __init__(self, matrix: HaushaltMatrix, years: list[int]):
+        self.years = years
+        rows = {(s, k): i for i, (s, k) in enumerate(zip(matrix.sections, matrix.keys))}
+        cols = [int(np.searchsorted(matrix.years, year)) for year in years]
+
+        def series(section: str, key: str, ffill: bool = False) -> np.ndarray:
+            if (section, key) not in rows:
+                return np.zeros(len(years))
+            values = matrix.values[rows[(section, key)]]
+            if ffill:
+                # Letzten bekannten Wert fortschreiben (z.B. Höchstbetrag nur für 2025/26 beschlossen)
+                known = np.flatnonzero(~np.isnan(values))
+                if len(known):
+                    values = values[known[np.maximum(np.searchsorted(known, np.arange(len(values)), "right") - 1, 0)]]
+            return np.nan_to_num(values[cols])
+
+        self.jahresergebnis = series("zusammenfassung", "jahresergebnis")
+        self.steuern = series("ertraege", "steuern_und_abgaben")
+        self.personal = series("aufwendungen", "personalaufwendungen")
+        self.hebesatz = {key: matrix.rows[rows[("steuern_detail", key)]].get("hebesatz")
+                         if ("steuern_detail", key) in rows else None for key in HEBESATZ_STEUERN}
+        self.hebesatz_steuern = {key: series("steuern_detail", key) for key in HEBESATZ_STEUERN}
+        detail = sum(series("steuern_detail", key) for key in (*HEBESATZ_STEUERN, "hundesteuer"))
+        self.uebrige_steuern = np.maximum(self.steuern - detail, 0)
+        self.zinsvariable_schulden = (
+            series("schulden", "liquiditaetskredite_hoechstbetrag", ffill=True)
+            + np.cumsum(series("schulden", "kreditaufnahme"))
+        )
+
+
+def plan_years(matrix: HaushaltMatrix) -> list[int]:
+    """Planjahre laut Abschnitt jahre der YAML-Datei."""
+    jahre = matrix.metadata.get("jahre") or {}
+    return sorted(int(year) for year, entry in jahre.items()
+                  if entry.get("typ") == "plan" and int(year) in set(matrix.years.tolist()))
+
+
+def simulate(basis: Planbasis, annahmen: dict, paths: int, seed: int) -> dict[str, np.ndarray]:
+    """
+    Simuliert das Jahresergebnis je Pfad und Planjahr.
+
+    Returns:
+        {"jahresergebnis": Jahre x Pfade, "beitraege": {einflussgröße: Jahre x Pfade}}
+    """
+    rng = np.random.default_rng(seed)
+    n_years = len(basis.years)
+
+    gewerbe_faktor = sample_paths(annahmen["gewerbesteuer"], rng, paths, n_years)
+    uebrige_faktor = sample_paths(annahmen["uebrige_steuern"], rng, paths, n_years)
+
+    # Hebesatzänderung: eine Entscheidung je Pfad, wirksam ab ab_jahr
+    hebesaetze = annahmen["hebesaetze"]
+    ab_jahr = hebesaetze.get("ab_jahr") or basis.years[0]
+    wirksam = (np.array(basis.years) >= ab_jahr).astype(float)[:, None]
+    hebe_faktor = {}
+    for key in HEBESATZ_STEUERN:
+        hebesatz = basis.hebesatz[key]
+        delta = sample(hebesaetze.get(key, 0), rng, (1, paths))
+        hebe_faktor[key] = 1 + (delta / hebesatz if hebesatz else 0.0) * wirksam
+
+    wachstum = sample_paths(annahmen["personal_wachstum"], rng, paths, n_years)
+    zins_pp = np.cumsum(sample_paths(annahmen["zins_aenderung"], rng, paths, n_years), axis=0)
+
+    def col(values: np.ndarray) -> np.ndarray:
+        return values[:, None]
+
+    beitraege = {
+        "gewerbesteuer": col(basis.hebesatz_steuern["gewerbesteuer"])
+        * (gewerbe_faktor * hebe_faktor["gewerbesteuer"] - 1),
+        "grundsteuern": sum(col(basis.hebesatz_steuern[key]) * (hebe_faktor[key] - 1)
+                            for key in ("grundsteuer_a", "grundsteuer_b")),
+        "uebrige_steuern": col(basis.uebrige_steuern) * (uebrige_faktor - 1),
+        "personal": -col(basis.personal) * (np.cumprod(1 + wachstum, axis=0) - 1),
+        "zinsen": -col(basis.zinsvariable_schulden) * zins_pp / 100,
+    }
+    ergebnis = col(basis.jahresergebnis) + sum(beitraege.values())
+    return {"jahresergebnis": ergebnis, "beitraege": beitraege}
+
+
+def _ints(values: np.ndarray) -> list[int]:
+    return np.rint(values).astype(np.int64).tolist()
+
+
+def summarize(basis: Planbasis, result: dict, annahmen: dict, paths: int, seed: int) -> dict:
+    """Kompakte Kennzahlen für die Website (Arrays je Planjahr)."""
+    ergebnis = result["jahresergebnis"]
+    kumuliert = ergebnis.sum(axis=0)
+    quantile = np.quantile(ergebnis, QUANTILE, axis=1)
+    quantile_kumuliert = np.quantile(kumuliert, QUANTILE)
+
+    # Histogramme mit gemeinsamen Klassengrenzen (1 %- bis 99 %-Quantil über alle Jahre)
+    low, high = np.quantile(ergebnis, (0.01, 0.99))
+    grenzen = np.linspace(low, high, HISTOGRAMM_KLASSEN + 1)
+    klasse = np.clip(np.searchsorted(grenzen, ergebnis, side="right") - 1, 0, HISTOGRAMM_KLASSEN - 1)
+    offsets = klasse + np.arange(len(basis.years))[:, None] * HISTOGRAMM_KLASSEN
+    counts = np.bincount(offsets.ravel(), minlength=HISTOGRAMM_KLASSEN * len(basis.years))
+    anteile = counts.reshape(len(basis.years), HISTOGRAMM_KLASSEN) / paths
+
+    def key(q: float) -> str:
+        return f"p{round(q * 100):02d}"
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "jahre": basis.years,
+        "pfade": paths,
+        "seed": seed,
+        "annahmen": annahmen,
+        "jahresergebnis": {
+            "plan": _ints(basis.jahresergebnis),
+            "mittel": _ints(ergebnis.mean(axis=1)),
+            "quantile": {key(q): _ints(values) for q, values in zip(QUANTILE, quantile)},
+            "wahrscheinlichkeit_defizit": np.round((ergebnis < 0).mean(axis=1), 4).tolist(),
+        },
+        "kumuliert": {
+            "plan": int(round(basis.jahresergebnis.sum())),
+            "mittel": int(round(kumuliert.mean())),
+            "quantile": {key(q): int(round(value)) for q, value in zip(QUANTILE, quantile_kumuliert)},
+            "wahrscheinlichkeit_defizit": round(float((kumuliert < 0).mean()), 4),
+            "wahrscheinlichkeit_ausgleich_alle_jahre": round(float((ergebnis >= 0).all(axis=0).mean()), 4),
+        },
+        "histogramm": {
+            "grenzen": _ints(grenzen),
+            "anteile": np.round(anteile, 5).tolist(),
+        },
+        "streuung": {name: _ints(values.std(axis=1)) for name, values in result["beitraege"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo-Szenarien für die Planjahre")
+    parser.add_argument("--yaml", type=Path, default=YAML_PATH, help="YAML-Haushaltsdaten")
+    parser.add_argument("--annahmen", type=Path, help="Eigene Annahmen (JSON), ergänzt DEFAULT_ANNAHMEN")
+    parser.add_argument("--pfade", type=int, default=DEFAULT_PFADE, help=f"Simulierte Pfade (Standard: {DEFAULT_PFADE:,})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Startwert des Zufallsgenerators")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Ziel-JSON")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.annahmen:
+        with open(args.annahmen, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    try:
+        annahmen = merge_annahmen(overrides)
+    except ValueError as e:
+        parser.error(str(e))
+
+    matrix = load_haushalt_matrix(args.yaml)
+    years = plan_years(matrix)
+    if not years:
+        print("Keine Planjahre in der YAML-Datei (Abschnitt jahre)")
+        return
+    basis = Planbasis(matrix, years)
+
+    started = time.perf_counter()
+    result = simulate(basis, annahmen, args.pfade, args.seed)
+    artifact = summarize(basis, result, annahmen, args.pfade, args.seed)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{args.pfade:,} Pfade x {len(years)} Planjahre ({years[0]}-{years[-1]}) in {elapsed:.0f} ms")
+
+    ergebnis = artifact["jahresergebnis"]
+    print(f"\n{'Jahr':<6} {'Plan':>13} {'Median':>13} {'5 %':>13} {'95 %':>13} {'P(Defizit)':>11}")
+    for j, year in enumerate(years):
+        print(f"{year:<6} {ergebnis['plan'][j]:>13,} {ergebnis['quantile']['p50'][j]:>13,} "
+              f"{ergebnis['quantile']['p05'][j]:>13,} {ergebnis['quantile']['p95'][j]:>13,} "
+              f"{ergebnis['wahrscheinlichkeit_defizit'][j]:>10.1%}")
+    kumuliert = artifact["kumuliert"]
+    print(f"Summe  {kumuliert['plan']:>13,} {kumuliert['quantile']['p50']:>13,} "
+          f"{kumuliert['quantile']['p05']:>13,} {kumuliert['quantile']['p95']:>13,} "
+          f"{kumuliert['wahrscheinlichkeit_defizit']:>10.1%}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    content = json.dumps(artifact, ensure_ascii=False, separators=(",", ":")) + "\n"
+    changed = write_if_changed(args.output, content)
+    print(f"\n{'Gespeichert' if changed else 'Unverändert'}: {args.output} ({len(content) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Vergleich einer Gemeinde mit allen Gemeinden im LSN-Warehouse.
+
+Liest die Finanztabellen (Standard: Z9200001 Steuereinnahmen, Z9200002
+Steuerkraft und Hebesätze) und den Bevölkerungsstand (Merkmal
+EINWOHNER_MERKMAL der Tabelle EINWOHNER_TABELLE) aller Regionen aus
+data/lsn_warehouse/ (lsn_warehouse.py) und berechnet für jedes Jahr:
+
+    - Werte je Einwohner (Hebesätze, andere Sätze und Merkmale, die schon
+      je Einwohner angegeben sind, bleiben unverändert;
+      fehlt der Bevölkerungsstand einer Gemeinde mit Werten, wird das
+      Merkmal in diesem Jahr absolut verglichen, im Artefakt pro_kopf: false)
+    - Rang, Perzentil und z-Wert jeder Gemeinde je Merkmal
+    - die k ähnlichsten Gemeinden (euklidischer Abstand der z-Werte aller
+      Merkmale und der logarithmierten Einwohnerzahl)
+
+Die Daten werden einmal in einen Würfel Merkmale x Regionen x Jahre
+überführt; alle Kennzahlen entstehen als Array-Operationen über ganze
+Achsen, ohne Gruppierung je Gemeinde oder Merkmal. Die Nachbarschaften
+werden je Jahr als Abstandsmatrix aller Gemeinden berechnet.
+
+Ergebnis ist eine kompakte JSON-Datei für die Vergleichsgemeinde (Reihen
+je Merkmal, Vergleichsgruppe je Jahr); optional werden alle Gemeinden im
+Langformat als Parquet geschrieben.
+
+Verwendung:
+    python generate_vergleich.py
+    python generate_vergleich.py --region 254021000 --praefix 254 --k 15
+    python generate_vergleich.py --namen data/lsn_regionen.csv --parquet data/vergleich.parquet
+
+Ausgabe:
+    - src/data/vergleich.json
+"""
+
+import argparse
+import json
+import re
+import time
+import warnings
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import lsn_warehouse
+from fetch_lsn_data import EINWOHNER_MERKMAL, EINWOHNER_TABELLE, GEMEINDE_LSN_ID, GEMEINDE_NAME
+from generate_mermaid import write_if_changed
+
+ROOT_DIR = Path(__file__).parent.parent
+OUTPUT_PATH = ROOT_DIR / "src" / "data" / "vergleich.json"
+
+ARTIFACT_VERSION = 1
+DEFAULT_TABLES = ["Z9200001", "Z9200002"]
+DEFAULT_K = 10
+
+# Merkmale, die Sätze statt Beträge sind (nicht je Einwohner umrechnen);
+# ganze Wörter, damit z.B. "Umsatzsteuer" ein Betrag bleibt
+SATZ_RE = re.compile(r"\bHebes[aä]tze?\b|\bS[aä]tze?\b|Prozent|%", re.IGNORECASE)
+# Merkmale, die schon je Einwohner angegeben sind (nicht noch einmal teilen)
+JE_EINWOHNER_RE = re.compile(r"\bje Einwohner", re.IGNORECASE)
+
+
+class Wuerfel(NamedTuple):
+    """Dichte Darstellung der LSN-Daten aller Regionen."""
+    regionen: np.ndarray     # region_id (R)
+    jahre: np.ndarray        # (Y)
+    merkmale: list[str]      # Schlüssel je Merkmal (M)
+    betrag: np.ndarray       # bool (M): Betrag, weder Satz noch schon je Einwohner (umrechenbar)
+    pro_kopf: np.ndarray     # bool M x Y: Betrag, der in diesem Jahr je Einwohner verglichen wird
+    werte: np.ndarray        # M x R x Y (NaN = kein Wert)
+    einwohner: np.ndarray    # R x Y (NaN = unbekannt)
+
+
+def load_frames(
+    tables: list[str],
+    praefix: str = "",
+    warehouse_dir: Path = lsn_warehouse.WAREHOUSE_DIR
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Finanzmerkmale und Bevölkerungsstand im Langformat aus dem Warehouse."""
+    params = [praefix + "%"]
+    werte = lsn_warehouse.query(
+        "SELECT tabelle, region_id, jahr, merkmal, wert FROM lsn"
+        f" WHERE region_id LIKE ? AND tabelle IN ({', '.join('?' for _ in tables)})",
+        params + list(tables), warehouse_dir,
+    )
+    einwohner = lsn_warehouse.query(
+        "SELECT region_id, jahr, wert FROM lsn WHERE region_id LIKE ? AND tabelle = ? AND merkmal = ?",
+        params + [EINWOHNER_TABELLE, EINWOHNER_MERKMAL], warehouse_dir,
+    )
+    return werte, einwohner
+
+
+def build_cube(werte: pd.DataFrame, einwohner: pd.DataFrame) -> Wuerfel:
+    """Überführt die Langformate in den Würfel (eine Zuweisung per Indexarrays)."""
+    # Regionen per Hash-Index zuordnen (searchsorted auf Texten ist deutlich langsamer)
+    region_index = pd.Index(pd.unique(pd.concat([werte["region_id"], einwohner["region_id"]]).astype(str))).sort_values()
+    regionen = region_index.to_numpy(str)
+    jahre = np.unique(np.concatenate([werte["jahr"].to_numpy(np.int64), einwohner["jahr"].to_numpy(np.int64)]))
+
+    # Merkmale über (tabelle, merkmal); der Tabellenname nur bei Namensgleichheit
+    codes, uniques = pd.MultiIndex.from_frame(werte[["tabelle", "merkmal"]].astype(str)).factorize(sort=True)
+    names = [merkmal for _, merkmal in uniques]
+    merkmale = [merkmal if names.count(merkmal) == 1 else f"{tabelle} {merkmal}" for tabelle, merkmal in uniques]
+
+    cube = np.full((len(merkmale), len(regionen), len(jahre)), np.nan)
+    r = region_index.get_indexer(werte["region_id"].astype(str))
+    y = np.searchsorted(jahre, werte["jahr"].to_numpy(np.int64))
+    cube[codes, r, y] = werte["wert"].to_numpy(float)
+
+    population = np.full((len(regionen), len(jahre)), np.nan)
+    population[region_index.get_indexer(einwohner["region_id"].astype(str)),
+               np.searchsorted(jahre, einwohner["jahr"].to_numpy(np.int64))] = einwohner["wert"].to_numpy(float)
+    population[population <= 0] = np.nan
+
+    # Je Einwohner nur, wenn alle Regionen mit Werten einen Bevölkerungsstand haben;
+    # sonst absolut, damit ein Rang nicht Beträge und Beträge je Einwohner mischt
+    betrag = np.array([not (SATZ_RE.search(name) or JE_EINWOHNER_RE.search(name)) for name in names], dtype=bool)
+    ohne_einwohner = (~np.isnan(cube) & np.isnan(population)[None]).any(axis=1)
+    pro_kopf = betrag[:, None] & ~ohne_einwohner
+    return Wuerfel(regionen, jahre, merkmale, betrag, pro_kopf, cube, population)
+
+
+def compute_ranking(cube: Wuerfel) -> dict[str, np.ndarray]:
+    """
+    Vergleichswerte, Rang, Perzentil und z-Wert für alle Merkmale, Regionen und Jahre.
+
+    Returns:
+        {kennzahl: M x R x Y} sowie "anzahl" und "median" (M x Y)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vergleich = np.where(cube.pro_kopf[:, None, :], cube.werte / cube.einwohner[None], cube.werte)
+
+    # Ränge über die Regionsachse: NaN ans Ende sortieren, Rang 1 = höchster Wert
+    valid = ~np.isnan(vergleich)
+    anzahl = valid.sum(axis=1)
+    order = np.argsort(np.where(valid, -vergleich, np.inf), axis=1, kind="stable")
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(vergleich.shape[1])[None, :, None], axis=1)
+    rang = np.where(valid, position + 1, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        perzentil = np.where(valid, (anzahl[:, None, :] - rang) / (anzahl[:, None, :] - 1) * 100, np.nan)
+        perzentil[valid & (anzahl[:, None, :] == 1)] = 100.0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Merkmal-Jahre ohne Werte
+        mittel = np.nanmean(vergleich, axis=1)
+        streuung = np.nanstd(vergleich, axis=1)
+        median = np.nanmedian(vergleich, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(streuung[:, None, :] > 0, (vergleich - mittel[:, None, :]) / streuung[:, None, :], 0.0)
+    z[~valid] = np.nan
+
+    return {"vergleich": vergleich, "rang": rang, "perzentil": perzentil, "z": z,
+            "anzahl": anzahl, "median": median}
+
+
+def peer_groups(cube: Wuerfel, z: np.ndarray, k: int = DEFAULT_K) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Die k nächsten Nachbarn jeder Region je Jahr.
+
+    Merkmale sind die z-Werte aller Merkmale (fehlende = Durchschnitt) und
+    der z-Wert der logarithmierten Einwohnerzahl. Regionen ohne Werte in
+    einem Jahr haben dort keine Nachbarn (-1) und sind keine Nachbarn.
+
+    Returns:
+        (Indizes Y x R x k, Abstände Y x R x k)
+    """
+    n_regions, n_years = cube.werte.shape[1], cube.werte.shape[2]
+    k = min(k, max(n_regions - 1, 0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_einwohner = np.log(cube.einwohner)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        groesse = (log_einwohner - np.nanmean(log_einwohner, axis=0)) / np.nanstd(log_einwohner, axis=0)
+
+    # Y x R x (M + 1)
+    features = np.concatenate([z.transpose(2, 1, 0), groesse.T[:, :, None]], axis=2)
+    present = (~np.isnan(features)).any(axis=2)
+    features = np.nan_to_num(features)
+
+    indices = np.full((n_years, n_regions, k), -1, dtype=np.int32)
+    distances = np.full((n_years, n_regions, k), np.nan)
+    if k == 0:
+        return indices, distances
+    for y in range(n_years):
+        x = features[y]
+        squared = (x * x).sum(axis=1)
+        d2 = np.maximum(squared[:, None] + squared[None, :] - 2 * x @ x.T, 0)
+        d2[:, ~present[y]] = np.inf
+        np.fill_diagonal(d2, np.inf)
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        nearest_d2 = np.take_along_axis(d2, nearest, axis=1)
+        order = np.argsort(nearest_d2, axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_d = np.sqrt(np.take_along_axis(nearest_d2, order, axis=1))
+        ok = present[y][:, None] & np.isfinite(nearest_d)
+        indices[y] = np.where(ok, nearest, -1)
+        distances[y] = np.where(ok, nearest_d, np.nan)
+    return indices, distances
+
+
+def _clean(values: np.ndarray, digits: int | None = None) -> list:
+    """ndarray -> JSON-Liste (NaN -> null, gerundet)."""
+    if digits is None:
+        return [None if np.isnan(v) else int(round(v)) for v in values.tolist()]
+    return [None if np.isnan(v) else round(v, digits) for v in values.tolist()]
+
+
+def build_artifact(cube: Wuerfel, ranking: dict, peers: tuple[np.ndarray, np.ndarray],
+                   region_id: str, namen: dict[str, str]) -> dict:
+    """Kompakte Darstellung für die Vergleichsgemeinde."""
+    r = int(np.searchsorted(cube.regionen, region_id))
+    indices, distances = peers
+    merkmale = {}
+    for m, key in enumerate(cube.merkmale):
+        merkmale[key] = {
+            "pro_kopf": cube.pro_kopf[m].tolist(),
+            "wert": _clean(cube.werte[m, r], 2),
+            "vergleich": _clean(ranking["vergleich"][m, r], 2),
+            "median": _clean(ranking["median"][m], 2),
+            "rang": _clean(ranking["rang"][m, r]),
+            "anzahl": ranking["anzahl"][m].tolist(),
+            "perzentil": _clean(ranking["perzentil"][m, r], 1),
+            "z": _clean(ranking["z"][m, r], 3),
+        }
+
+    vergleichsgruppen = {}
+    for y, year in enumerate(cube.jahre.tolist()):
+        group = [
+            {"region_id": str(cube.regionen[i]), "name": namen.get(str(cube.regionen[i])),
+             "abstand": round(float(d), 3)}
+            for i, d in zip(indices[y, r].tolist(), distances[y, r].tolist()) if i >= 0
+        ]
+        if group:
+            vergleichsgruppen[str(year)] = group
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "region_id": region_id,
+        "name": namen.get(region_id),
+        "regionen": len(cube.regionen),
+        "jahre": cube.jahre.tolist(),
+        "einwohner": _clean(cube.einwohner[r]),
+        "merkmale": merkmale,
+        "vergleichsgruppen": vergleichsgruppen,
+    }
+
+
+def long_frame(cube: Wuerfel, ranking: dict) -> pd.DataFrame:
+    """Alle Regionen im Langformat (region_id, jahr, merkmal, Kennzahlen) für Parquet."""
+    m, r, y = np.nonzero(~np.isnan(cube.werte))
+    return pd.DataFrame({
+        "region_id": cube.regionen[r],
+        "jahr": cube.jahre[y],
+        "merkmal": np.array(cube.merkmale, dtype=object)[m],
+        "wert": cube.werte[m, r, y],
+        "einwohner": cube.einwohner[r, y],
+        "vergleich": ranking["vergleich"][m, r, y],
+        "rang": ranking["rang"][m, r, y],
+        "perzentil": ranking["perzentil"][m, r, y],
+        "z": ranking["z"][m, r, y],
+    })
+
+
+def load_namen(path: Path | None) -> dict[str, str]:
+    """Gemeindenamen je region_id aus einer CSV (region_id, name)."""
+    namen = {GEMEINDE_LSN_ID: GEMEINDE_NAME}
+    if path is None or not path.exists():
+        return namen
+    df = pd.read_csv(path, dtype=str)
+    return {**namen, **dict(zip(df["region_id"], df["name"]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vergleich mit allen Gemeinden im LSN-Warehouse")
+    parser.add_argument("--region", default=GEMEINDE_LSN_ID, help=f"Vergleichsgemeinde (Standard: {GEMEINDE_LSN_ID})")
+    parser.add_argument("--tables", nargs="+", default=DEFAULT_TABLES, help="Finanztabellen im Warehouse")
+    parser.add_argument("--praefix", default="", help="Nur Regionen mit diesem ID-Präfix (z.B. 254 = LK Hildesheim)")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Größe der Vergleichsgruppe")
+    parser.add_argument("--warehouse", type=Path, default=lsn_warehouse.WAREHOUSE_DIR, help="LSN-Warehouse")
+    parser.add_argument("--namen", type=Path, help="CSV mit region_id und name")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Ziel-JSON")
+    parser.add_argument("--parquet", type=Path, help="Zusätzlich alle Regionen im Langformat als Parquet schreiben")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    werte, einwohner = load_frames(args.tables, args.praefix, args.warehouse)
+    if werte.empty:
+        print(f"Keine Daten der Tabellen {', '.join(args.tables)} in {args.warehouse}")
+        print("Abruf: python fetch_lsn_data.py --batch --regions ... --tables " + " ".join(args.tables))
+        return
+    loaded = time.perf_counter()
+
+    cube = build_cube(werte, einwohner)
+    if args.region not in set(cube.regionen.tolist()):
+        print(f"Region {args.region} nicht im Warehouse")
+        return
+    absolut = int((cube.betrag[:, None] & ~cube.pro_kopf).sum())
+    if absolut:
+        print(f"Bevölkerungsstand ({EINWOHNER_TABELLE}, {EINWOHNER_MERKMAL}) unvollständig: "
+              f"{absolut} von {int(cube.betrag.sum()) * len(cube.jahre)} Merkmal-Jahren absolut verglichen")
+        print(f"Abruf: python fetch_lsn_data.py --batch --regions ... --tables {EINWOHNER_TABELLE}")
+    ranking = compute_ranking(cube)
+    peers = peer_groups(cube, ranking["z"], args.k)
+    artifact = build_artifact(cube, ranking, peers, args.region, load_namen(args.namen))
+    computed = time.perf_counter()
+
+    print(f"{len(cube.regionen)} Regionen x {len(cube.merkmale)} Merkmale x {len(cube.jahre)} Jahre "
+          f"({cube.jahre[0]}-{cube.jahre[-1]}): geladen in {(loaded - started) * 1000:.0f} ms, "
+          f"berechnet in {(computed - loaded) * 1000:.0f} ms")
+    last = str(cube.jahre[-1])
+    for key, entry in artifact["merkmale"].items():
+        rang, anzahl = entry["rang"][-1], entry["anzahl"][-1]
+        if rang is not None:
+            print(f"  {last} {key:<40} Rang {rang:>4}/{anzahl:<4} Perzentil {entry['perzentil'][-1]:>5.1f}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    content = json.dumps(artifact, ensure_ascii=False, separators=(",", ":")) + "\n"
+    changed = write_if_changed(args.output, content)
+    print(f"{'Gespeichert' if changed else 'Unverändert'}: {args.output} ({len(content) / 1024:.1f} KB)")
+
+    if args.parquet:
+        long_frame(cube, ranking).to_parquet(args.parquet, index=False)
+        print(f"Gespeichert: {args.parquet}")
+
+
+if __name__ == "__main__":
+    main()
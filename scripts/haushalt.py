@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer Einstiegspunkt für alle Datenskripte.
+
+Die Unterbefehle leiten an die main()-Funktion des jeweiligen Skripts
+weiter; dessen Module (und damit pandas, requests, yaml, numpy, ...)
+werden erst beim Aufruf des Unterbefehls importiert. "haushalt --help"
+lädt nur die Standardbibliothek und startet daher schnell genug für
+häufige Aufrufe aus cron und Makefiles.
+
+Alle weiteren Argumente gehen unverändert an das Skript:
+
+    python haushalt.py lsn fetch --batch --regions 254026000 254021000
+    python haushalt.py mcp sync
+    python haushalt.py render sankey --years 2024-2029
+    python haushalt.py render haushalte
+    python haushalt.py render vergleich --k 15
+    python haushalt.py validate --years 2024-2029
+    python haushalt.py lsn fetch --help        # Hilfe des Skripts
+
+Startzeit prüfen: python benchmarks/bench_startup.py
+"""
+
+import argparse
+import importlib
+import sys
+
+# Gruppe -> Befehl -> (Modul, Hilfetext, feste Argumente)
+COMMANDS = {
+    "lsn": {
+        "fetch": ("fetch_lsn_data", "Tabellen aus der LSN-Online Datenbank abrufen", []),
+        "stub": ("lsn_stub_server", "Lokalen LSN-Stub-Server starten", []),
+        "warehouse": ("lsn_warehouse", "LSN-Warehouse (Parquet) abfragen und befüllen", []),
+    },
+    "mcp": {
+        "fetch": ("fetch_mcp_data", "Ratsdokumente vom MCP Server vollständig abrufen", []),
+        "sync": ("fetch_mcp_data", "Nur neue Ratsdokumente abrufen (inkrementell)", ["--incremental"]),
+        "store": ("raw_store", "Rohdatenspeicher anzeigen und pflegen", []),
+        "index": ("doc_index", "Lokalen Volltextindex aufbauen", ["--build"]),
+        "search": ("doc_index", "Im lokalen Volltextindex suchen", []),
+    },
+    "pdf": {
+        "extract": ("extract_haushalt_pdf", "Ergebnishaushalt aus Haushaltsplan-PDFs extrahieren", []),
+    },
+    "render": {
+        "sankey": ("generate_mermaid", "Mermaid Sankey-Diagramme erzeugen", []),
+        "analytics": ("generate_analytics", "Kennzahlen für die Website vorberechnen", []),
+        "haushalte": ("export_haushalte", "Jahresdateien aus der YAML-Datei exportieren", []),
+        "szenarien": ("generate_szenarien", "Monte-Carlo-Szenarien für die Planjahre berechnen", []),
+        "vergleich": ("generate_vergleich", "Vergleich mit allen Gemeinden im LSN-Warehouse berechnen", []),
+    },
+    "validate": ("check_haushalt", "Konsistenz der Haushaltsdaten prüfen", []),
+    "bench": ("benchmarks.run_benchmarks", "Benchmark-Suite gegen die Baselines ausführen", []),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="haushalt",
+        description="Haushaltsdaten Nordstemmen: Abruf, Extraktion, Generierung und Prüfung",
+        epilog="Hilfe zu einem Befehl: haushalt <gruppe> <befehl> --help",
+    )
+    groups = parser.add_subparsers(dest="gruppe", metavar="<befehl>", required=True)
+    for group, entry in COMMANDS.items():
+        if isinstance(entry, tuple):
+            module, help_text, fixed = entry
+            # add_help=False: --help geht an das Skript selbst
+            command = groups.add_parser(group, help=help_text, add_help=False)
+            command.set_defaults(module=module, fixed=fixed, prog=f"haushalt {group}")
+            continue
+        group_parser = groups.add_parser(group, help=", ".join(entry))
+        commands = group_parser.add_subparsers(dest="befehl", metavar="<befehl>", required=True)
+        for name, (module, help_text, fixed) in entry.items():
+            command = commands.add_parser(name, help=help_text, add_help=False)
+            command.set_defaults(module=module, fixed=fixed, prog=f"haushalt {group} {name}")
+    return parser
+
+
+def run(argv: list[str] | None = None):
+    """Parst den Befehl und ruft main() des Skripts mit den übrigen Argumenten auf."""
+    args, rest = build_parser().parse_known_args(argv)
+    # Das Skript parst sys.argv selbst
+    sys.argv = [args.prog, *args.fixed, *rest]
+    module = importlib.import_module(args.module)
+    return module.main()
+
+
+def main():
+    run()
+
+
+if __name__ == "__main__":
+    main()
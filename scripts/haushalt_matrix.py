@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Spaltenorientierte Sicht auf data/haushalt_nordstemmen.yaml.
+
+Alle Positionen mit "werte" (ertraege, aufwendungen, zusammenfassung,
+steuern_detail, ...) werden einmal in eine dichte Matrix Positionen x Jahre
+(float64, NaN = kein Wert) überführt. Die Matrix wird unter
+data/cache/haushalt_matrix/ als .npy plus JSON (Zeilen, Jahre, Metadaten)
+abgelegt und beim nächsten Start geladen, solange sich der SHA-256 der
+YAML-Datei nicht geändert hat. Die Generatoren arbeiten auf Ausschnitten
+dieser Matrix statt auf den verschachtelten Dicts.
+
+Verwendung:
+    from haushalt_matrix import load_haushalt_matrix
+    matrix = load_haushalt_matrix()
+    names, werte = matrix.column("ertraege", 2025)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from haushalt_schema import GROUPS
+
+try:
+    from yaml import CSafeLoader as SafeLoader  # libyaml, deutlich schneller
+except ImportError:
+    from yaml import SafeLoader
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+YAML_PATH = DATA_DIR / "haushalt_nordstemmen.yaml"
+CACHE_DIR = DATA_DIR / "cache" / "haushalt_matrix"
+CONTENT_DIR = Path(__file__).parent.parent / "src" / "content" / "haushalte"
+CACHE_VERSION = 2
+
+# Felder einer Position, die als Zeilen-Metadaten erhalten bleiben
+ROW_FIELDS = ("name", "beschreibung", "einheit", "typ", "hinweis", "hebesatz")
+
+
+class HaushaltMatrix:
+    """Positionen x Jahre als float64-Matrix mit Zeilen-Metadaten."""
+
+    def __init__(self, sections: list[str], keys: list[str], rows: list[dict],
+                 years: np.ndarray, values: np.ndarray, metadata: dict):
+        self.sections = sections
+        self.keys = keys
+        self.rows = rows
+        self.years = years
+        self.values = values
+        self.metadata = metadata
+        self._year_index = {int(year): i for i, year in enumerate(years)}
+        self._section_rows: dict[str, np.ndarray] = {}
+        for i, section in enumerate(sections):
+            self._section_rows.setdefault(section, []).append(i)
+        self._section_rows = {s: np.array(idx) for s, idx in self._section_rows.items()}
+
+    @classmethod
+    def from_data(cls, data: dict) -> "HaushaltMatrix":
+        """Baut die Matrix aus den geladenen YAML-Daten (einmaliger Durchlauf)."""
+        sections, keys, rows, werte = [], [], [], []
+        for section, items in data.items():
+            if not isinstance(items, dict):
+                continue
+            for key, item in items.items():
+                if not isinstance(item, dict) or not isinstance(item.get("werte"), dict):
+                    continue
+                sections.append(section)
+                keys.append(key)
+                rows.append({field: item[field] for field in ROW_FIELDS if field in item})
+                werte.append(item["werte"])
+
+        years = np.array(sorted({int(year) for row in werte for year in row}), dtype=np.int32)
+        year_index = {int(year): i for i, year in enumerate(years)}
+        values = np.full((len(werte), len(years)), np.nan)
+        for i, row in enumerate(werte):
+            for year, value in row.items():
+                if value is not None:
+                    values[i, year_index[int(year)]] = value
+
+        metadata = {key: value for key, value in data.items() if key not in set(sections)}
+        return cls(sections, keys, rows, years, values, metadata)
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "HaushaltMatrix":
+        """
+        Baut die Matrix aus Jahresdatensätzen (Schema config.ts).
+
+        Zeilen in Schema-Reihenfolge (ertraege, aufwendungen, summen);
+        Typ und Quelle je Jahr stehen in metadata["typ"] bzw. metadata["quelle"].
+        """
+        data = {
+            group: {key: {"werte": {r["jahr"]: r.get(group, {}).get(key) for r in records}} for key in keys}
+            for group, keys in GROUPS.items()
+        }
+        matrix = cls.from_data(data)
+        matrix.metadata = {
+            "typ": {int(r["jahr"]): r.get("typ") for r in records},
+            "quelle": {int(r["jahr"]): r.get("quelle") for r in records},
+        }
+        return matrix
+
+    def section_rows(self, section: str) -> np.ndarray:
+        """Zeilenindizes eines Abschnitts (z.B. "ertraege") in YAML-Reihenfolge."""
+        return self._section_rows.get(section, np.empty(0, dtype=np.intp))
+
+    def names(self, section: str) -> list[str]:
+        return [self.rows[i].get("name", self.keys[i]) for i in self.section_rows(section)]
+
+    def section(self, section: str) -> np.ndarray:
+        """Teilmatrix eines Abschnitts (Positionen x Jahre, NaN = kein Wert)."""
+        return self.values[self.section_rows(section)]
+
+    def year_values(self, section: str, year: int) -> np.ndarray:
+        """Werte eines Abschnitts für ein Jahr; fehlende Werte und Jahre als 0."""
+        rows = self.section_rows(section)
+        if year not in self._year_index:
+            return np.zeros(len(rows))
+        return np.nan_to_num(self.values[rows, self._year_index[year]])
+
+    def year_column(self, year: int) -> np.ndarray | None:
+        """Alle Positionen eines Jahres (NaN = kein Wert); None, wenn das Jahr fehlt."""
+        if year not in self._year_index:
+            return None
+        return self.values[:, self._year_index[year]]
+
+    def year_block(self, section: str, years: list[int]) -> np.ndarray:
+        """Werte eines Abschnitts für mehrere Jahre (Positionen x years), fehlende als 0."""
+        rows = self.section_rows(section)
+        block = np.zeros((len(rows), len(years)))
+        for j, year in enumerate(years):
+            if year in self._year_index:
+                block[:, j] = self.values[rows, self._year_index[year]]
+        return np.nan_to_num(block)
+
+    def select_years(self, years: list[int]) -> "HaushaltMatrix":
+        """Neue Matrix nur mit den Spalten dieser Jahre (fehlende Jahre entfallen)."""
+        columns = [self._year_index[year] for year in sorted(set(years)) if year in self._year_index]
+        return HaushaltMatrix(self.sections, self.keys, self.rows, self.years[columns],
+                              self.values[:, columns], self.metadata)
+
+    def column(self, section: str, year: int) -> tuple[list[str], np.ndarray]:
+        """(Namen, Werte) eines Abschnitts für ein Jahr."""
+        return self.names(section), self.year_values(section, year)
+
+    def to_frame(self):
+        """Langformat als pandas DataFrame (abschnitt, schluessel, jahr, wert)."""
+        import pandas as pd
+
+        rows, cols = np.nonzero(~np.isnan(self.values))
+        return pd.DataFrame({
+            "abschnitt": np.array(self.sections, dtype=object)[rows],
+            "schluessel": np.array(self.keys, dtype=object)[rows],
+            "jahr": self.years[cols],
+            "wert": self.values[rows, cols],
+        })
+
+    def save(self, directory: Path, source_hash: str):
+        """
+        Schreibt matrix.npy und matrix.json (atomar, JSON zuletzt).
+
+        Die temporären Dateien haben eindeutige Namen, damit parallel
+        laufende Generatoren, die den Cache gleichzeitig neu aufbauen,
+        sich nicht gegenseitig die Dateien überschreiben.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, prefix="matrix.", suffix=".npy.tmp", delete=False) as f:
+            np.save(f, self.values)
+        os.replace(f.name, directory / "matrix.npy")
+
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix="matrix.",
+                                         suffix=".json.tmp", delete=False) as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "yaml_sha256": source_hash,
+                "sections": self.sections,
+                "keys": self.keys,
+                "rows": self.rows,
+                "years": self.years.tolist(),
+                "metadata": self.metadata,
+            }, f, ensure_ascii=False, default=str)
+        os.replace(f.name, directory / "matrix.json")
+
+    @classmethod
+    def load(cls, directory: Path, source_hash: str) -> "HaushaltMatrix | None":
+        """Lädt die Matrix aus dem Cache, wenn sie zum YAML-Hash passt."""
+        try:
+            with open(directory / "matrix.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != CACHE_VERSION or meta.get("yaml_sha256") != source_hash:
+                return None
+            values = np.load(directory / "matrix.npy")
+        except (OSError, ValueError):
+            return None
+        if values.shape != (len(meta["keys"]), len(meta["years"])):
+            return None
+        return cls(meta["sections"], meta["keys"], meta["rows"],
+                   np.array(meta["years"], dtype=np.int32), values, meta["metadata"])
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_yaml(path: Path = YAML_PATH) -> dict:
+    """Lädt die YAML-Datei (mit libyaml, falls verfügbar)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def load_records(directory: Path = CONTENT_DIR) -> list[dict]:
+    """Alle Jahresdateien ({jahr}.json) eines Verzeichnisses, nach Jahr sortiert."""
+    records = []
+    for path in sorted(directory.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            records.append(json.load(f))
+    return sorted(records, key=lambda r: r["jahr"])
+
+
+def load_haushalt_matrix(
+    path: Path = YAML_PATH,
+    cache_dir: Path | None = CACHE_DIR,
+    refresh: bool = False
+) -> HaushaltMatrix:
+    """
+    Lädt die Haushaltsmatrix, aus dem Cache oder neu aus der YAML-Datei.
+
+    Args:
+        path: YAML-Datei
+        cache_dir: Cache-Verzeichnis (None = ohne Cache)
+        refresh: Cache ignorieren und neu aufbauen
+    """
+    source_hash = file_sha256(path)
+    if cache_dir is not None and not refresh:
+        matrix = HaushaltMatrix.load(cache_dir, source_hash)
+        if matrix is not None:
+            return matrix
+
+    matrix = HaushaltMatrix.from_data(load_yaml(path))
+    if cache_dir is not None:
+        matrix.save(cache_dir, source_hash)
+    return matrix
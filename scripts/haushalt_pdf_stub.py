@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Erzeugt einen Haushaltsplan-PDF-Auszug als Testdatei für extract_haushalt_pdf.py.
+
+Der Auszug ist wie ein Haushaltsplan aufgebaut (Vorbericht, Ergebnishaushalt
+über zwei Seiten, Finanzhaushalt, Teilergebnishaushalte) und enthält die
+Werte aus data/haushalt_nordstemmen.yaml. Zeilen, die im Schema
+zusammengefasst sind (aktives Personal + Versorgung, sonstige Erträge),
+werden aufgeteilt, damit die Zuordnung der Extraktion geprüft werden kann.
+Finanz- und Teilergebnishaushalt enthalten abweichende Werte und dürfen
+nicht übernommen werden.
+
+Verwendung:
+    python haushalt_pdf_stub.py
+    python haushalt_pdf_stub.py --plan-year 2026 --filler 300 --output /tmp/haushaltsplan.pdf
+"""
+
+import argparse
+from pathlib import Path
+
+import yaml
+
+from lsn_stub_server import format_german
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+FIXTURE_DIR = Path(__file__).parent / "benchmarks" / "fixtures" / "pdf"
+
+# Zeilen des Ergebnishaushalts (NKHR Niedersachsen):
+# (Nr., Bezeichnung, Gruppe, Schlüssel, Anteil des Schlüsselwerts)
+ERTRAG_ROWS = [
+    (1, "Steuern und ähnliche Abgaben", "ertraege", "steuern_und_abgaben", 1.0),
+    (2, "Zuwendungen und allgemeine Umlagen", "ertraege", "zuwendungen_und_umlagen", 1.0),
+    (3, "Auflösungserträge aus Sonderposten", "ertraege", "aufloesungsertraege_sonderposten", 1.0),
+    (4, "sonstige Transfererträge", "ertraege", "sonstige_ertraege", 0.1),
+    (5, "öffentlich-rechtliche Entgelte", "ertraege", "oeffentlich_rechtliche_entgelte", 1.0),
+    (6, "privatrechtliche Entgelte", "ertraege", "privatrechtliche_entgelte", 1.0),
+    (7, "Kostenerstattungen und Kostenumlagen", "ertraege", "kostenerstattungen", 1.0),
+    (8, "Zinsen und ähnliche Finanzerträge", "ertraege", "zinsen_finanzertraege", 1.0),
+    (9, "aktivierte Eigenleistungen", "ertraege", "sonstige_ertraege", 0.0),
+    (10, "Bestandsveränderungen", "ertraege", "sonstige_ertraege", 0.0),
+    (11, "sonstige ordentliche Erträge", "ertraege", "sonstige_ertraege", 0.9),
+    (12, "= Summe ordentliche Erträge", "zusammenfassung", "gesamtertraege", 1.0),
+]
+AUFWAND_ROWS = [
+    (13, "Aufwendungen für aktives Personal", "aufwendungen", "personalaufwendungen", 0.92),
+    (14, "Aufwendungen für Versorgung", "aufwendungen", "personalaufwendungen", 0.08),
+    (15, "Aufwendungen für Sach- und Dienstleistungen", "aufwendungen", "sach_und_dienstleistungen", 1.0),
+    (16, "Abschreibungen", "aufwendungen", "abschreibungen", 1.0),
+    (17, "Zinsen und ähnliche Aufwendungen", "aufwendungen", "zinsen_aufwendungen", 1.0),
+    (18, "Transferaufwendungen", "aufwendungen", "transferaufwendungen", 1.0),
+    (19, "sonstige ordentliche Aufwendungen", "aufwendungen", "sonstige_aufwendungen", 1.0),
+    (20, "= Summe ordentliche Aufwendungen", "zusammenfassung", "gesamtaufwendungen", 1.0),
+    (21, "= ordentliches Ergebnis", "zusammenfassung", "jahresergebnis", 1.0),
+]
+
+VORBERICHT = (
+    "Der Haushalt {jahr} weist im Ergebnishaushalt einen Fehlbetrag von {fehlbetrag} EUR aus. "
+    "Die Gewerbesteuer wird mit 3,8 Mio. € veranschlagt, die Kreisumlage steigt um {umlage} T€. "
+    "Gemäß § 110 NKomVG ist ein Haushaltssicherungskonzept aufzustellen."
+)
+
+
+def _pdf_string(text: str) -> bytes:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("cp1252", errors="replace") + b")"
+
+
+def write_text_pdf(pages: list[list[str]]) -> bytes:
+    """Minimales PDF (Courier, WinAnsiEncoding) mit einer Textzeile je Listeneintrag."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Seitenbaum, sobald die Seitenobjekte feststehen
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        content = b"BT /F1 8 Tf 30 810 Td 13 TL " + b" ".join(
+            _pdf_string(line) + b" Tj T*" for line in lines
+        ) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def column_header(plan_year: int) -> tuple[list[int], str]:
+    """Spaltenköpfe: Ergebnis Vorvorjahr, Ansatz Vorjahr/Planjahr, Planung Folgejahre."""
+    years = list(range(plan_year - 2, plan_year + 4))
+    labels = []
+    for year in years:
+        label = "Ergebnis" if year < plan_year - 1 else "Ansatz" if year <= plan_year else "Planung"
+        labels.append(f"{label} {year}".rjust(15))
+    return years, " " * 48 + "".join(labels)
+
+
+def table_rows(data: dict, rows: list[tuple], years: list[int], scale: float = 1.0) -> list[str]:
+    """Formatiert Tabellenzeilen; die letzte Teilzeile eines Schlüssels erhält den Rest."""
+    last_row = {key: i for i, (_, _, _, key, share) in enumerate(rows) if share}
+    assigned = {}
+    lines = []
+    for i, (nr, label, group, key, share) in enumerate(rows):
+        cells = []
+        for year in years:
+            total = round(data[group][key]["werte"].get(year, 0) * scale)
+            if i == last_row.get(key):
+                value = total - assigned.get((key, year), 0)
+            else:
+                value = round(total * share)
+                assigned[(key, year)] = assigned.get((key, year), 0) + value
+            cells.append(format_german(value).rjust(15))
+        lines.append(f"{nr:>2}. {label:<44}" + "".join(cells))
+    return lines
+
+
+def render_haushaltsplan(data: dict, plan_year: int = 2026, filler_pages: int = 20) -> list[list[str]]:
+    """Seiten (als Textzeilen) eines Haushaltsplan-Auszugs."""
+    years, header = column_header(plan_year)
+    jahresergebnis = data["zusammenfassung"]["jahresergebnis"]["werte"][plan_year]
+
+    pages = [[
+        "Gemeinde Nordstemmen",
+        f"Haushaltssatzung und Haushaltsplan für das Haushaltsjahr {plan_year}",
+        "Landkreis Hildesheim",
+    ]]
+    for i in range(filler_pages):
+        text = VORBERICHT.format(jahr=plan_year, fehlbetrag=format_german(-jahresergebnis), umlage=120 + i)
+        pages.append([f"Vorbericht - Seite {i + 1}", ""] + [text[j:j + 110] for j in range(0, len(text), 110)] * 8)
+
+    pages.append(
+        [f"Ergebnishaushalt {plan_year}", "Ordentliche Erträge und Aufwendungen in EUR", "", header, ""]
+        + table_rows(data, ERTRAG_ROWS, years)
+    )
+    pages.append(
+        ["Fortsetzung", "", header, ""]
+        + table_rows(data, AUFWAND_ROWS, years)
+    )
+    pages.append(
+        [f"Finanzhaushalt {plan_year}", "Einzahlungen und Auszahlungen aus laufender Verwaltungstätigkeit", "", header, ""]
+        + table_rows(data, ERTRAG_ROWS[:3], years, scale=0.97)
+    )
+    for nr, name in enumerate(["Zentrale Verwaltung", "Schulen", "Bauen und Umwelt"], start=1):
+        pages.append(
+            [f"Teilergebnishaushalt {nr} - {name}", "", header, ""]
+            + table_rows(data, ERTRAG_ROWS + AUFWAND_ROWS, years, scale=0.1 * nr)
+        )
+    return pages
+
+
+def render_haushaltsplan_pdf(data: dict, plan_year: int = 2026, filler_pages: int = 20) -> bytes:
+    return write_text_pdf(render_haushaltsplan(data, plan_year, filler_pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Haushaltsplan-PDF-Auszug als Testdatei erzeugen")
+    parser.add_argument("--plan-year", type=int, default=2026, help="Haushaltsjahr des Plans")
+    parser.add_argument("--filler", type=int, default=20, help="Anzahl Vorberichtsseiten")
+    parser.add_argument("--output", type=Path, help="Zieldatei (Standard: Fixture-Verzeichnis)")
+    args = parser.parse_args()
+
+    with open(DATA_DIR / "haushalt_nordstemmen.yaml", "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+
+    output = args.output or FIXTURE_DIR / f"haushaltsplan_{args.plan_year}.pdf"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(render_haushaltsplan_pdf(data, args.plan_year, args.filler))
+    print(f"PDF geschrieben: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Schema der Jahresdateien src/content/haushalte/{jahr}.json.
+
+Entspricht der Astro-Content-Collection in src/content/config.ts und wird
+von den Python-Skripten genutzt, die diese Dateien erzeugen oder prüfen.
+"""
+
+ERTRAEGE_KEYS = (
+    "steuern_und_abgaben",
+    "zuwendungen_und_umlagen",
+    "aufloesungsertraege_sonderposten",
+    "oeffentlich_rechtliche_entgelte",
+    "privatrechtliche_entgelte",
+    "kostenerstattungen",
+    "zinsen_finanzertraege",
+    "sonstige_ertraege",
+)
+
+AUFWENDUNGEN_KEYS = (
+    "personalaufwendungen",
+    "sach_und_dienstleistungen",
+    "abschreibungen",
+    "zinsen_aufwendungen",
+    "transferaufwendungen",
+    "sonstige_aufwendungen",
+)
+
+SUMMEN_KEYS = ("gesamtertraege", "gesamtaufwendungen", "jahresergebnis")
+
+GROUPS = {
+    "ertraege": ERTRAEGE_KEYS,
+    "aufwendungen": AUFWENDUNGEN_KEYS,
+    "summen": SUMMEN_KEYS,
+}
+
+TYPEN = ("plan", "ist")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_haushalt(record: dict) -> list[str]:
+    """
+    Prüft einen Jahresdatensatz gegen das Schema aus config.ts.
+
+    Returns:
+        Liste der Fehlermeldungen (leer, wenn gültig)
+    """
+    errors = []
+    if not isinstance(record.get("jahr"), int) or isinstance(record.get("jahr"), bool):
+        errors.append("jahr: Ganzzahl erwartet")
+    if record.get("typ") not in TYPEN:
+        errors.append(f"typ: {record.get('typ')!r} ist nicht 'plan' oder 'ist'")
+    if not isinstance(record.get("quelle"), str):
+        errors.append("quelle: Text erwartet")
+    url = record.get("quelle_url")
+    if url is not None and not (isinstance(url, str) and url.startswith(("http://", "https://"))):
+        errors.append(f"quelle_url: keine gültige URL ({url!r})")
+
+    for group, keys in GROUPS.items():
+        values = record.get(group)
+        if not isinstance(values, dict):
+            errors.append(f"{group}: Objekt fehlt")
+            continue
+        for key in keys:
+            if key not in values:
+                errors.append(f"{group}.{key}: fehlt")
+            elif not _is_number(values[key]):
+                errors.append(f"{group}.{key}: Zahl erwartet, nicht {values[key]!r}")
+        for key in values.keys() - set(keys):
+            errors.append(f"{group}.{key}: unbekanntes Feld")
+
+    return errors
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Inhaltsadressierter HTTP-Antwort-Cache auf der Festplatte.
+
+Wird von fetch_lsn_data.py und fetch_mcp_data.py gemeinsam genutzt.
+Schlüssel ist ein SHA-256 über Methode, URL und normalisierten
+Request-Body. Jeder Eintrag besteht aus einer Metadatei (JSON) und dem
+Antwort-Body.
+
+Funktionen:
+    - TTL je Endpunkt (reguläre Ausdrücke über URL und Body)
+    - LRU-Größenbegrenzung (Zugriff aktualisiert die mtime)
+    - Offline-Modus: nur Cache, fehlende Einträge -> CacheMiss
+    - Refresh-Modus: Cache ignorieren, Antworten neu speichern
+    - Bedingte Revalidierung über ETag/Last-Modified (304)
+
+Verwendung:
+    cache = ResponseCache(offline=args.offline, refresh=args.refresh)
+    response = cache.request(session.request, "POST", url, data={...})
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "http"
+
+DAY = 24 * 60 * 60
+
+# TTL-Regeln: (Muster über "URL Body", Sekunden). Erste passende Regel gewinnt.
+DEFAULT_TTL_RULES = [
+    # LSN: Session-Start nie cachen
+    (r"/default\.asp ", 0),
+    # LSN: Tabellenabfragen und Ergebnisse (historische Zeitreihen)
+    (r"/html/mustertabelle\.asp ", 7 * DAY),
+    (r"/html/", 7 * DAY),
+    # MCP: Drucksachen ändern sich nach Veröffentlichung nicht mehr
+    (r'"name":"get_paper_by_reference"', 90 * DAY),
+    (r'"name":"search_documents"', 1 * DAY),
+    # Haushaltsplan-PDFs (extract_haushalt_pdf.py)
+    (r"\.pdf ", 90 * DAY),
+]
+DEFAULT_TTL = 1 * DAY
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Header einer 304-Antwort, die den gespeicherten Eintrag aktualisieren
+VALIDATOR_HEADERS = ("ETag", "Last-Modified", "Date", "Cache-Control", "Expires")
+
+
+class CacheMiss(requests.exceptions.ConnectionError):
+    """Kein Cache-Eintrag vorhanden, aber Netzwerkzugriff ist deaktiviert (--offline)."""
+
+
+def normalize_body(data=None, json_body=None) -> str:
+    """
+    Normalisiert einen Request-Body für den Cache-Schlüssel.
+
+    JSON wird mit sortierten Schlüsseln serialisiert; bei JSON-RPC wird
+    die Request-ID ignoriert. Formulardaten werden sortiert kodiert.
+    """
+    if json_body is not None:
+        if isinstance(json_body, dict) and "jsonrpc" in json_body:
+            json_body = {k: v for k, v in json_body.items() if k != "id"}
+        return json.dumps(json_body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    if isinstance(data, dict):
+        return urlencode(sorted((str(k), str(v)) for k, v in data.items()))
+    if isinstance(data, bytes):
+        return data.decode("utf-8", errors="replace")
+    return data or ""
+
+
+def cache_key(method: str, url: str, body: str = "") -> str:
+    """SHA-256 über Methode, URL und normalisierten Body."""
+    return hashlib.sha256(f"{method.upper()}\n{url}\n{body}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-sicherer HTTP-Antwort-Cache auf der Festplatte."""
+
+    def __init__(
+        self,
+        directory: Path = CACHE_DIR,
+        ttl_rules: list[tuple[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        offline: bool = False,
+        refresh: bool = False
+    ):
+        if offline and refresh:
+            raise ValueError("--offline und --refresh schließen sich aus")
+        self.directory = Path(directory)
+        self.ttl_rules = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules)
+        ]
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    # --- Verwaltung -----------------------------------------------------
+
+    def ttl_for(self, url: str, body: str = "") -> float:
+        """TTL in Sekunden für eine Anfrage (0 = nicht cachen)."""
+        target = f"{url} {body}"
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(target):
+                return ttl
+        return self.default_ttl
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        folder = self.directory / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def _load(self, key: str) -> tuple[dict, bytes] | None:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        # LRU: Zugriff aktualisiert die mtime
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return meta, body
+
+    def _write_atomic(self, path: Path, content: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+    def _store(self, key: str, response: requests.Response, body_key: str):
+        self._write_entry(key, {
+            "method": response.request.method if response.request else "",
+            "url": response.url,
+            "request_body": body_key,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+        }, response.content)
+
+    def _write_entry(self, key: str, meta: dict, content: bytes):
+        meta_path, body_path = self._paths(key)
+        old_size = body_path.stat().st_size if body_path.exists() else 0
+        meta["stored_at"] = time.time()
+        self._write_atomic(body_path, content)
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        self._account(len(content) - old_size)
+
+    def _touch_meta(self, key: str, meta: dict, headers=None):
+        meta_path, _ = self._paths(key)
+        meta["stored_at"] = time.time()
+        # Neue Validatoren aus der 304-Antwort übernehmen
+        if headers:
+            stored = CaseInsensitiveDict(meta.get("headers") or {})
+            for name in VALIDATOR_HEADERS:
+                if headers.get(name):
+                    stored[name] = headers[name]
+            meta["headers"] = dict(stored)
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def _account(self, delta: int):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.directory.glob("*/*.body"))
+            else:
+                self._size += delta
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Entfernt die am längsten nicht genutzten Einträge bis unter max_bytes."""
+        with self._lock:
+            entries = []
+            for body_path in self.directory.glob("*/*.body"):
+                try:
+                    stat = body_path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, body_path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, body_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+            self._size = total
+
+    def clear(self):
+        """Löscht alle Cache-Einträge."""
+        with self._lock:
+            for path in self.directory.glob("*/*"):
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    # --- Anfragen -------------------------------------------------------
+
+    @staticmethod
+    def _to_response(meta: dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.reason = meta.get("reason") or ""
+        response.headers = CaseInsensitiveDict(meta.get("headers") or {})
+        response.url = meta["url"]
+        response.encoding = meta.get("encoding")
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def lookup(self, method: str, url: str, data=None, json=None) -> requests.Response | None:
+        """Liefert eine frische (bzw. im Offline-Modus beliebige) gecachte Antwort."""
+        if self.refresh:
+            return None
+        body_key = normalize_body(data, json)
+        entry = self._load(cache_key(method, url, body_key))
+        if entry is None:
+            return None
+        meta, body = entry
+        if self.offline or time.time() - meta["stored_at"] < self.ttl_for(url, body_key):
+            self.hits += 1
+            return self._to_response(meta, body)
+        return None
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        content: bytes,
+        *,
+        data=None,
+        json=None,
+        status: int = 200,
+        headers: dict = None,
+        encoding: str = "utf-8"
+    ):
+        """Speichert eine außerhalb von requests empfangene Antwort (z.B. httpx)."""
+        body_key = normalize_body(data, json)
+        if self.ttl_for(url, body_key) <= 0:
+            return
+        self._write_entry(cache_key(method, url, body_key), {
+            "method": method.upper(),
+            "url": url,
+            "request_body": body_key,
+            "status": status,
+            "reason": "",
+            "headers": dict(headers or {}),
+            "encoding": encoding,
+        }, content)
+
+    def request(
+        self,
+        send,
+        method: str,
+        url: str,
+        *,
+        data=None,
+        json=None,
+        headers: dict = None,
+        accept=None,
+        refresh: bool = False,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Führt eine Anfrage über den Cache aus.
+
+        Args:
+            send: Funktion mit der Signatur von requests.Session.request
+            method: HTTP-Methode
+            url: Ziel-URL
+            data: Formulardaten
+            json: JSON-Body
+            headers: Zusätzliche Header
+            accept: Optionales Prädikat, ob eine Antwort gespeichert werden darf
+                    (z.B. nur fertige Ergebnisseiten)
+            refresh: Cache für diese Anfrage ignorieren
+
+        Returns:
+            requests.Response (bei Cache-Treffern mit Attribut from_cache=True)
+        """
+        body_key = normalize_body(data, json)
+        key = cache_key(method, url, body_key)
+        ttl = self.ttl_for(url, body_key)
+        entry = None if (self.refresh or refresh or ttl <= 0) else self._load(key)
+
+        if entry is not None:
+            meta, body = entry
+            if self.offline or time.time() - meta["stored_at"] < ttl:
+                self.hits += 1
+                return self._to_response(meta, body)
+
+        if self.offline:
+            self.misses += 1
+            raise CacheMiss(f"Kein Cache-Eintrag für {method} {url} (--offline)")
+
+        # Bedingte Revalidierung abgelaufener Einträge
+        request_headers = dict(headers or {})
+        if entry is not None:
+            cached_headers = CaseInsensitiveDict(entry[0].get("headers") or {})
+            if cached_headers.get("ETag"):
+                request_headers["If-None-Match"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                request_headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        self.misses += 1
+        response = send(method, url, data=data, json=json, headers=request_headers or None, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            meta, body = entry
+            self.revalidated += 1
+            self._touch_meta(key, meta, response.headers)
+            return self._to_response(meta, body)
+
+        if ttl > 0 and response.ok and (accept is None or accept(response)):
+            self._store(key, response, body_key)
+        response.from_cache = False
+        return response
+
+    def summary(self) -> str:
+        """Kurze Statistik für die Konsolenausgabe."""
+        return f"Cache: {self.hits} Treffer, {self.misses} Abrufe, {self.revalidated} revalidiert"
+
+
+def add_cache_arguments(parser):
+    """Fügt die gemeinsamen Cache-Schalter zu einem ArgumentParser hinzu."""
+    group = parser.add_argument_group("HTTP-Cache")
+    mode = group.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--offline",
+        action="store_true",
+        help="Nur gecachte Antworten verwenden, kein Netzwerkzugriff"
+    )
+    mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Cache ignorieren und alle Antworten neu abrufen"
+    )
+    mode.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="HTTP-Cache deaktivieren"
+    )
+
+
+def cache_from_args(args) -> ResponseCache | None:
+    """Erzeugt den Cache entsprechend den Kommandozeilen-Schaltern."""
+    if args.no_cache:
+        return None
+    return ResponseCache(offline=args.offline, refresh=args.refresh)
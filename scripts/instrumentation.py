@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Laufzeitmessung für die Abruf- und Generierungsskripte.
+
+Ein Laufbericht (RunReport) sammelt je Phase Anzahl, Gesamt- und
+Maximaldauer sowie Zähler (Anfragen, Bytes, Zeilen, ...). Die Skripte
+markieren ihre Phasen mit REPORT.phase(...):
+
+    session_start   LSN-Session starten
+    table_request   Tabellenabfrage (POST mustertabelle.asp)
+    wait            Warten auf die Tabellen-Generierung
+    parse           HTML/ZIP/Antworten parsen
+    download        ZIP-Export laden
+    mcp_call        JSON-RPC-Aufruf an den MCP Server
+    yaml_load       Haushaltsdaten laden
+    render          Ausgaben erzeugen
+    write           Dateien schreiben
+
+Phasen dürfen verschachtelt sein und aus mehreren Threads oder Tasks
+gleichzeitig laufen; die Dauer ist dann die Summe über alle Aufrufe und
+kann die Wanduhrzeit des Laufs übersteigen.
+
+Verwendung in einem Skript:
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    with instrumented("fetch_lsn_data", args):
+        ...
+
+    python fetch_lsn_data.py --report data/reports/lsn.json
+    python generate_mermaid.py --profile             # cProfile, Top 25
+    python generate_mermaid.py --profile pyinstrument
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+REPORT_VERSION = 1
+PROFILE_DIR = Path(__file__).parent.parent / "data" / "profile"
+PROFILE_TOP = 25
+
+
+class RunReport:
+    """Phasen-Timer und Zähler eines Laufs (thread-sicher)."""
+
+    def __init__(self, script: str = ""):
+        self.script = script
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._finished: float | None = None
+        self.phases: dict[str, dict] = {}
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def reset(self, script: str):
+        """Beginnt einen neuen Lauf (die Skripte nutzen den modulweiten REPORT)."""
+        self.__init__(script)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Misst die Dauer des Blocks als Phase name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            entry = self.phases.setdefault(name, {"anzahl": 0, "sekunden": 0.0, "max_s": 0.0})
+            entry["anzahl"] += 1
+            entry["sekunden"] += seconds
+            entry["max_s"] = max(entry["max_s"], seconds)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def finish(self):
+        self._finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            phases = {
+                name: {
+                    "anzahl": entry["anzahl"],
+                    "sekunden": round(entry["sekunden"], 4),
+                    "max_s": round(entry["max_s"], 4),
+                }
+                for name, entry in sorted(self.phases.items(), key=lambda item: -item[1]["sekunden"])
+            }
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "version": REPORT_VERSION,
+            "skript": self.script,
+            "gestartet": self.started_at.isoformat(timespec="seconds"),
+            "dauer_s": round(self.elapsed, 4),
+            "phasen": phases,
+            "zaehler": counters,
+        }
+
+    def summary(self) -> str:
+        """Kurze Tabelle der Phasen für die Konsolenausgabe."""
+        report = self.to_dict()
+        lines = [f"Laufzeit {report['skript']}: {report['dauer_s']:.2f}s"]
+        for name, entry in report["phasen"].items():
+            lines.append(f"  {name:<14} {entry['sekunden']:>9.3f}s  {entry['anzahl']:>6}x  max {entry['max_s']:.3f}s")
+        if report["zaehler"]:
+            lines.append("  " + ", ".join(f"{name}={value:,}" for name, value in report["zaehler"].items()))
+        return "\n".join(lines)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+# Laufbericht des aktuellen Prozesses (instrumented() setzt ihn zurück)
+REPORT = RunReport()
+
+
+def add_instrumentation_arguments(parser):
+    """Fügt --report und --profile zu einem ArgumentParser hinzu."""
+    group = parser.add_argument_group("Messung")
+    group.add_argument("--report", type=Path, help="Laufbericht (Phasen und Zähler) als JSON speichern")
+    group.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "pyinstrument"],
+                       help=f"Profil des Laufs nach {PROFILE_DIR} schreiben (Standard: cprofile)")
+
+
+def _start_profiler(kind: str):
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument nicht installiert!")
+            print("Installation: pip install pyinstrument")
+            sys.exit(1)
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        return profiler
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, kind: str, script: str):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    if kind == "pyinstrument":
+        profiler.stop()
+        path = PROFILE_DIR / f"{script}.html"
+        path.write_text(profiler.output_html(), encoding="utf-8")
+        print(profiler.output_text(unicode=True, color=False))
+    else:
+        import pstats
+        profiler.disable()
+        path = PROFILE_DIR / f"{script}.prof"
+        profiler.dump_stats(path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    print(f"Profil gespeichert: {path}")
+
+
+@contextmanager
+def instrumented(script: str, args=None):
+    """
+    Rahmen für einen Skriptlauf: setzt REPORT zurück, profiliert optional
+    und gibt am Ende die Phasen aus bzw. speichert den Laufbericht.
+    """
+    REPORT.reset(script)
+    kind = getattr(args, "profile", None)
+    profiler = _start_profiler(kind) if kind else None
+    try:
+        yield REPORT
+    finally:
+        REPORT.finish()
+        if profiler is not None:
+            _stop_profiler(profiler, kind, script)
+        print(REPORT.summary())
+        path = getattr(args, "report", None)
+        if path:
+            REPORT.save(path)
+            print(f"Laufbericht gespeichert: {path}")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Headless Browser-Pool für LSN-Tabellen (Fallback zum requests-Pfad).
+
+Ein Chromium-Prozess, darin N Browser-Kontexte mit eigener LSN-Session
+(eigene Cookies). Jeder Auftrag (Tabelle, Region) leiht sich einen freien
+Kontext, navigiert durch die Frames wie ein Benutzer und übernimmt die
+generierte Tabelle direkt: den ZIP-Export über die Session des Kontexts
+oder, falls es keinen gibt, die HTML-Tabelle der Ergebnisseite.
+
+- Bilder, Schriften und CSS werden per Request-Interception verworfen
+- gewartet wird auf Selektoren statt mit festen Pausen
+- Screenshots nur bei Fehlern (data/screenshots/{tabelle}_{region}.png)
+
+Verwendung:
+    pip install playwright && playwright install chromium
+    python fetch_lsn_data.py --browser --regions 254026000 254021000 --workers 3
+"""
+
+import asyncio
+import re
+import time
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+from playwright.async_api import Browser, BrowserContext, Error as PlaywrightError, Page, async_playwright
+
+from fetch_lsn_data import DATA_DIR, GEMEINDE_LSN_ID, LSN_BASE_URL, POLL_DEADLINE, lsn_parser, table_to_long_format
+from instrumentation import REPORT
+
+SCREENSHOT_DIR = DATA_DIR / "screenshots"
+
+# Ressourcentypen, die für die Tabellen nicht gebraucht werden
+BLOCKED_RESOURCES = {"image", "font", "stylesheet", "media"}
+
+NAVIGATION_TIMEOUT = 30_000  # ms je Schritt
+RESULT_TIMEOUT = POLL_DEADLINE * 1000  # Generierung der Tabelle
+
+# Ergebnisframe: fertige Tabelle oder ZIP-Link (die Warteseite hat keines von beiden)
+RESULT_SELECTOR = "a[href$='.zip'], table"
+SUBMIT_RE = re.compile(r"Tabelle|Weiter|Anzeigen|OK", re.IGNORECASE)
+
+# Fehler beim Parsen von ZIP-Export oder HTML-Tabelle (z.B. "No tables found")
+PARSE_ERRORS = (ValueError, KeyError, zipfile.BadZipFile)
+
+
+async def _block_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """
+    N Browser-Kontexte (je eine LSN-Session) in einem headless Chromium.
+
+    Verwendung:
+        async with BrowserPool(size=3) as pool:
+            df = await pool.fetch("Z9200001", "254026000")
+    """
+
+    def __init__(self, size: int = 3, base_url: str = LSN_BASE_URL, screenshot_dir: Path = SCREENSHOT_DIR):
+        if size < 1:
+            raise ValueError("Pool-Größe muss mindestens 1 sein")
+        self.size = size
+        self.base_url = base_url
+        self.screenshot_dir = screenshot_dir
+        self._playwright = None
+        self._browser: Browser | None = None
+        # Genau size Einträge; None = Kontext wird beim nächsten Auftrag neu aufgebaut
+        self._idle: asyncio.Queue[BrowserContext | None] = asyncio.Queue()
+        self.timings: list[tuple[str, str, float]] = []
+
+    async def __aenter__(self) -> "BrowserPool":
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_context())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    async def _new_context(self) -> BrowserContext:
+        context = await self._browser.new_context(locale="de-DE", accept_downloads=True)
+        context.set_default_timeout(NAVIGATION_TIMEOUT)
+        await context.route("**/*", _block_resources)
+        page = await context.new_page()
+        with REPORT.phase("session_start"):
+            await self._start_session(page)
+        return context
+
+    async def _start_session(self, page: Page):
+        """Startseite laden und die Session mit WEITER aktivieren."""
+        await page.goto(f"{self.base_url}/default.asp", wait_until="domcontentloaded")
+        weiter = page.locator('input[value="WEITER"]')
+        if await weiter.count():
+            await weiter.click()
+            await page.wait_for_selector("frame[name='haupt']", state="attached")
+
+    async def _navigate(self, page: Page, table_id: str, region_id: str):
+        """Tabelle und Region über die Frames auswählen und die Generierung starten."""
+        frame = page.frame_locator("frame[name='haupt']").frame_locator("iframe")
+        await frame.get_by_role("button", name="Staat & Gesellschaft").click()
+        await frame.get_by_text(table_id).click()
+
+        await frame.get_by_text("Mitgliedsgemeinde").click()
+        kurzform = region_id[:6]
+        await frame.locator('input[name="RANGE0"]').fill(kurzform)
+        await frame.locator('input[name="RANGE1"]').fill(kurzform)
+        await frame.get_by_text("OK").click()
+
+        checkbox = frame.locator(f'input[value="{region_id}"]')
+        await checkbox.check()
+        await frame.get_by_role("button", name=SUBMIT_RE).last.click()
+        return frame
+
+    async def _capture(self, context: BrowserContext, page: Page, frame) -> pd.DataFrame:
+        """Wartet auf das Ergebnis und übernimmt ZIP-Export oder HTML-Tabelle."""
+        result = frame.locator(RESULT_SELECTOR).first
+        with REPORT.phase("wait"):
+            await result.wait_for(timeout=RESULT_TIMEOUT)
+
+        zip_link = frame.locator("a[href$='.zip']").first
+        if lsn_parser is not None and await zip_link.count():
+            href = await zip_link.get_attribute("href")
+            with REPORT.phase("download"):
+                response = await context.request.get(f"{self.base_url}{href}" if href.startswith("/") else href)
+                body = await response.body()
+            REPORT.count("bytes", len(body))
+            if response.ok:
+                with REPORT.phase("parse"):
+                    df = lsn_parser.parse_zip_export(body)
+                if not df.empty:
+                    return df
+
+        html = await frame.locator("body").inner_html()
+        with REPORT.phase("parse"):
+            if lsn_parser is not None:
+                return lsn_parser.parse_html_table(html)
+            return pd.read_html(html)[0]
+
+    async def _screenshot(self, page: Page, table_id: str, region_id: str):
+        self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.screenshot_dir / f"{table_id}_{region_id}.png"
+        try:
+            await page.screenshot(path=path, full_page=True)
+            print(f"  Screenshot: {path}")
+        except PlaywrightError:
+            pass
+
+    async def fetch(self, table_id: str, region_id: str = GEMEINDE_LSN_ID) -> pd.DataFrame:
+        """
+        Ruft eine Tabelle über einen freien Kontext ab.
+
+        Bei einem Fehler (Browser oder Parser) wird ein Screenshot gespeichert
+        und der Kontext verworfen; zurück kommt ein leerer DataFrame. Der
+        Platz im Pool wird in jedem Fall zurückgegeben, ein verworfener
+        Kontext wird erst beim nächsten Auftrag neu aufgebaut.
+        """
+        context = await self._idle.get()
+        healthy = False
+        page = None
+        started = time.monotonic()
+        try:
+            if context is None:
+                context = await self._new_context()
+            page = context.pages[0]
+            with REPORT.phase("table_request"):
+                frame = await self._navigate(page, table_id, region_id)
+            df = await self._capture(context, page, frame)
+            REPORT.count("rows", len(df))
+            self.timings.append((table_id, region_id, time.monotonic() - started))
+            # Für den nächsten Auftrag zurück auf die Hauptseite (Session bleibt bestehen)
+            await page.goto(f"{self.base_url}/default.asp", wait_until="domcontentloaded")
+            healthy = True
+            return df
+        except (PlaywrightError, *PARSE_ERRORS) as e:
+            print(f"Fehler bei {table_id}/{region_id}: {e}")
+            if page is not None:
+                await self._screenshot(page, table_id, region_id)
+            return pd.DataFrame()
+        finally:
+            if healthy:
+                self._idle.put_nowait(context)
+            else:
+                self._idle.put_nowait(None)
+                if context is not None:
+                    await self._discard(context)
+
+    @staticmethod
+    async def _discard(context: BrowserContext):
+        try:
+            await context.close()
+        except PlaywrightError:
+            pass
+
+
+async def fetch_batch_browser(
+    region_ids: list[str],
+    table_ids: list[str],
+    workers: int = 3,
+    base_url: str = LSN_BASE_URL
+) -> pd.DataFrame:
+    """
+    Ruft alle Kombinationen aus Regionen und Tabellen über den Browser-Pool ab.
+
+    Returns:
+        Konsolidierter DataFrame im Langformat wie fetch_batch
+        (tabelle, region_id, jahr, merkmal, wert)
+    """
+    jobs = [(table_id, region_id) for region_id in region_ids for table_id in table_ids]
+    async with BrowserPool(size=min(workers, len(jobs)) or 1, base_url=base_url) as pool:
+        frames = await asyncio.gather(*(pool.fetch(table_id, region_id) for table_id, region_id in jobs))
+        timings = pool.timings
+
+    results = [
+        table_to_long_format(df, table_id, region_id)
+        for (table_id, region_id), df in zip(jobs, frames) if not df.empty
+    ]
+    print(f"{len(results)}/{len(jobs)} Abfragen erfolgreich")
+    if timings:
+        seconds = sorted(t for _, _, t in timings)
+        print(f"  Dauer je Tabelle: Median {seconds[len(seconds) // 2]:.1f}s, Max {seconds[-1]:.1f}s")
+
+    if not results:
+        return pd.DataFrame(columns=["tabelle", "region_id", "jahr", "merkmal", "wert"])
+    result = pd.concat(results, ignore_index=True)
+    return result.sort_values(["tabelle", "region_id", "jahr", "merkmal"], ignore_index=True)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Streaming-Parser für LSN-Ergebnistabellen auf Basis von lxml.
+
+Ersetzt den BeautifulSoup-Baum (html.parser) durch einen inkrementellen
+Pull-Parser: Zeilen werden als Generator ausgegeben, verarbeitete
+Elemente sofort verworfen. Header-Erkennung ("Jahr"/"Niedersachsen")
+und Jahreszeilen-Heuristik entsprechen LSNApiClient.parse_html_table.
+
+Zahlen werden direkt typisiert (deutsche Schreibweise "1.234.567,89"),
+LSN-Geheimhaltungs- und Fehlzeichen ("-", ".", "x", ...) werden zu NaN.
+
+Der ZIP-Export (XLSX oder CSV) wird über dieselbe Header-/Jahreszeilen-
+Logik in dasselbe Schema überführt (parse_zip_export).
+
+Verwendung:
+    from lsn_parser import parse_html_table, parse_zip_export
+    df = parse_html_table(html)
+    df = parse_zip_export(response.content)
+"""
+
+import codecs
+import csv
+import io
+import math
+import zipfile
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+from lxml import etree
+
+# Zeichen der LSN-Online Datenbank für fehlende/geheime Werte
+SUPPRESSION_MARKERS = frozenset({"-", ".", "x", "X", "/", "…", "...", "•", "()"})
+
+MIN_TABLE_ROWS = 5  # Mindestens Header + Daten
+CHUNK_SIZE = 64 * 1024
+
+_CELL_TAGS = frozenset({"td", "th"})
+
+
+def is_year(text: str) -> bool:
+    """Entspricht re.match(r"^\\d{4}$", text) ohne Regex."""
+    return len(text) == 4 and text.isascii() and text.isdigit()
+
+
+def parse_german_number(text: str) -> float:
+    """
+    Wandelt eine Zahl in deutscher Schreibweise in float um.
+
+    Leere Zellen und LSN-Markierungen werden zu NaN.
+
+    Raises:
+        ValueError: Wenn der Text keine Zahl ist
+    """
+    text = text.strip().replace("\xa0", "").replace(" ", "")
+    if not text or text in SUPPRESSION_MARKERS:
+        return math.nan
+    return float(text.replace(".", "").replace(",", "."))
+
+
+def clean_header(header: str) -> str:
+    """Bereinigt einen Spaltenkopf wie der ursprüngliche Parser."""
+    return header.replace("\n", " ").replace("\r", "").strip()
+
+
+class TableRowCollector:
+    """
+    Zustandsmaschine für eine LSN-Tabelle.
+
+    Bekommt Zeilen als Liste von Zelltexten und entscheidet über
+    Header- und Datenzeilen. Wird vom HTML-Parser und von anderen
+    Quellen (z.B. XLSX/CSV aus dem ZIP-Export) gemeinsam genutzt.
+    """
+
+    def __init__(self):
+        self.headers: list[str] | None = None
+
+    def feed(self, cell_texts: list[str]) -> list[str] | None:
+        """Verarbeitet eine Zeile; gibt sie zurück, wenn es eine Datenzeile ist."""
+        if not any(cell_texts):
+            return None
+
+        # Erster relevanter Header hat "Jahr" oder "Niedersachsen"
+        if self.headers is None:
+            if any("Jahr" in t or "Niedersachsen" in t for t in cell_texts):
+                self.headers = [clean_header(h) for h in cell_texts]
+            return None
+
+        # Datenzeilen enthalten Jahreszahlen
+        if any(is_year(t.strip()) for t in cell_texts):
+            return cell_texts
+        return None
+
+
+def _cell_text(element) -> str:
+    # Entspricht BeautifulSoup get_text(strip=True)
+    return "".join(part.strip() for part in element.itertext())
+
+
+def _iter_chunks(source) -> Iterator:
+    if isinstance(source, (str, bytes)):
+        for start in range(0, len(source), CHUNK_SIZE):
+            yield source[start:start + CHUNK_SIZE]
+    elif hasattr(source, "read"):
+        while chunk := source.read(CHUNK_SIZE):
+            yield chunk
+    else:
+        yield from source
+
+
+def iter_table_rows(source) -> Iterator[tuple[list[str], list[str]]]:
+    """
+    Liefert die Datenzeilen der ersten LSN-Datentabelle als Generator.
+
+    Args:
+        source: HTML als str/bytes, Dateiobjekt oder Iterable von Chunks
+                (z.B. response.iter_content())
+
+    Yields:
+        Tuple aus (Header, Zelltexte der Datenzeile)
+
+    Zeilen werden der innersten offenen Tabelle zugeordnet. Eine
+    Tabelle zählt erst ab MIN_TABLE_ROWS Zeilen; bis dahin werden ihre
+    Datenzeilen gepuffert.
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"), tag=("table", "tr", "td", "th"))
+    # Je offener Tabelle: [Zeilenanzahl, Collector, Puffer, bereits ausgegeben]
+    tables: list[list] = []
+    row: list[str] | None = None
+
+    for chunk in _iter_chunks(source):
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            tag = element.tag
+
+            if event == "start":
+                if tag == "table":
+                    tables.append([0, TableRowCollector(), [], False])
+                elif tag == "tr":
+                    row = []
+                continue
+
+            if tag in _CELL_TAGS:
+                if row is not None:
+                    row.append(_cell_text(element))
+
+            elif tag == "tr":
+                if tables and row is not None:
+                    state = tables[-1]
+                    state[0] += 1
+                    data_row = state[1].feed(row)
+                    if data_row is not None:
+                        if state[3]:
+                            yield state[1].headers, data_row
+                        else:
+                            state[2].append(data_row)
+                    if not state[3] and state[0] >= MIN_TABLE_ROWS and state[2]:
+                        state[3] = True
+                        for buffered in state[2]:
+                            yield state[1].headers, buffered
+                        state[2].clear()
+                row = None
+                # Verarbeitete Zeilen sofort freigeben
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+            elif tag == "table" and tables:
+                state = tables.pop()
+                if state[3]:
+                    parser.close()
+                    return
+
+    parser.close()
+
+
+def parse_html_table(source) -> pd.DataFrame:
+    """
+    Parst die erste LSN-Datentabelle zu einem typisierten DataFrame.
+
+    Die Jahresspalte wird zu Int64, Zahlenspalten zu float64 (NaN für
+    LSN-Markierungen), alle übrigen Spalten bleiben Text.
+    """
+    return rows_to_frame(iter_table_rows(source))
+
+
+def rows_to_frame(rows: Iterable[tuple[list[str], list[str]]]) -> pd.DataFrame:
+    """
+    Baut typisierte Spalten direkt aus (Header, Zeile)-Paaren.
+
+    Spaltenanzahl und -namen richten sich wie im ursprünglichen Parser
+    nach der ersten Datenzeile.
+    """
+    headers = None
+    width = 0
+    texts: list[list[str]] = []
+    values: list[list[float] | None] = []
+
+    for row_headers, cells in rows:
+        if headers is None:
+            headers = row_headers
+            width = len(cells)
+            texts = [[] for _ in range(width)]
+            values = [[] for _ in range(width)]
+
+        for i in range(width):
+            text = cells[i] if i < len(cells) else ""
+            texts[i].append(text)
+            if values[i] is not None:
+                try:
+                    values[i].append(parse_german_number(text))
+                except ValueError:
+                    # Keine Zahlenspalte: nur noch Text sammeln
+                    values[i] = None
+
+    if headers is None:
+        return pd.DataFrame()
+
+    names = headers[:width] if len(headers) >= width else list(range(width))
+    data = {}
+    for position, name in enumerate(names):
+        key = name if name not in data else f"{name}.{position}"
+        data[key] = _typed_series(texts[position], values[position])
+    return pd.DataFrame(data)
+
+
+def _typed_series(texts: list[str], values: list[float] | None) -> pd.Series:
+    if values is None:
+        return pd.Series(texts, dtype="object")
+    series = pd.Series(values, dtype="float64")
+    present = [text.strip() for text, value in zip(texts, values) if not math.isnan(value)]
+    if present and all(is_year(text) for text in present):
+        series = series.astype("Int64")
+    return series
+
+
+# --- ZIP-Export (XLSX/CSV) ----------------------------------------------
+
+
+def _cell_value_text(value) -> str:
+    """Wandelt typisierte Tabellenzellen in Text um, den parse_german_number versteht."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return repr(value).replace(".", ",")
+    return str(value).strip()
+
+
+def collect_rows(rows: Iterable[list[str]]) -> Iterator[tuple[list[str], list[str]]]:
+    """Wendet Header-Erkennung und Jahreszeilen-Heuristik auf beliebige Zeilen an."""
+    collector = TableRowCollector()
+    for cells in rows:
+        data_row = collector.feed(cells)
+        if data_row is not None:
+            yield collector.headers, data_row
+
+
+def iter_xlsx_rows(stream) -> Iterator[list[str]]:
+    """Liest das erste Arbeitsblatt einer XLSX-Datei zeilenweise (read-only)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for values in sheet.iter_rows(values_only=True):
+            yield [_cell_value_text(value) for value in values]
+    finally:
+        workbook.close()
+
+
+def _detect_encoding(sample: bytes) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        sample.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # Abgeschnittenes Mehrbyte-Zeichen am Ende der Probe ist kein Fehler
+        if e.start >= len(sample) - 3:
+            return "utf-8"
+        return "cp1252"
+
+
+class _LSNDialect(csv.excel):
+    delimiter = ";"
+
+
+def iter_csv_rows(archive: zipfile.ZipFile, member: str) -> Iterator[list[str]]:
+    """Liest eine CSV-Datei aus dem Archiv zeilenweise (Trennzeichen/Kodierung erkannt)."""
+    with archive.open(member) as raw:
+        sample = raw.read(8192)
+    encoding = _detect_encoding(sample)
+    try:
+        dialect = csv.Sniffer().sniff(sample.decode(encoding, errors="replace"), delimiters=";,\t")
+    except csv.Error:
+        dialect = _LSNDialect
+
+    with archive.open(member) as raw:
+        text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+        for cells in csv.reader(text, dialect):
+            yield [cell.strip() for cell in cells]
+
+
+def parse_zip_export(data: bytes) -> pd.DataFrame:
+    """
+    Parst einen LSN-ZIP-Export vollständig im Speicher.
+
+    Die erste XLSX-Datei im Archiv hat Vorrang, sonst die erste CSV-Datei.
+    Ergebnis hat dasselbe Schema wie parse_html_table.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        members = sorted(archive.namelist())
+        xlsx = [name for name in members if name.lower().endswith(".xlsx")]
+        csvs = [name for name in members if name.lower().endswith(".csv")]
+
+        if xlsx:
+            with archive.open(xlsx[0]) as member:
+                # openpyxl benötigt ein seekbares Objekt
+                return rows_to_frame(collect_rows(iter_xlsx_rows(io.BytesIO(member.read()))))
+        if csvs:
+            return rows_to_frame(collect_rows(iter_csv_rows(archive, csvs[0])))
+
+    return pd.DataFrame()
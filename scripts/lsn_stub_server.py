@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Lokaler Stub-Server, der die LSN-Online Datenbank nachbildet.
+
+Bildet den Ablauf aus docs/LSN_DATENBANK.md nach (default.asp ->
+mustertabelle.asp -> Meta-Refresh -> Ergebnisseite -> ZIP-Export), damit der
+API-Client und der Batch-Modus ohne Netzwerk getestet werden können.
+Die Tabellenwerte sind deterministisch aus Tabelle, Region und Jahr
+abgeleitet.
+
+Verwendung:
+    python lsn_stub_server.py --port 8765
+
+    # In einem zweiten Terminal:
+    python fetch_lsn_data.py --base-url http://127.0.0.1:8765/statistik \\
+        --batch --regions 254026000 254021000 --tables Z9200001 Z9200002
+"""
+
+import argparse
+import hashlib
+import io
+import itertools
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BASE_PATH = "/statistik"
+SESSION_COOKIE = "ASPSESSIONIDLSNSTUB"
+
+# Spalten der nachgebildeten Tabellen (Auszug)
+TABLE_COLUMNS = {
+    "Z9200001": ["Grundsteuer A", "Grundsteuer B", "Gewerbesteuer", "Gemeindeanteil Einkommensteuer"],
+    "K9200001": ["Grundsteuer A", "Grundsteuer B", "Gewerbesteuer", "Gemeindeanteil Einkommensteuer"],
+    "Z9200002": ["Steuerkraft", "Hebesatz Grundsteuer A", "Hebesatz Grundsteuer B", "Hebesatz Gewerbesteuer"],
+    "K9200002": ["Steuerkraft", "Hebesatz Grundsteuer A", "Hebesatz Grundsteuer B", "Hebesatz Gewerbesteuer"],
+    "A100001G": ["Bevölkerung insgesamt", "männlich", "weiblich"],
+}
+DEFAULT_COLUMNS = ["Merkmal 1", "Merkmal 2", "Merkmal 3"]
+
+
+def stub_value(table_id: str, region_id: str, year: int, column: int) -> int:
+    """Deterministischer Beispielwert für eine Tabellenzelle."""
+    digest = hashlib.sha256(f"{table_id}|{region_id}|{year}|{column}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") % 5_000_000
+
+
+def format_german(value: int) -> str:
+    """Formatiert eine Ganzzahl mit deutschen Tausenderpunkten."""
+    return f"{value:,}".replace(",", ".")
+
+
+def format_cell(value: int) -> str:
+    """Zellinhalt wie bei LSN, einzelne Werte als geheim ("x") bzw. fehlend ("-")."""
+    if value % 97 == 0:
+        return "x"
+    if value % 89 == 0:
+        return "-"
+    return format_german(value)
+
+
+def render_result_page(table_id: str, region_id: str, years=range(1983, 2025)) -> str:
+    """Rendert eine Ergebnisseite im Stil der LSN-Online Datenbank."""
+    columns = TABLE_COLUMNS.get(table_id, DEFAULT_COLUMNS)
+    header = "".join(f"<th>{name}</th>" for name in columns)
+    rows = []
+    for year in years:
+        cells = "".join(
+            f"<td align=\"right\">{format_cell(stub_value(table_id, region_id, year, i))}</td>"
+            for i in range(len(columns))
+        )
+        rows.append(f"<tr><td>{year}</td>{cells}</tr>")
+
+    return f"""<html>
+<head><title>LSN-Online Tabelle {table_id}</title></head>
+<body>
+<table><tr><td>LSN-Online Regionaldatenbank</td></tr></table>
+<table border="1">
+<tr><th colspan="{len(columns) + 1}">Tabelle {table_id} - Region {region_id}</th></tr>
+<tr><th>Jahr</th>{header}</tr>
+{chr(10).join(rows)}
+</table>
+<a href="/html/download/{table_id}_{region_id}.zip">Download (ZIP)</a>
+</body>
+</html>"""
+
+
+def render_zip_export(table_id: str, region_id: str, years=range(1983, 2025)) -> bytes:
+    """Erzeugt einen ZIP-Export mit einer CSV-Datei (Semikolon, cp1252) wie bei LSN."""
+    columns = TABLE_COLUMNS.get(table_id, DEFAULT_COLUMNS)
+    lines = [f"Tabelle {table_id} - Region {region_id}", ";".join(["Jahr", *columns])]
+    for year in years:
+        cells = [format_cell(stub_value(table_id, region_id, year, i)) for i in range(len(columns))]
+        lines.append(";".join([str(year), *cells]))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{table_id}_{region_id}.csv", "\r\n".join(lines).encode("cp1252"))
+    return buffer.getvalue()
+
+
+class LSNStubState:
+    """Gemeinsamer Zustand des Stub-Servers (thread-sicher)."""
+
+    def __init__(self, generation_delay: float = 0.0, session_ttl: float = 0.0, fail_every: int = 0):
+        self.generation_delay = generation_delay
+        self.session_ttl = session_ttl  # 0 = Sessions laufen nicht ab
+        self.fail_every = fail_every  # jede n-te Unterseiten-Anfrage mit 503 beantworten (0 = nie)
+        self.requests: dict[str, int] = {}
+        self._jobs: dict[str, tuple[str, str, float]] = {}
+        self._sessions: dict[str, float] = {}
+        self._ids = itertools.count(1)
+        self._session_ids = itertools.count(1)
+        self._subpage_requests = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_session(self) -> str:
+        with self._lock:
+            session_id = f"s{next(self._session_ids)}"
+            self._sessions[session_id] = time.monotonic()
+        return session_id
+
+    def session_valid(self, session_id: str) -> bool:
+        with self._lock:
+            created = self._sessions.get(session_id)
+        if created is None:
+            return False
+        return not self.session_ttl or time.monotonic() - created < self.session_ttl
+
+    def inject_failure(self) -> bool:
+        """True für jede fail_every-te Anfrage auf eine Unterseite."""
+        with self._lock:
+            number = next(self._subpage_requests)
+        return bool(self.fail_every) and number % self.fail_every == 0
+
+    def count(self, path: str):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def create_job(self, table_id: str, region_id: str) -> str:
+        with self._lock:
+            job_id = str(next(self._ids))
+            self._jobs[job_id] = (table_id, region_id, time.monotonic() + self.generation_delay)
+        return job_id
+
+    def get_job(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+class LSNStubHandler(BaseHTTPRequestHandler):
+    """Request-Handler für default.asp, mustertabelle.asp und Ergebnisseiten."""
+
+    server_version = "LSNStub/1.0"
+
+    @property
+    def state(self) -> LSNStubState:
+        return self.server.state
+
+    def log_message(self, format, *args):  # noqa: A002 - Signatur der Basisklasse
+        pass
+
+    def _read_form(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("latin-1") if length else ""
+        return {key: values[0] for key, values in parse_qs(body).items()}
+
+    def _has_session(self) -> bool:
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                return self.state.session_valid(value)
+        return False
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=iso-8859-1",
+              headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str):
+        url = urlparse(self.path)
+        self.state.count(url.path)
+
+        if not url.path.startswith(BASE_PATH):
+            return self._send(404, b"Not Found")
+        path = url.path[len(BASE_PATH):]
+
+        if path == "/default.asp":
+            if method == "POST":
+                self._read_form()
+            return self._send(
+                200,
+                b"<html><frameset><frame name='haupt' src='html/haupt.asp'></frameset></html>",
+                headers={"Set-Cookie": f"{SESSION_COOKIE}={self.state.create_session()}; path=/"},
+            )
+
+        # Ohne (gültige) Session verhält sich LSN wie in der Doku beschrieben: 404
+        if not self._has_session():
+            return self._send(404, b"Not Found")
+
+        if self.state.inject_failure():
+            return self._send(503, b"Service Unavailable", headers={"Retry-After": "0"})
+
+        if path == "/html/mustertabelle.asp" and method == "POST":
+            form = self._read_form()
+            job_id = self.state.create_job(form.get("DT", ""), form.get("UG", ""))
+            body = (
+                "<html><head><meta http-equiv=\"refresh\" "
+                f"content=\"0; url='/html/ergebnis.asp?JOB={job_id}'\"></head>"
+                "<body>Tabelle wird erstellt...</body></html>"
+            )
+            return self._send(200, body.encode("latin-1"))
+
+        if path == "/html/ergebnis.asp":
+            job_id = parse_qs(url.query).get("JOB", [""])[0]
+            job = self.state.get_job(job_id)
+            if job is None:
+                return self._send(404, b"Not Found")
+            table_id, region_id, ready_at = job
+            if time.monotonic() < ready_at:
+                # Tabelle noch in Arbeit: LSN liefert erneut eine Warteseite
+                body = (
+                    "<html><head><meta http-equiv=\"refresh\" "
+                    f"content=\"1; url='/html/ergebnis.asp?JOB={job_id}'\"></head>"
+                    "<body>Tabelle wird erstellt...</body></html>"
+                )
+                return self._send(200, body.encode("latin-1"))
+            return self._send(200, render_result_page(table_id, region_id).encode("latin-1"))
+
+        if path.startswith("/html/download/") and path.endswith(".zip"):
+            table_id, _, region_id = path[len("/html/download/"):-len(".zip")].partition("_")
+            return self._send(200, render_zip_export(table_id, region_id), "application/zip")
+
+        return self._send(404, b"Not Found")
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+
+def create_stub_server(host: str = "127.0.0.1", port: int = 0, generation_delay: float = 0.0,
+                       session_ttl: float = 0.0, fail_every: int = 0) -> ThreadingHTTPServer:
+    """Erzeugt den Stub-Server (noch nicht gestartet)."""
+    server = ThreadingHTTPServer((host, port), LSNStubHandler)
+    server.daemon_threads = True
+    server.state = LSNStubState(generation_delay, session_ttl, fail_every)
+    return server
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, generation_delay: float = 0.0,
+                      session_ttl: float = 0.0, fail_every: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """
+    Startet den Stub-Server in einem Hintergrund-Thread.
+
+    Returns:
+        Tuple aus (Server, Basis-URL analog zu LSN_BASE_URL)
+    """
+    server = create_stub_server(host, port, generation_delay, session_ttl, fail_every)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{BASE_PATH}"
+
+
+def main():
+    """Haupteinstiegspunkt."""
+    parser = argparse.ArgumentParser(description="Lokaler Stub-Server für die LSN-Online Datenbank")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind-Adresse")
+    parser.add_argument("--port", type=int, default=8765, help="Port")
+    parser.add_argument(
+        "--delay", type=float, default=0.0,
+        help="Simulierte Dauer der Tabellen-Generierung in Sekunden"
+    )
+    parser.add_argument("--session-ttl", type=float, default=0.0,
+                        help="Sessions laufen nach so vielen Sekunden ab (0 = nie)")
+    parser.add_argument("--fail-every", type=int, default=0,
+                        help="Jede n-te Unterseiten-Anfrage mit 503 beantworten (0 = nie)")
+    args = parser.parse_args()
+
+    server = create_stub_server(args.host, args.port, args.delay, args.session_ttl, args.fail_every)
+    print(f"LSN-Stub läuft auf http://{args.host}:{args.port}{BASE_PATH}/default.asp")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nBeende Stub-Server")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Lokales Warehouse für die LSN-Zeitreihen (Parquet, partitioniert).
+
+Jede abgerufene LSN-Tabelle wird im Langformat (jahr, merkmal, wert) als
+Parquet-Datei je Tabelle und Region abgelegt:
+
+    data/lsn_warehouse/tabelle=Z9200001/region_id=254026000/data.parquet
+
+Spalten je Datei (typisiert):
+    jahr          int16
+    merkmal       string
+    wert          float64   (null = geheim "x" oder fehlend "-")
+    abruf         string    (api, batch, browser, import)
+    quelle_url    string    (Basis-URL der LSN-Online Datenbank bzw. Importdatei)
+    abgerufen_am  timestamp (Abruf, mit dem der Wert zuletzt geändert wurde)
+
+Upserts sind idempotent: Zeilen werden über (jahr, merkmal) zusammengeführt,
+unveränderte Werte behalten ihre Herkunft, Zeilen früherer Abrufe bleiben
+erhalten. Ändert sich in einer Partition nichts, wird die Datei nicht neu
+geschrieben; sonst atomar über eine temporäre Datei ersetzt.
+
+Abfragen laufen über DuckDB auf der View lsn (tabelle, region_id, jahr,
+merkmal, wert, abruf, quelle_url, abgerufen_am); Filter auf tabelle und
+region_id lesen nur die passenden Partitionen.
+
+Verwendung:
+    python lsn_warehouse.py                               # Übersicht
+    python lsn_warehouse.py --import data/lsn_batch.csv   # Langformat-CSV übernehmen
+    python lsn_warehouse.py --sql "SELECT region_id, jahr, wert FROM lsn
+        WHERE tabelle = 'Z9200001' AND merkmal = 'Gewerbesteuer'
+          AND region_id LIKE '254%' AND jahr BETWEEN 1983 AND 2024"
+
+    # Je Einwohner, sofern eine Tabelle mit Einwohnerzahlen abgerufen wurde:
+    SELECT s.region_id, s.jahr, s.wert / e.wert AS je_einwohner
+    FROM lsn s JOIN lsn e USING (region_id, jahr)
+    WHERE s.merkmal = 'Gewerbesteuer' AND e.merkmal LIKE '%Einwohner%'
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+WAREHOUSE_DIR = DATA_DIR / "lsn_warehouse"
+PARTITION_FILE = "data.parquet"
+
+# Spalten des Langformats (fetch_lsn_data.table_to_long_format)
+LONG_COLUMNS = ["tabelle", "region_id", "jahr", "merkmal", "wert"]
+PARTITION_KEY = ["tabelle", "region_id"]
+ROW_KEY = ["tabelle", "region_id", "jahr", "merkmal"]
+
+
+def _require_pyarrow():
+    if pa is None:
+        print("pyarrow nicht installiert!")
+        print("Installation: pip install pyarrow")
+        sys.exit(1)
+
+
+def schema():
+    """Schema einer Partitionsdatei (tabelle und region_id stehen im Pfad)."""
+    _require_pyarrow()
+    return pa.schema([
+        ("jahr", pa.int16()),
+        ("merkmal", pa.string()),
+        ("wert", pa.float64()),
+        ("abruf", pa.string()),
+        ("quelle_url", pa.string()),
+        ("abgerufen_am", pa.timestamp("s")),
+    ])
+
+
+def partition_path(table_id: str, region_id: str, warehouse_dir: Path = WAREHOUSE_DIR) -> Path:
+    return warehouse_dir / f"tabelle={table_id}" / f"region_id={region_id}" / PARTITION_FILE
+
+
+def _read_partitions(pairs: list[tuple[str, str]], warehouse_dir: Path) -> pd.DataFrame:
+    """Bestand der Partitionen (tabelle, region_id) als ein Langformat-Frame."""
+    tables = []
+    for table_id, region_id in pairs:
+        path = partition_path(table_id, region_id, warehouse_dir)
+        if not path.exists():
+            continue
+        table = pq.read_table(path, schema=schema())
+        tables.append(table
+                      .append_column("tabelle", pa.array([table_id] * table.num_rows, pa.string()))
+                      .append_column("region_id", pa.array([region_id] * table.num_rows, pa.string())))
+    if not tables:
+        table = schema().empty_table()
+        tables = [table.append_column("tabelle", pa.array([], pa.string()))
+                       .append_column("region_id", pa.array([], pa.string()))]
+    return pa.concat_tables(tables).to_pandas()
+
+
+def read_partition(table_id: str, region_id: str, warehouse_dir: Path = WAREHOUSE_DIR) -> pd.DataFrame:
+    """Zeilen einer Partition (leer, wenn sie noch nicht existiert)."""
+    return _read_partitions([(table_id, region_id)], warehouse_dir).drop(columns=["tabelle", "region_id"])
+
+
+def _write_partition(table, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def merge_rows(old: pd.DataFrame, new: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, int, int]:
+    """
+    Führt neue Zeilen über (tabelle, region_id, jahr, merkmal) mit dem Bestand zusammen.
+
+    Ein Durchlauf für alle Partitionen; Zeilen mit unverändertem Wert
+    behalten die bisherige Herkunft.
+
+    Returns:
+        (zusammengeführte Zeilen der geänderten Partitionen, geänderte
+         Zeilen, Anzahl neuer Zeilen, Anzahl geänderter Werte)
+    """
+    joined = new.merge(old[ROW_KEY + ["wert"]], on=ROW_KEY, how="left", suffixes=("", "_alt"), indicator=True)
+    existing = (joined["_merge"] == "both").to_numpy()
+    wert, wert_alt = joined["wert"].to_numpy(), joined["wert_alt"].to_numpy()
+    same = existing & ((wert == wert_alt) | (np.isnan(wert) & np.isnan(wert_alt)))
+    changed = new[~same]
+
+    partitions = pd.MultiIndex.from_frame(changed[PARTITION_KEY]).unique()
+    old = old[pd.MultiIndex.from_frame(old[PARTITION_KEY]).isin(partitions)]
+    kept = old[~pd.MultiIndex.from_frame(old[ROW_KEY]).isin(pd.MultiIndex.from_frame(changed[ROW_KEY]))]
+    merged = pd.concat([kept, changed], ignore_index=True).sort_values(ROW_KEY, ignore_index=True)
+    return merged, changed, int((~existing).sum()), int((existing & ~same).sum())
+
+
+def upsert_frame(
+    df: pd.DataFrame,
+    abruf: str,
+    quelle_url: str = "",
+    abgerufen_am: datetime | None = None,
+    warehouse_dir: Path = WAREHOUSE_DIR
+) -> dict[str, int]:
+    """
+    Übernimmt LSN-Daten im Langformat (tabelle, region_id, jahr, merkmal, wert).
+
+    Returns:
+        Zähler: partitionen_geschrieben, partitionen_unveraendert,
+        zeilen_neu, zeilen_geaendert
+    """
+    _require_pyarrow()
+    counts = dict.fromkeys(
+        ("partitionen_geschrieben", "partitionen_unveraendert", "zeilen_neu", "zeilen_geaendert"), 0
+    )
+    if df.empty:
+        return counts
+
+    abgerufen_am = (abgerufen_am or datetime.now()).replace(microsecond=0)
+    frame = pd.DataFrame({
+        "tabelle": df["tabelle"].astype(str),
+        "region_id": df["region_id"].astype(str),
+        "jahr": pd.to_numeric(df["jahr"], errors="coerce"),
+        "merkmal": df["merkmal"].astype(str),
+        "wert": pd.to_numeric(df["wert"], errors="coerce").astype("float64"),
+    }).dropna(subset=["jahr"])
+    frame["jahr"] = frame["jahr"].astype("int16")
+    frame["abruf"] = abruf
+    frame["quelle_url"] = quelle_url
+    frame["abgerufen_am"] = pd.Timestamp(abgerufen_am)
+    # Doppelte Zellen innerhalb eines Abrufs: die letzte gilt
+    frame = frame.drop_duplicates(ROW_KEY, keep="last").reset_index(drop=True)
+
+    pairs = list(frame[PARTITION_KEY].drop_duplicates().itertuples(index=False, name=None))
+    old = _read_partitions(pairs, warehouse_dir)
+    merged, changed, added, modified = merge_rows(old, frame)
+
+    # Geänderte Partitionen am Stück schreiben (merged ist nach Partition sortiert)
+    table = pa.Table.from_pandas(merged, preserve_index=False)
+    bounds = np.flatnonzero(
+        (merged["tabelle"].to_numpy()[1:] != merged["tabelle"].to_numpy()[:-1])
+        | (merged["region_id"].to_numpy()[1:] != merged["region_id"].to_numpy()[:-1])
+    ) + 1
+    for start, stop in zip([0, *bounds], [*bounds, len(merged)]):
+        if stop <= start:
+            continue
+        path = partition_path(merged["tabelle"].iat[start], merged["region_id"].iat[start], warehouse_dir)
+        _write_partition(table.slice(start, stop - start).select(schema().names).cast(schema()), path)
+
+    written = len(pd.MultiIndex.from_frame(changed[PARTITION_KEY]).unique())
+    counts["partitionen_geschrieben"] = written
+    counts["partitionen_unveraendert"] = len(pairs) - written
+    counts["zeilen_neu"] = added
+    counts["zeilen_geaendert"] = modified
+    return counts
+
+
+def import_csv(path: Path, warehouse_dir: Path = WAREHOUSE_DIR) -> dict[str, int]:
+    """Übernimmt eine Langformat-CSV (data/lsn_batch.csv, data/lsn_browser.csv)."""
+    df = pd.read_csv(path, dtype={"tabelle": str, "region_id": str, "merkmal": str})
+    missing = set(LONG_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: Spalten fehlen ({', '.join(sorted(missing))})")
+    abgerufen_am = datetime.fromtimestamp(path.stat().st_mtime)
+    return upsert_frame(df, "import", str(path), abgerufen_am, warehouse_dir)
+
+
+# --- Abfragen (DuckDB) ---
+
+def connect(warehouse_dir: Path = WAREHOUSE_DIR):
+    """
+    DuckDB-Verbindung mit der View lsn über alle Partitionen.
+
+    Partitionsspalten bleiben Text (region_id mit führenden Ziffern).
+    """
+    try:
+        import duckdb
+    except ImportError:
+        print("duckdb nicht installiert!")
+        print("Installation: pip install duckdb")
+        sys.exit(1)
+
+    connection = duckdb.connect()
+    if any(warehouse_dir.glob(f"tabelle=*/region_id=*/{PARTITION_FILE}")):
+        pattern = str(warehouse_dir / "tabelle=*" / "region_id=*" / PARTITION_FILE).replace("'", "''")
+        connection.execute(
+            f"CREATE VIEW lsn AS SELECT tabelle, region_id, jahr, merkmal, wert, abruf, quelle_url, abgerufen_am"
+            f" FROM read_parquet('{pattern}', hive_partitioning = true, hive_types_autocast = false)"
+        )
+    else:
+        connection.execute(
+            "CREATE VIEW lsn AS SELECT NULL::VARCHAR AS tabelle, NULL::VARCHAR AS region_id,"
+            " NULL::SMALLINT AS jahr, NULL::VARCHAR AS merkmal, NULL::DOUBLE AS wert,"
+            " NULL::VARCHAR AS abruf, NULL::VARCHAR AS quelle_url, NULL::TIMESTAMP AS abgerufen_am WHERE false"
+        )
+    return connection
+
+
+def query(sql: str, params: list | None = None, warehouse_dir: Path = WAREHOUSE_DIR) -> pd.DataFrame:
+    """Führt eine SQL-Abfrage gegen die View lsn aus."""
+    connection = connect(warehouse_dir)
+    try:
+        return connection.execute(sql, params or []).df()
+    finally:
+        connection.close()
+
+
+SUMMARY_SQL = """
+SELECT tabelle, COUNT(DISTINCT region_id) AS regionen, COUNT(*) AS zeilen,
+       MIN(jahr) AS von, MAX(jahr) AS bis, MAX(abgerufen_am) AS letzter_abruf
+FROM lsn GROUP BY tabelle ORDER BY tabelle
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSN-Warehouse (Parquet) befüllen und abfragen")
+    parser.add_argument("--warehouse", type=Path, default=WAREHOUSE_DIR, help="Verzeichnis des Warehouse")
+    parser.add_argument("--import", dest="import_paths", type=Path, nargs="+", metavar="CSV",
+                        help="Langformat-CSV(s) übernehmen (tabelle, region_id, jahr, merkmal, wert)")
+    parser.add_argument("--sql", help="SQL-Abfrage gegen die View lsn")
+    parser.add_argument("--csv", type=Path, help="Abfrageergebnis als CSV speichern")
+    args = parser.parse_args()
+
+    for path in args.import_paths or []:
+        started = time.perf_counter()
+        counts = import_csv(path, args.warehouse)
+        print(f"{path}: {counts['zeilen_neu']} neue, {counts['zeilen_geaendert']} geänderte Zeilen, "
+              f"{counts['partitionen_geschrieben']} Partitionen geschrieben "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    started = time.perf_counter()
+    result = query(args.sql or SUMMARY_SQL, warehouse_dir=args.warehouse)
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.csv:
+        result.to_csv(args.csv, index=False, encoding="utf-8")
+        print(f"CSV gespeichert: {args.csv}")
+    else:
+        with pd.option_context("display.max_rows", 100, "display.width", 160):
+            print(result.to_string(index=False) if len(result) else "Keine Zeilen")
+    print(f"{len(result)} Zeilen ({elapsed:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
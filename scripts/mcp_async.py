@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Asynchroner MCP-Client mit Connection-Pool und JSON-RPC-Batches.
+
+Führt die Suchanfragen und Drucksachen-Abrufe aus fetch_mcp_data.py
+parallel aus (begrenzt durch ein Semaphore) und bündelt sie, wenn der
+Server es unterstützt, als JSON-RPC-Batch mit eindeutigen Request-IDs.
+Lehnt der Server Batches ab, wird auf Einzelanfragen umgeschaltet.
+
+Verwendung:
+    pip install httpx
+    python fetch_mcp_data.py --concurrency 8
+"""
+
+import asyncio
+import itertools
+import json
+from typing import Callable
+
+import httpx
+
+from fetch_mcp_data import (
+    IMPORTANT_PAPERS,
+    MCP_URL,
+    SEARCH_LIMIT,
+    SEARCHES,
+    Sink,
+    add_paper,
+    add_search,
+    new_raw_data,
+    structured_content,
+)
+from http_cache import CacheMiss, ResponseCache
+from instrumentation import REPORT
+from transport import RequestGuard, request_async
+
+# Rückruf für AsyncMCPClient.stream: (Index des Aufrufs, Ergebnis oder Exception)
+ResultCallback = Callable[[int, "dict | Exception"], None]
+
+# JSON-RPC Fehlercodes, mit denen Server Batches ablehnen
+BATCH_REJECTED_CODES = {-32600, -32700}
+
+
+class BatchNotSupported(Exception):
+    """Der Server verarbeitet keine JSON-RPC-Batches."""
+
+
+class AsyncMCPClient:
+    """
+    Asynchroner JSON-RPC-Client für den MCP Server.
+
+    Nutzt einen httpx.AsyncClient (ein Connection-Pool für alle
+    Anfragen) und optional den gemeinsamen HTTP-Cache.
+    """
+
+    def __init__(
+        self,
+        url: str = MCP_URL,
+        max_concurrency: int = 8,
+        timeout: float = 60,
+        cache: ResponseCache | None = None,
+        use_batches: bool = True,
+        guard: RequestGuard | None = None
+    ):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.use_batches = use_batches
+        self.guard = guard or RequestGuard()
+        self._ids = itertools.count(1)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+        self._client = None
+
+    def _payload(self, method: str, params: dict = None) -> dict:
+        payload = {"jsonrpc": "2.0", "method": method, "id": next(self._ids)}
+        if params:
+            payload["params"] = params
+        return payload
+
+    def _cached(self, payload: dict) -> dict | None:
+        if self.cache is None:
+            return None
+        response = self.cache.lookup("POST", self.url, json=payload)
+        if response is not None:
+            return response.json()
+        if self.cache.offline:
+            raise CacheMiss(f"Kein Cache-Eintrag für {payload.get('method')} (--offline)")
+        return None
+
+    def _store(self, payload: dict, result: dict):
+        if self.cache is not None and "result" in result:
+            self.cache.store(
+                "POST", self.url,
+                json.dumps(result, ensure_ascii=False).encode("utf-8"),
+                json=payload
+            )
+
+    async def _post(self, body) -> httpx.Response:
+        """POST mit Rate-Limit, Wiederholungen und Circuit-Breaker (transport.py)."""
+        async with self._semaphore:
+            with REPORT.phase("mcp_call"):
+                return await request_async(
+                    self.guard,
+                    lambda: self._client.post(self.url, json=body),
+                    self.url,
+                    retry_exceptions=(httpx.TransportError,),
+                )
+
+    async def call(self, method: str, params: dict = None) -> dict:
+        """Einzelner JSON-RPC-Aufruf (entspricht call_mcp)."""
+        payload = self._payload(method, params)
+        cached = self._cached(payload)
+        if cached is not None:
+            return cached
+
+        response = await self._post(payload)
+        response.raise_for_status()
+        result = response.json()
+        self._store(payload, result)
+        return result
+
+    async def _send_batch(self, payloads: list[dict]) -> list[dict]:
+        """
+        Sendet einen Batch.
+
+        Raises:
+            BatchNotSupported: Server lehnt den Batch auf JSON-RPC-Ebene ab
+            httpx.HTTPStatusError: sonstige HTTP-Fehler (429/5xx nach allen Wiederholungen)
+        """
+        response = await self._post(payloads)
+        try:
+            results = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise BatchNotSupported("Antwort ist kein JSON")
+
+        if isinstance(results, dict):
+            # Einzelne Fehlerantwort statt Array: Batch wurde abgelehnt
+            if results.get("error", {}).get("code") in BATCH_REJECTED_CODES:
+                raise BatchNotSupported(results["error"].get("message", ""))
+            response.raise_for_status()
+            raise BatchNotSupported("Antwort ist kein JSON-Array")
+        response.raise_for_status()
+
+        by_id = {result.get("id"): result for result in results if isinstance(result, dict)}
+        missing = [payload for payload in payloads if payload["id"] not in by_id]
+        if missing:
+            raise BatchNotSupported(f"{len(missing)} Antworten fehlen im Batch")
+        return [by_id[payload["id"]] for payload in payloads]
+
+    async def _call_one(self, i: int, call: tuple[str, dict], on_result: ResultCallback):
+        try:
+            result = await self.call(*call)
+        except Exception as e:
+            result = e
+        on_result(i, result)
+
+    async def _run_chunk(self, chunk: list[int], payloads: list[dict], calls: list[tuple[str, dict]],
+                         on_result: ResultCallback):
+        """
+        Ein Batch; lehnt der Server Batches ab, die Aufrufe einzeln.
+
+        Andere Fehler (HTTP-Status, Verbindung, offener Circuit-Breaker)
+        schalten Batches nicht ab; sie wurden im Transport bereits
+        wiederholt und gehen als Ergebnis an alle Aufrufe des Batches.
+        """
+        if self.use_batches:
+            try:
+                outcome = await self._send_batch([payloads[i] for i in chunk])
+            except BatchNotSupported as e:
+                if self.use_batches:
+                    print(f"  Server lehnt JSON-RPC-Batches ab ({e}), nutze Einzelanfragen")
+                self.use_batches = False
+            except Exception as e:
+                for i in chunk:
+                    on_result(i, e)
+                return
+            else:
+                for i, result in zip(chunk, outcome):
+                    self._store(payloads[i], result)
+                    on_result(i, result)
+                return
+        await asyncio.gather(*(self._call_one(i, calls[i], on_result) for i in chunk))
+
+    async def stream(
+        self,
+        calls: list[tuple[str, dict]],
+        on_result: ResultCallback,
+        batch_size: int = 10
+    ):
+        """
+        Führt viele Aufrufe aus, als Batches oder parallel einzeln.
+
+        on_result(index, ergebnis) wird aufgerufen, sobald ein Aufruf (bzw.
+        sein Batch) fertig ist; fehlgeschlagene Aufrufe kommen als
+        Exception-Objekt. Die Ergebnisse werden nicht gesammelt.
+        """
+        payloads = [self._payload(method, params) for method, params in calls]
+        pending = []
+        for i, payload in enumerate(payloads):
+            try:
+                cached = self._cached(payload)
+            except CacheMiss as e:
+                cached = e
+            if cached is None:
+                pending.append(i)
+            else:
+                on_result(i, cached)
+
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        await asyncio.gather(*(self._run_chunk(chunk, payloads, calls, on_result) for chunk in chunks))
+
+    async def call_many(
+        self,
+        calls: list[tuple[str, dict]],
+        batch_size: int = 10
+    ) -> list[dict | Exception]:
+        """
+        Wie stream, sammelt aber alle Ergebnisse.
+
+        Returns:
+            Ergebnisse in Reihenfolge der Aufrufe; fehlgeschlagene Aufrufe
+            als Exception-Objekt
+        """
+        results: list[dict | Exception | None] = [None] * len(calls)
+
+        def collect(i: int, result: dict | Exception):
+            results[i] = result
+
+        await self.stream(calls, collect, batch_size)
+        return results
+
+
+def search_call(query: str, limit: int = SEARCH_LIMIT, date_from: str = None) -> tuple[str, dict]:
+    """tools/call-Parameter für search_documents."""
+    args = {"query": query, "limit": limit}
+    if date_from:
+        args["date_from"] = date_from
+    return "tools/call", {"name": "search_documents", "arguments": args}
+
+
+def paper_call(reference: str) -> tuple[str, dict]:
+    """tools/call-Parameter für get_paper_by_reference."""
+    return "tools/call", {"name": "get_paper_by_reference", "arguments": {"reference": reference}}
+
+
+async def fetch_all_haushalt_data_async(
+    searches: list[dict] = SEARCHES,
+    papers: list[str] = IMPORTANT_PAPERS,
+    max_concurrency: int = 8,
+    cache: ResponseCache | None = None,
+    limit: int = SEARCH_LIMIT,
+    guard: RequestGuard | None = None,
+    sink: Sink | None = None
+) -> dict:
+    """
+    Wie fetch_all_haushalt_data, aber alle Anfragen parallel.
+
+    Jede Antwort geht sofort nach Eintreffen an add_search bzw. add_paper
+    (mit sink also direkt in den Rohdatenspeicher) und wird danach
+    verworfen. Die Reihenfolge in all_data entspricht der seriellen
+    Variante, der sink erhält die Datensätze in Eingangsreihenfolge.
+    """
+    print(f"Starte Datenabfrage vom MCP Server (parallel, max. {max_concurrency})...")
+    all_data = new_raw_data()
+    if sink is not None:
+        sink("lauf", all_data["metadata"])
+
+    calls = [search_call(s["query"], limit, s.get("date_from")) for s in searches]
+    calls += [paper_call(ref) for ref in papers]
+    # Je Aufruf die (mit sink nur noch kleinen) Einträge für all_data
+    parts: list[dict | None] = [None] * len(calls)
+
+    def handle(i: int, result: dict | Exception):
+        part = {"searches": [], "papers": []}
+        if i < len(searches):
+            search = searches[i]
+            if isinstance(result, Exception):
+                print(f"  Fehler bei Suche '{search['query'][:50]}': {result}")
+                return
+            add_search(part, search, structured_content(result).get("results", []), sink)
+        else:
+            ref = papers[i - len(searches)]
+            if isinstance(result, Exception):
+                print(f"  Fehler bei Drucksache {ref}: {result}")
+                return
+            paper = structured_content(result)
+            if paper:
+                add_paper(part, paper, sink)
+        parts[i] = part
+
+    async with AsyncMCPClient(max_concurrency=max_concurrency, cache=cache, guard=guard) as client:
+        await client.stream(calls, handle)
+
+    for key in ("searches", "papers"):
+        all_data[key] = [entry for part in parts if part is not None for entry in part[key]]
+
+    print(f"  {len(all_data['searches'])} Suchen, {len(all_data['papers'])} Drucksachen")
+    return all_data
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Inkrementelle Synchronisation der MCP-Rohdaten.
+
+Führt ein lokales Manifest (data/mcp_manifest.json) mit allen bereits
+gesehenen Dokumenten (file_hash/oparl_id), den abgerufenen Drucksachen
+und dem letzten Synchronisationsdatum je Suchanfrage. Beim nächsten
+Lauf wird jede Suche nur ab diesem Datum wiederholt, bekannte
+Drucksachen werden übersprungen und nur neue Treffer an den
+Rohdatenspeicher (raw_store.py) angehängt.
+
+Das Datum einer Suche rückt nur vor, wenn sie weniger als SEARCH_LIMIT
+Treffer geliefert hat; sonst fehlen womöglich Treffer, und die Suche
+wird beim nächsten Lauf ab dem alten Datum wiederholt.
+
+Verwendung:
+    python fetch_mcp_data.py --incremental
+"""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+from typing import Iterable
+
+from fetch_mcp_data import DATA_DIR, IMPORTANT_PAPERS, SEARCH_LIMIT, SEARCHES, document_key
+from raw_store import RawStore
+
+MANIFEST_PATH = DATA_DIR / "mcp_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def search_complete(daten: dict) -> bool:
+    """Hat die Suche alle Treffer geliefert (weniger als SEARCH_LIMIT)?"""
+    return daten.get("result_count", SEARCH_LIMIT) < SEARCH_LIMIT
+
+
+class SyncManifest:
+    """Manifest der bereits synchronisierten Dokumente und Suchanfragen."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        self.queries: dict[str, dict] = {}
+        self.documents: dict[str, dict] = {}
+        self.papers: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH) -> "SyncManifest":
+        manifest = cls(path)
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            manifest.queries = stored.get("queries", {})
+            manifest.documents = stored.get("documents", {})
+            manifest.papers = stored.get("papers", {})
+        return manifest
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], path: Path = MANIFEST_PATH) -> "SyncManifest":
+        """Baut ein Manifest aus vorhandenen Rohdatensätzen (erste inkrementelle Synchronisation)."""
+        manifest = cls(path)
+        synced = ""
+        for record in records:
+            daten = record["daten"]
+            if record["art"] == "lauf":
+                synced = daten.get("fetched_at", "")[:10]
+            elif record["art"] == "suche" and synced and search_complete(daten):
+                manifest.queries[daten["query"]] = {"last_sync": synced}
+            elif record["art"] == "treffer":
+                manifest.add_documents([daten])
+            elif record["art"] == "drucksache" and daten.get("reference"):
+                manifest.papers[daten["reference"]] = synced
+        return manifest
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "queries": self.queries,
+                "documents": self.documents,
+                "papers": self.papers,
+            }, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def add_documents(self, results: list[dict]) -> list[dict]:
+        """Merkt neue Treffer vor und gibt nur die bisher unbekannten zurück."""
+        new = []
+        for result in results:
+            key = document_key(result)
+            if not key or key in self.documents:
+                continue
+            self.documents[key] = {
+                "oparl_id": result.get("oparl_id", ""),
+                "reference": result.get("reference", ""),
+                "date": result.get("date", ""),
+            }
+            new.append(result)
+        return new
+
+    def date_from(self, search: dict) -> str | None:
+        """Startdatum einer Suche: letzter Sync (inklusive), frühestens date_from."""
+        last_sync = self.queries.get(search["query"], {}).get("last_sync")
+        configured = search.get("date_from")
+        if last_sync and (not configured or last_sync > configured):
+            return last_sync
+        return configured
+
+
+def incremental_sync(
+    fetch,
+    store: RawStore,
+    searches: list[dict] = SEARCHES,
+    papers: list[str] = IMPORTANT_PAPERS,
+    manifest_path: Path = MANIFEST_PATH
+) -> dict[str, int]:
+    """
+    Ruft nur neue Dokumente ab und hängt sie an den Rohdatenspeicher an.
+
+    Args:
+        fetch: Funktion (searches, papers, sink) -> Rohdaten, z.B. fetch_mcp_data.fetch_data;
+               sink erhält jeden Datensatz beim Eintreffen
+        store: Rohdatenspeicher; das Manifest wird erst nach dem Schreiben aktualisiert
+
+    Returns:
+        Anzahl neuer Treffer und Drucksachen
+    """
+    if manifest_path.exists():
+        manifest = SyncManifest.load(manifest_path)
+    else:
+        manifest = SyncManifest.from_records(store.iter_records(), manifest_path)
+
+    today = date.today().isoformat()
+    pending_searches = [{**search, "date_from": manifest.date_from(search)} for search in searches]
+    pending_papers = [ref for ref in papers if ref not in manifest.papers]
+
+    print(f"Inkrementelle Synchronisation: {len(pending_searches)} Suchen, "
+          f"{len(pending_papers)} neue Drucksachen, {len(manifest.documents)} bekannte Dokumente")
+
+    counts = {"treffer": 0, "drucksache": 0}
+
+    def sink(art: str, daten: dict, **felder):
+        # Bekannte Treffer verwerfen, alles andere sofort in den Speicher
+        if art == "treffer" and not manifest.add_documents([daten]):
+            return
+        if art == "suche":
+            if search_complete(daten):
+                manifest.queries[daten["query"]] = {"last_sync": today}
+            else:
+                print(f"  Suche '{daten['query'][:50]}' am Limit ({SEARCH_LIMIT} Treffer), "
+                      f"Stand bleibt bei {manifest.date_from(daten) or 'Anfang'}")
+        elif art == "drucksache" and daten.get("reference"):
+            manifest.papers[daten["reference"]] = today
+        if art in counts:
+            counts[art] += 1
+        store.append(art, daten, **felder)
+
+    fetch(pending_searches, pending_papers, sink)
+    store.flush()
+    manifest.save()
+
+    print(f"  {counts['treffer']} neue Dokumente, {counts['drucksache']} neue Drucksachen "
+          f"(Stand {datetime.now():%Y-%m-%d %H:%M})")
+    return counts
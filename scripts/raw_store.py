@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Append-only Rohdatenspeicher für die MCP-Abrufe (NDJSON, optional zstd).
+
+Jeder Datensatz ist eine Zeile mit Umschlag:
+
+    {"art": "lauf",       "daten": {fetched_at, source, description}}
+    {"art": "suche",      "daten": {query, date_from, result_count}}
+    {"art": "treffer",    "query": "...", "daten": {Suchtreffer}}
+    {"art": "drucksache", "daten": {Drucksache}}
+
+Datensätze werden geschrieben, sobald sie eintreffen, und mit
+iter_records() als Generator gelesen, ohne die Datei vollständig zu laden.
+Ein kleiner Offset-Index (<datei>.index.json) ordnet file_hash/oparl_id
+und reference der Position des letzten passenden Datensatzes zu; get()
+liest damit genau einen Datensatz.
+
+Mit der Endung .zst wird jeder Datensatz als eigener zstd-Frame
+geschrieben. Aneinandergehängte Frames sind eine gültige zstd-Datei
+(zstd -dc liefert das NDJSON) und bleiben einzeln adressierbar.
+
+Verwendung:
+    python raw_store.py                          # Übersicht
+    python raw_store.py --get "DS 89/2024"       # ein Datensatz
+    python raw_store.py --import data/haushalt_mcp_raw.json
+    python raw_store.py --reindex
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RAW_STORE_PATH = DATA_DIR / "mcp_raw.ndjson"
+LEGACY_RAW_PATH = DATA_DIR / "haushalt_mcp_raw.json"
+
+INDEX_VERSION = 1
+ZSTD_LEVEL = 10
+READ_CHUNK = 1 << 16
+
+
+def _zstd():
+    """
+    Das Modul zstandard für .zst-Speicher.
+
+    Raises:
+        ImportError: zstandard ist nicht installiert (die Kommandozeile beendet sich dann)
+    """
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstandard nicht installiert!\nInstallation: pip install zstandard") from e
+    return zstandard
+
+
+def record_keys(record: dict) -> list[str]:
+    """Indexschlüssel eines Datensatzes (file_hash bzw. oparl_id und reference)."""
+    daten = record.get("daten", {})
+    if record.get("art") not in ("treffer", "drucksache"):
+        return []
+    keys = [daten.get("file_hash") or daten.get("oparl_id"), daten.get("reference")]
+    return [key for key in keys if key]
+
+
+def raw_data_records(data: dict) -> Iterator[dict]:
+    """Wandelt Rohdaten im alten JSON-Format (metadata/searches/papers) in Datensätze."""
+    yield {"art": "lauf", "daten": data.get("metadata", {})}
+    for search in data.get("searches", []):
+        yield {"art": "suche", "daten": {k: v for k, v in search.items() if k != "results"}}
+        for result in search.get("results", []):
+            yield {"art": "treffer", "query": search["query"], "daten": result}
+    for paper in data.get("papers", []):
+        yield {"art": "drucksache", "daten": paper}
+
+
+class RawStore:
+    """
+    Append-only NDJSON-Datei mit Offset-Index.
+
+    Verwendung:
+        with RawStore() as store:
+            store.append("treffer", result, query="Haushaltsplan 2025")
+        for record in RawStore().iter_records("treffer"):
+            ...
+    """
+
+    def __init__(self, path: Path = RAW_STORE_PATH):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".index.json")
+        self.compressed = self.path.suffix == ".zst"
+        self._compressor = _zstd().ZstdCompressor(level=ZSTD_LEVEL) if self.compressed else None
+        self._file: BinaryIO | None = None
+        self._index: dict[str, list[int]] | None = None
+        self._dirty = False
+
+    def __enter__(self) -> "RawStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def exists(self) -> bool:
+        return self.path.exists() and self.path.stat().st_size > 0
+
+    # --- Schreiben ---
+
+    def append(self, art: str, daten: dict, **felder):
+        """Hängt einen Datensatz an (sofort auf die Platte, Index beim flush)."""
+        record = {"art": art, **felder, "daten": daten}
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        if self.compressed:
+            line = self._compressor.compress(line)
+
+        index = self.index()
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+        offset = self._file.tell()
+        self._file.write(line)
+        self._file.flush()
+        for key in record_keys(record):
+            index[key] = [offset, len(line)]
+        self._dirty = True
+
+    def extend(self, records: Iterable[dict]):
+        for record in records:
+            felder = {k: v for k, v in record.items() if k not in ("art", "daten")}
+            self.append(record["art"], record["daten"], **felder)
+
+    def clear(self):
+        """Leert den Speicher (vollständiger Neuabruf)."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+        self._index = {}
+
+    def flush(self):
+        """Schreibt den Offset-Index (zusammen mit der Dateigröße, für die er gilt)."""
+        if self._file is not None:
+            self._file.flush()
+        if not self._dirty:
+            return
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "size": self.path.stat().st_size,
+                "keys": self._index,
+            }, f, ensure_ascii=False)
+        self._dirty = False
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Lesen ---
+
+    def _frames(self) -> Iterator[tuple[int, int, bytes]]:
+        """(Offset, Länge, NDJSON-Zeile) aller Datensätze in Dateireihenfolge."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            if self.compressed:
+                yield from self._zstd_frames(f)
+                return
+            offset = 0
+            for line in f:
+                yield offset, len(line), line
+                offset += len(line)
+
+    def _zstd_frames(self, f: BinaryIO) -> Iterator[tuple[int, int, bytes]]:
+        zstandard = _zstd()
+        offset, buffer = 0, b""
+        while True:
+            if not buffer:
+                buffer = f.read(READ_CHUNK)
+                if not buffer:
+                    return
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+            start, parts = offset, []
+            while True:
+                parts.append(decompressor.decompress(buffer))
+                if decompressor.eof:
+                    rest = decompressor.unused_data
+                    offset += len(buffer) - len(rest)
+                    buffer = rest
+                    break
+                offset += len(buffer)
+                buffer = f.read(READ_CHUNK)
+                if not buffer:
+                    print(f"Warnung: unvollständiger Frame am Ende von {self.path} ignoriert")
+                    return
+            yield start, offset - start, b"".join(parts)
+
+    def iter_records(self, *arten: str) -> Iterator[dict]:
+        """Liest die Datensätze nacheinander (optional nur bestimmte Arten)."""
+        for _, _, line in self._frames():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Abgebrochener Schreibvorgang am Dateiende
+                print(f"Warnung: unvollständiger Datensatz in {self.path} ignoriert")
+                continue
+            if not arten or record.get("art") in arten:
+                yield record
+
+    __iter__ = iter_records
+
+    def index(self) -> dict[str, list[int]]:
+        """Offset-Index; wird neu aufgebaut, wenn er fehlt oder nicht zur Datei passt."""
+        if self._index is None:
+            self._index = self._load_index()
+        if self._index is None:
+            self.reindex()
+        return self._index
+
+    def _load_index(self) -> dict[str, list[int]] | None:
+        if not self.path.exists():
+            return {}
+        if not self.index_path.exists():
+            return None
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("version") != INDEX_VERSION or stored.get("size") != self.path.stat().st_size:
+            return None
+        return stored["keys"]
+
+    def reindex(self):
+        """Baut den Offset-Index durch einen Lauf über die Datei neu auf."""
+        self._index = {}
+        for offset, length, line in self._frames():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            for key in record_keys(record):
+                self._index[key] = [offset, length]
+        self._dirty = True
+        self.flush()
+
+    def get(self, key: str) -> dict | None:
+        """Letzter Datensatz zu file_hash/oparl_id oder reference (None, wenn unbekannt)."""
+        position = self.index().get(key)
+        if position is None:
+            return None
+        offset, length = position
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if self.compressed:
+            data = _zstd().ZstdDecompressor().decompress(data)
+        return json.loads(data)
+
+    def import_json(self, path: Path = LEGACY_RAW_PATH) -> int:
+        """Übernimmt Rohdaten im alten JSON-Format; gibt die Anzahl der Datensätze zurück."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        records = list(raw_data_records(data))
+        self.extend(records)
+        self.flush()
+        return len(records)
+
+
+def open_store(path: Path = RAW_STORE_PATH, legacy_path: Path = LEGACY_RAW_PATH) -> RawStore:
+    """Öffnet den Speicher und übernimmt beim ersten Mal vorhandene JSON-Rohdaten."""
+    store = RawStore(path)
+    if not store.exists() and legacy_path.exists():
+        count = store.import_json(legacy_path)
+        print(f"{count} Datensätze aus {legacy_path.name} übernommen")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP-Rohdatenspeicher (NDJSON) anzeigen und pflegen")
+    parser.add_argument("--store", type=Path, default=RAW_STORE_PATH,
+                        help="NDJSON-Datei (Endung .zst für zstd-Kompression)")
+    parser.add_argument("--get", metavar="SCHLUESSEL", help="Datensatz zu file_hash/oparl_id oder reference")
+    parser.add_argument("--import", dest="import_path", type=Path, metavar="JSON",
+                        help="Rohdaten im alten JSON-Format anhängen")
+    parser.add_argument("--reindex", action="store_true", help="Offset-Index neu aufbauen")
+    args = parser.parse_args()
+
+    try:
+        with RawStore(args.store) as store:
+            if args.import_path:
+                print(f"{store.import_json(args.import_path)} Datensätze übernommen")
+            if args.reindex:
+                store.reindex()
+                print(f"Index neu aufgebaut: {store.index_path}")
+            if args.get:
+                record = store.get(args.get)
+                if record is None:
+                    print(f"Kein Datensatz für {args.get}")
+                    sys.exit(1)
+                print(json.dumps(record, ensure_ascii=False, indent=2))
+                return
+
+            counts = Counter(record["art"] for record in store.iter_records())
+            print(f"{store.path}: {sum(counts.values())} Datensätze, {len(store.index())} Indexschlüssel")
+            for art, count in sorted(counts.items()):
+                print(f"  {art:<12} {count}")
+    except ImportError as e:
+        print(e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Hierarchische Sankey-Ebenen mit Zusammenfassung kleiner Flüsse.
+
+Statt einer flachen Kante je Position (bei Produktkonten mehrere tausend)
+wird der Haushalt als Baum Teilhaushalt -> Produktbereich -> Produkt
+aufbereitet. Jede Ebene eines Knotens wird als eigene Datei abgelegt und
+erst beim Aufklappen geladen:
+
+    public/data/sankey/{jahr}/{richtung}/index.json             Haushalt -> Teilhaushalte
+    public/data/sankey/{jahr}/{richtung}/{th}.json              Teilhaushalt -> Produktbereiche
+    public/data/sankey/{jahr}/{richtung}/{th}/{pb}.json         Produktbereich -> Produkte
+
+Je Datei werden Flüsse unter --min-share des Elternknotens und alles über
+--max-edges Kanten zu einem Knoten "Übrige" zusammengefasst, damit jedes
+Diagramm unabhängig von der Datenmenge höchstens max_edges + 1 Knoten hat.
+Das Format (nodes/links, Werte in T€) entspricht dem von SankeyChart.astro.
+
+Eingabe: CSV oder Parquet mit den Spalten jahr, richtung (einnahmen/ausgaben),
+teilhaushalt, produktbereich, produkt, wert. Ohne Eingabedatei werden die
+Kategorien aus data/haushalt_nordstemmen.yaml als einstufiger Baum genutzt.
+
+Verwendung:
+    python sankey_levels.py --input data/haushalt_produkte.csv --years 2024-2026
+    python sankey_levels.py --min-share 0.03 --max-edges 10
+"""
+
+import argparse
+import json
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from generate_mermaid import FLOW_SECTIONS, parse_years, write_if_changed
+from haushalt_matrix import HaushaltMatrix, load_haushalt_matrix
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+INPUT_PATH = DATA_DIR / "haushalt_produkte.csv"
+OUTPUT_DIR = Path(__file__).parent.parent / "public" / "data" / "sankey"
+
+DEFAULT_LEVELS = ("teilhaushalt", "produktbereich", "produkt")
+DEFAULT_MIN_SHARE = 0.02
+DEFAULT_MAX_EDGES = 12
+ROOT_NODE = "Gemeinde"
+OTHER_NODE = "Übrige"
+
+
+def slugify(name: str) -> str:
+    """Dateiname aus einer Knotenbezeichnung (ASCII, Kleinbuchstaben)."""
+    text = unicodedata.normalize("NFKD", name.replace("ß", "ss")).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "knoten"
+
+
+def bucket_children(children: pd.Series, min_share: float, max_edges: int) -> list[tuple[str, float, int]]:
+    """
+    Fasst kleine Kindflüsse zusammen.
+
+    Args:
+        children: Werte je Kindknoten
+        min_share: Mindestanteil am Elternwert, darunter -> "Übrige"
+        max_edges: Höchstzahl Kanten (inklusive "Übrige")
+
+    Returns:
+        [(name, wert, anzahl_zusammengefasst)], absteigend nach Wert;
+        anzahl ist 1 für echte Knoten
+    """
+    if max_edges < 2:
+        raise ValueError("max_edges muss mindestens 2 sein")
+    ordered = children[children > 0].sort_values(ascending=False, kind="stable")
+    total = ordered.sum()
+    if total <= 0:
+        return []
+
+    large = ordered[ordered >= min_share * total]
+    if len(large) == len(ordered) and len(ordered) <= max_edges:
+        return [(name, value, 1) for name, value in ordered.items()]
+
+    keep = large.iloc[:max_edges - 1]
+    rest = ordered.iloc[len(keep):]
+    result = [(name, value, 1) for name, value in keep.items()]
+    if len(rest) == 1:
+        result.append((rest.index[0], rest.iloc[0], 1))
+    else:
+        result.append((OTHER_NODE, rest.sum(), len(rest)))
+    return result
+
+
+def level_payload(parent_path: list[str], richtung: str, year: int,
+                  children: list[tuple[str, float, int]], child_files: dict[str, str]) -> dict:
+    """Datei einer Ebene im Format von SankeyChart.astro (nodes/links, Werte in T€)."""
+    parent = parent_path[-1] if parent_path else ROOT_NODE
+    child_type = "einnahme" if richtung == "einnahmen" else "ausgabe"
+    nodes = [{"name": parent, "type": "gemeinde"}]
+    links = []
+    for name, value, count in children:
+        node = {"name": name, "type": child_type, "wert": round(value)}
+        if count > 1:
+            node["anzahl"] = count
+        if name in child_files:
+            node["datei"] = child_files[name]
+        nodes.append(node)
+        source, target = (len(nodes) - 1, 0) if richtung == "einnahmen" else (0, len(nodes) - 1)
+        links.append({"source": source, "target": target, "value": round(value / 1000)})
+
+    return {
+        "jahr": year,
+        "richtung": richtung,
+        "ebene": len(parent_path),
+        "pfad": parent_path,
+        "summe": round(sum(value for _, value, _ in children)),
+        "nodes": nodes,
+        "links": links,
+    }
+
+
+def build_levels(
+    items: pd.DataFrame,
+    richtung: str,
+    year: int,
+    levels: tuple[str, ...] = DEFAULT_LEVELS,
+    min_share: float = DEFAULT_MIN_SHARE,
+    max_edges: int = DEFAULT_MAX_EDGES
+) -> dict[str, dict]:
+    """
+    Baut alle Ebenendateien einer Richtung und eines Jahres.
+
+    Args:
+        items: Positionen mit den Spalten aus levels und "wert"
+
+    Returns:
+        {relativer Dateipfad: Inhalt}
+    """
+    # Summen je Präfix des Pfads, einmal je Ebene gruppiert und nach Elternpfad aufgeteilt
+    children_of = [{(): items.groupby(levels[0], sort=False)["wert"].sum()}]
+    for depth in range(1, len(levels)):
+        sums = items.groupby(list(levels[:depth + 1]), sort=False)["wert"].sum()
+        parents = list(range(depth))
+        children_of.append({
+            parent if isinstance(parent, tuple) else (parent,): group.droplevel(parents)
+            for parent, group in sums.groupby(level=parents, sort=False)
+        })
+
+    files = {}
+    pending = [((), "index.json")]
+    while pending:
+        parent_path, filename = pending.pop()
+        depth = len(parent_path)
+        level_sums = children_of[depth][parent_path]
+        children = bucket_children(level_sums, min_share, max_edges)
+
+        child_files = {}
+        if depth + 1 < len(levels):
+            directory = filename.removesuffix(".json") if depth else ""
+            used = set()
+            for name, _, count in children:
+                if count > 1:
+                    continue
+                base = slug = slugify(name)
+                suffix = 2
+                while slug in used:
+                    slug, suffix = f"{base}-{suffix}", suffix + 1
+                used.add(slug)
+                child_file = f"{directory}/{slug}.json" if directory else f"{slug}.json"
+                child_files[name] = child_file
+                pending.append(((*parent_path, name), child_file))
+
+        files[filename] = level_payload(list(parent_path), richtung, year, children, child_files)
+    return files
+
+
+def load_items(path: Path) -> pd.DataFrame:
+    """Positionen aus CSV oder Parquet."""
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def matrix_items(matrix: HaushaltMatrix, years: list[int]) -> pd.DataFrame:
+    """Kategorien der YAML-Datei als Positionen (einstufiger Baum)."""
+    frames = []
+    for richtung, section in FLOW_SECTIONS:
+        block = matrix.year_block(section, years)
+        for j, year in enumerate(years):
+            frames.append(pd.DataFrame({
+                "jahr": year, "richtung": richtung,
+                "kategorie": matrix.names(section), "wert": block[:, j],
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hierarchische Sankey-Ebenen erzeugen")
+    parser.add_argument("--input", type=Path, default=INPUT_PATH,
+                        help="Positionen (CSV/Parquet: jahr, richtung, teilhaushalt, produktbereich, produkt, wert)")
+    parser.add_argument("--years", default="2024-2026", help="Jahre, z.B. 2010-2029")
+    parser.add_argument("--min-share", type=float, default=DEFAULT_MIN_SHARE,
+                        help="Mindestanteil am Elternknoten, kleinere Flüsse -> Übrige")
+    parser.add_argument("--max-edges", type=int, default=DEFAULT_MAX_EDGES, help="Höchstzahl Kanten je Datei")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Zielverzeichnis")
+    args = parser.parse_args()
+    if args.max_edges < 2:
+        parser.error("--max-edges muss mindestens 2 sein (eine Kante plus \"Übrige\")")
+    if not 0 <= args.min_share < 1:
+        parser.error("--min-share muss zwischen 0 und 1 liegen")
+
+    years = parse_years(args.years)
+    if args.input.exists():
+        items = load_items(args.input)
+        levels = DEFAULT_LEVELS
+        print(f"{len(items)} Positionen aus {args.input}")
+    else:
+        print(f"{args.input} fehlt, nutze die Kategorien aus der YAML-Datei")
+        items = matrix_items(load_haushalt_matrix(), years)
+        levels = ("kategorie",)
+
+    outputs = {}
+    for (year, richtung), group in items[items["jahr"].isin(years)].groupby(["jahr", "richtung"]):
+        files = build_levels(group, richtung, int(year), levels, args.min_share, args.max_edges)
+        for filename, payload in files.items():
+            outputs[args.output_dir / str(year) / richtung / filename] = json.dumps(
+                payload, ensure_ascii=False, separators=(",", ":")
+            )
+
+    for path in {path.parent for path in outputs}:
+        path.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        changed = sum(executor.map(write_if_changed, outputs, outputs.values()))
+    print(f"{len(outputs)} Ebenendateien, {changed} geschrieben, {len(outputs) - changed} unverändert")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Vergleich amounts.extract_amounts mit fetch_mcp_data.extract_numbers_from_text.
+
+Auf Texten, die beide Extraktoren abdecken (vorzeichenlose Beträge mit
+Tausenderpunkten und zwei Nachkommastellen, ohne T€/Mio. € und ohne
+ungegliederte Zahlen über drei Ziffern), müssen die Ergebnisse
+übereinstimmen. Dazu Fälle, die nur amounts.py korrekt
+behandelt (Schreibweise, Vorzeichen, Einheiten).
+
+Ausführen:
+    python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from amounts import extract_amounts, extract_amounts_batch  # noqa: E402
+from fetch_mcp_data import extract_numbers_from_text  # noqa: E402
+
+SHARED_CASES = [
+    "13.783.548,35",
+    "Gewerbesteuer 3.550.000,00 € und Grundsteuer B 1.234.567 EUR",
+    "Personalaufwendungen 5.012.300,50 4.870.100,00 4.650.000",
+    "Ansatz: 300 €, Vorjahr: 250,00 €",
+    "Zinsen 12.500,00\nTilgung 7.000\n\fSeite 3 von 120",
+    "Summe ordentliche Erträge  22.431.900,00  21.815.400,00",
+    "Keine Zahlen in diesem Text.",
+]
+
+
+@pytest.mark.parametrize("text", SHARED_CASES)
+def test_matches_extract_numbers_from_text(text):
+    assert extract_amounts(text).tolist() == pytest.approx(extract_numbers_from_text(text))
+
+
+def test_batch_matches_single_documents():
+    batch = extract_amounts_batch(SHARED_CASES)
+    for doc, text in enumerate(SHARED_CASES):
+        assert batch["amount"][batch["doc"] == doc].tolist() == extract_amounts(text).tolist()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Gewerbesteuer 3,8 Mio. € (Vorjahr 3.550 T€)", [3_800_000, 3_550_000]),
+    ("Fehlbetrag -1.234,50 € bzw. – 5 TEUR", [-1234.5, -5000]),
+    ("Haushaltsjahre 2023-2024", [2023, 2024]),
+    ("Kredite 1,5 Mrd. €", [1.5e9]),
+    ("0,05 €", [0.05]),
+])
+def test_signs_and_units(text, expected):
+    assert extract_amounts(text).tolist() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", [
+    "123456789012345678901234567 €",   # mehr als 15 Ziffern
+    "1.234.567.890.123.456 €",         # mehr als 15 Ziffern mit Tausenderpunkten
+    "1.2.3 EUR",                       # Tausendergruppen ohne drei Ziffern
+    "12.34 €",
+    "1234.567 €",                      # mehr als drei Ziffern vor dem ersten Punkt
+    ",5 €",                            # Dezimalkomma ohne Ziffer davor
+    "1,234.567 €",                     # Punkt nach dem Komma
+    "1,2,3 €",
+])
+def test_rejects_invalid_notation(text):
+    assert extract_amounts(text).tolist() == []
@@ -0,0 +1,59 @@
+"""
+Konsistenzprüfung gegen die Daten im Repository.
+
+Das Gate muss auf dem aktuellen Stand ohne Befund durchlaufen; dokumentierte
+Abweichungen mit differenz schlagen wieder an, sobald sich die Daten ändern.
+
+Ausführen:
+    python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from check_haushalt import is_known, load_known_deviations, run_checks  # noqa: E402
+from haushalt_matrix import load_haushalt_matrix, load_records  # noqa: E402
+
+
+def _checked(records, source, years=None):
+    known = load_known_deviations(source)
+    return [f for f in run_checks(records, source, years) if not is_known(f, known)]
+
+
+def test_repository_data_passes():
+    source = load_haushalt_matrix(cache_dir=None)
+    assert _checked(load_records(), source) == []
+    assert _checked(load_records(), source, list(range(2024, 2030))) == []
+
+
+def test_changed_deviation_is_reported():
+    source = load_haushalt_matrix(cache_dir=None)
+    records = load_records()
+    for record in records:
+        if record["jahr"] == 2024:
+            record["summen"]["jahresergebnis"] += 1000
+
+    findings = _checked(records, source)
+    assert {(f.pruefung, f.feld, f.jahr) for f in findings} == {
+        ("summe", "summen.jahresergebnis", 2024),
+        ("yaml", "summen.jahresergebnis", 2024),
+    }
+
+
+def test_changed_per_year_deviation_is_reported():
+    source = load_haushalt_matrix(cache_dir=None)
+    records = load_records()
+    for record in records:
+        if record["jahr"] == 2015:
+            record["summen"]["gesamtertraege"] += 1000
+
+    findings = _checked(records, source)
+    assert ("summe", "summen.gesamtertraege", 2015) in {(f.pruefung, f.feld, f.jahr) for f in findings}
+    assert all(f.jahr == 2015 for f in findings)
+
+def test_years_filter_skips_other_columns():
+    source = load_haushalt_matrix(cache_dir=None)
+    findings = run_checks(load_records(), source, [2025, 2026])
+    assert all(f.jahr in (None, 2025, 2026) for f in findings)
@@ -0,0 +1,92 @@
+"""
+Inkrementeller Aufbau des lokalen Volltextindex.
+
+Jede Anlage (Suchtreffer) ist eine eigene Zeile; die später abgerufene
+Drucksache derselben Vorlage ergänzt alle Anlagen um ihren Volltext.
+
+Ausführen:
+    python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from doc_index import connect, search_documents, update_index  # noqa: E402
+
+OPARL_ID = "https://nordstemmen.ratsinfomanagement.net/webservice/oparl/v1.1/body/1/paper/7912"
+
+TREFFER = {
+    "art": "treffer",
+    "query": "Jahresabschluss",
+    "daten": {
+        "title": "Jahresabschluss 2020",
+        "reference": "DS 92/2019",
+        "date": "2019-09-01",
+        "oparl_id": OPARL_ID,
+        "file_hash": "bda7532c788d",
+        "pdf_url": "https://nordstemmen.ratsinfomanagement.net/sdnetrim/f76e7350",
+        "excerpt": "Der Ergebnishaushalt weist ordentliche Erträge aus",
+    },
+}
+
+DRUCKSACHE = {
+    "art": "drucksache",
+    "daten": {
+        "reference": "DS 92/2019",
+        "title": "Jahresabschluss 2020",
+        "date": "2019-09-01",
+        "oparl_id": OPARL_ID,
+        "text": "Die Kreisumlage steigt gegenüber dem Vorjahr.",
+    },
+}
+
+
+def test_paper_updates_search_hit(tmp_path):
+    connection = connect(tmp_path / "index.sqlite")
+    assert update_index(connection, [TREFFER]) == (1, 0)
+    assert update_index(connection, [DRUCKSACHE, TREFFER]) == (0, 1)
+    # Erneuter Aufbau aus demselben Speicher ändert nichts
+    assert update_index(connection, [TREFFER, DRUCKSACHE]) == (0, 0)
+
+    rows = connection.execute("SELECT * FROM dokumente").fetchall()
+    assert len(rows) == 1
+    assert rows[0]["art"] == "drucksache"
+    assert rows[0]["file_hash"] == "bda7532c788d"
+    assert rows[0]["pdf_url"] == TREFFER["daten"]["pdf_url"]
+
+    # Volltext der Drucksache und Auszug des Treffers sind beide durchsuchbar
+    assert [r["reference"] for r in search_documents(connection, "Kreisumlage")] == ["DS 92/2019"]
+    assert [r["reference"] for r in search_documents(connection, "Erträge")] == ["DS 92/2019"]
+    connection.close()
+
+
+def test_paper_without_oparl_id_matches_reference(tmp_path):
+    connection = connect(tmp_path / "index.sqlite")
+    paper = {**DRUCKSACHE, "daten": {k: v for k, v in DRUCKSACHE["daten"].items() if k != "oparl_id"}}
+    # Die Zeile der Drucksache wird zur ersten Anlage
+    assert update_index(connection, [paper, TREFFER]) == (1, 1)
+    rows = connection.execute("SELECT * FROM dokumente").fetchall()
+    assert [(row["schluessel"], row["art"]) for row in rows] == [("bda7532c788d", "drucksache")]
+    connection.close()
+
+
+def test_paper_text_reaches_every_attachment(tmp_path):
+    anlage = {**TREFFER, "daten": {
+        **TREFFER["daten"],
+        "file_hash": "5f2c0d41e9aa",
+        "pdf_url": "https://nordstemmen.ratsinfomanagement.net/sdnetrim/9a0c11d2",
+        "excerpt": "Anlage 2: Bilanz zum 31.12.2020",
+    }}
+    for order in ([TREFFER, anlage, DRUCKSACHE], [DRUCKSACHE, TREFFER, anlage]):
+        connection = connect(tmp_path / f"index_{order[0]['art']}.sqlite")
+        update_index(connection, order)
+        assert update_index(connection, order) == (0, 0)
+
+        rows = connection.execute("SELECT file_hash, art FROM dokumente ORDER BY file_hash").fetchall()
+        assert [tuple(row) for row in rows] == [("5f2c0d41e9aa", "drucksache"), ("bda7532c788d", "drucksache")]
+        hits = search_documents(connection, "Kreisumlage")
+        assert sorted(hit["file_hash"] for hit in hits) == ["5f2c0d41e9aa", "bda7532c788d"]
+        assert [hit["file_hash"] for hit in search_documents(connection, "Bilanz")] == ["5f2c0d41e9aa"]
+        connection.close()
@@ -0,0 +1,96 @@
+"""
+Extraktion des Ergebnishaushalts aus einem handgeschriebenen Seitenlayout.
+
+tests/fixtures/ergebnishaushalt_2025.txt ist unabhängig von der YAML-Datei
+von Hand erstellt und folgt dem Muster 13 NKHR: zweizeiliger Spaltenkopf
+(Spaltenart über dem Jahr), Seitenumbruch innerhalb der Tabelle mit
+wiederholtem Kopf, umbrochene Zeilenbezeichnung, "-" für leere Zellen,
+außerordentliche Zeilen sowie Finanz- und Teilergebnishaushalt, die nicht
+übernommen werden dürfen. Seiten sind durch Seitenvorschub getrennt.
+
+Ausführen:
+    python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_haushalt_pdf  # noqa: E402
+from extract_haushalt_pdf import collect_tables, extract_years, iter_page_scans, parse_columns  # noqa: E402
+from haushalt_pdf_stub import write_text_pdf  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "ergebnishaushalt_2025.txt"
+
+# Von Hand aus dem Fixture übertragen (gerundet auf volle EUR)
+EXPECTED = {
+    2023: ("ist", {
+        "ertraege.steuern_und_abgaben": 9_812_455,
+        "ertraege.zuwendungen_und_umlagen": 6_204_118,
+        "ertraege.sonstige_ertraege": 18_250 + 388_190,
+        "ertraege.zinsen_finanzertraege": 41_228,
+        "aufwendungen.personalaufwendungen": 7_902_330 + 655_020,
+        "aufwendungen.sach_und_dienstleistungen": 3_811_403,
+        "summen.gesamtertraege": 20_730_870,
+        "summen.gesamtaufwendungen": 22_247_664,
+        "summen.jahresergebnis": -1_516_794,
+    }),
+    2025: ("plan", {
+        "ertraege.steuern_und_abgaben": 10_640_000,
+        "ertraege.sonstige_ertraege": 15_000 + 325_000,
+        "aufwendungen.personalaufwendungen": 8_905_600 + 712_000,
+        "aufwendungen.sach_und_dienstleistungen": 4_340_500,
+        "aufwendungen.zinsen_aufwendungen": 265_000,
+        "summen.jahresergebnis": -2_776_200,
+    }),
+    2028: ("plan", {
+        "ertraege.kostenerstattungen": 2_350_000,
+        "aufwendungen.transferaufwendungen": 9_260_000,
+        "summen.gesamtertraege": 24_067_000,
+        "summen.jahresergebnis": -3_299_000,
+    }),
+}
+
+
+@pytest.fixture(scope="module")
+def years(tmp_path_factory):
+    pytest.importorskip("pypdf")
+    pages = [page.strip("\n").split("\n") for page in FIXTURE.read_text(encoding="utf-8").split("\f")]
+    path = tmp_path_factory.mktemp("pdf") / "haushaltsplan_2025.pdf"
+    path.write_bytes(write_text_pdf(pages))
+    tables = collect_tables(iter_page_scans([path], workers=1))
+    sources = {str(path): {"datei": path.name, "quelle": path.stem, "datum": "2024-12-01"}}
+    assert len(tables[str(path)]) == 1, "Finanz- und Teilergebnishaushalt dürfen keine Tabelle bilden"
+    return extract_years(tables, sources)
+
+
+def test_columns_from_two_line_header():
+    labels = "  Nr.  Ertrags- und Aufwandsarten      Ergebnis    Ansatz    Ansatz    Planung"
+    line = "                                         2023      2024      2025       2026"
+    assert parse_columns(line, labels) == [(2023, "ist"), (2024, "plan"), (2025, "plan"), (2026, "plan")]
+    assert parse_columns(line) == [(2023, "plan"), (2024, "plan"), (2025, "plan"), (2026, "plan")]
+
+
+def test_all_columns_extracted(years):
+    assert list(years) == [2023, 2024, 2025, 2026, 2027, 2028]
+
+
+@pytest.mark.parametrize("year", sorted(EXPECTED))
+def test_values_match_hand_written_layout(years, year):
+    typ, fields = EXPECTED[year]
+    record, provenance = years[year]
+    assert record["typ"] == typ
+    for field, expected in fields.items():
+        group, key = field.split(".")
+        assert record[group][key] == expected, field
+    assert extract_haushalt_pdf.validate_haushalt(record) == []
+
+
+def test_rows_across_page_break_keep_pages(years):
+    _, provenance = years[2023]
+    assert provenance["ertraege.steuern_und_abgaben"]["seiten"] == [1]
+    assert provenance["aufwendungen.sach_und_dienstleistungen"]["seiten"] == [2]
+    assert provenance["summen.gesamtertraege"]["seiten"] == [2]
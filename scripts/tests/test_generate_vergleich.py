@@ -0,0 +1,102 @@
+"""
+Gemeindevergleich: Bevölkerungsstand und Vergleich je Einwohner.
+
+Ausführen:
+    python -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lsn_warehouse  # noqa: E402
+from fetch_lsn_data import EINWOHNER_MERKMAL, EINWOHNER_TABELLE  # noqa: E402
+from generate_vergleich import build_cube, compute_ranking, load_frames  # noqa: E402
+
+REGIONEN = ["254021000", "254026000"]
+JAHRE = [2022, 2023]
+
+
+def _werte() -> pd.DataFrame:
+    rows = [
+        ("Z9200001", region, jahr, merkmal, wert)
+        for i, region in enumerate(REGIONEN) for jahr in JAHRE
+        for merkmal, wert in (("Gewerbesteuer", 1_000_000.0 * (i + 1)), ("Hebesatz Gewerbesteuer", 400.0 + i))
+    ]
+    return pd.DataFrame(rows, columns=["tabelle", "region_id", "jahr", "merkmal", "wert"])
+
+
+def _einwohner(regionen=REGIONEN, jahre=JAHRE) -> pd.DataFrame:
+    rows = [(region, jahr, 10_000.0 * (i + 1) ** 2) for i, region in enumerate(regionen) for jahr in jahre]
+    return pd.DataFrame(rows, columns=["region_id", "jahr", "wert"])
+
+
+def test_per_capita_with_population():
+    cube = build_cube(_werte(), _einwohner())
+    vergleich = compute_ranking(cube)["vergleich"]
+    m = cube.merkmale.index("Gewerbesteuer")
+    assert cube.pro_kopf[m].all()
+    np.testing.assert_allclose(vergleich[m, :, 0], [100.0, 50.0])
+    # Sätze werden nie umgerechnet
+    s = cube.merkmale.index("Hebesatz Gewerbesteuer")
+    assert not cube.pro_kopf[s].any()
+    np.testing.assert_allclose(vergleich[s, :, 0], [400.0, 401.0])
+
+
+def test_amount_names_are_not_rates():
+    werte = _werte()
+    umbenannt = {"Gewerbesteuer": "Gemeindeanteil an der Umsatzsteuer",
+                 "Hebesatz Gewerbesteuer": "Steuereinnahmen je Einwohner"}
+    werte["merkmal"] = werte["merkmal"].map(umbenannt)
+    cube = build_cube(werte, _einwohner())
+    vergleich = compute_ranking(cube)["vergleich"]
+    # "Umsatzsteuer" enthält "satz", ist aber ein Betrag
+    m = cube.merkmale.index("Gemeindeanteil an der Umsatzsteuer")
+    assert cube.pro_kopf[m].all()
+    np.testing.assert_allclose(vergleich[m, :, 0], [100.0, 50.0])
+    # Schon je Einwohner angegeben: nicht noch einmal teilen
+    j = cube.merkmale.index("Steuereinnahmen je Einwohner")
+    assert not cube.betrag[j] and not cube.pro_kopf[j].any()
+    np.testing.assert_allclose(vergleich[j, :, 0], [400.0, 401.0])
+
+
+def test_absolute_without_population():
+    cube = build_cube(_werte(), _einwohner().iloc[0:0])
+    vergleich = compute_ranking(cube)["vergleich"]
+    m = cube.merkmale.index("Gewerbesteuer")
+    assert not cube.pro_kopf[m].any()
+    np.testing.assert_allclose(vergleich[m], cube.werte[m])
+
+
+def test_absolute_only_in_years_with_gaps():
+    einwohner = pd.concat([_einwohner(jahre=[2022]), _einwohner(REGIONEN[:1], [2023])])
+    cube = build_cube(_werte(), einwohner)
+    m = cube.merkmale.index("Gewerbesteuer")
+    assert cube.pro_kopf[m].tolist() == [True, False]
+    assert not np.isnan(compute_ranking(cube)["vergleich"][m]).any()
+
+
+@pytest.mark.skipif(lsn_warehouse.pa is None, reason="pyarrow nicht installiert")
+def test_population_is_matched_exactly(tmp_path):
+    pytest.importorskip("duckdb")
+    bevoelkerung = pd.DataFrame({
+        "tabelle": EINWOHNER_TABELLE,
+        "region_id": REGIONEN[0],
+        "jahr": 2023,
+        "merkmal": [EINWOHNER_MERKMAL, "männlich"],
+        "wert": [12_000.0, 5_900.0],
+    })
+    # Ein Betrag "je Einwohner" ist kein Bevölkerungsstand
+    je_einwohner = pd.DataFrame({
+        "tabelle": ["Z9200001"], "region_id": [REGIONEN[0]], "jahr": [2023],
+        "merkmal": ["Steuereinnahmen je Einwohner"], "wert": [850.0],
+    })
+    lsn_warehouse.upsert_frame(pd.concat([bevoelkerung, je_einwohner]), "test", warehouse_dir=tmp_path)
+
+    _, einwohner = load_frames(["Z9200001"], warehouse_dir=tmp_path)
+    assert einwohner[["region_id", "jahr", "wert"]].values.tolist() == [[REGIONEN[0], 2023, 12_000.0]]
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Transportschicht für fetch_lsn_data.py und fetch_mcp_data.py.
+
+Liegt unter dem HTTP-Cache (ResponseCache.request bekommt Transport.request
+als send-Funktion) und ergänzt jede Anfrage um:
+
+    - Token-Bucket je Host (Anfragen pro Sekunde, Burst)
+    - Timeouts (Verbindung, Lesen) für jede Anfrage
+    - Wiederholung mit exponentiellem Backoff und Jitter bei 5xx, 429
+      und Verbindungsfehlern (Retry-After wird beachtet)
+    - Erneuerung einer abgelaufenen Session (Prädikat + Callback, bei LSN:
+      404 oder Weiterleitung auf default.asp) mit einmaliger Wiederholung
+    - Circuit-Breaker je Host: nach N Fehlschlägen in Folge werden
+      Anfragen sofort abgelehnt, bis nach reset_timeout ein Probeversuch
+      gelingt
+    - Messwerte je Anfrage (Host, Pfad, Status, Dauer, Versuch)
+
+Token-Buckets, Circuit-Breaker und Messwerte stehen in einem RequestGuard,
+den sich alle Sessions eines Abrufs teilen; das Limit gilt damit für den
+ganzen Crawl und nicht je Session.
+
+Verwendung:
+    guard = RequestGuard(rate=2.0, burst=4)
+    transport = Transport(requests.Session(), guard)
+    response = transport.request("GET", url)
+    print(guard.metrics.summary())
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlsplit
+
+import requests
+
+from instrumentation import REPORT
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+DEFAULT_RATE = 2.0  # Anfragen pro Sekunde und Host
+DEFAULT_BURST = 4
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5  # Sekunden, verdoppelt je Versuch
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_TIMEOUT = (10.0, 60.0)  # (Verbindung, Lesen)
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    """Der Circuit-Breaker des Hosts ist offen, die Anfrage wurde nicht gesendet."""
+
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket (rate Tokens pro Sekunde, höchstens burst)."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserviert ein Token und liefert die Wartezeit in Sekunden bis dahin."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Wartet auf ein Token; Rückgabe ist die Wartezeit in Sekunden."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Circuit-Breaker: geschlossen -> offen nach failure_threshold Fehlschlägen
+    in Folge; nach reset_timeout lässt er einen Probeversuch durch (halboffen).
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "geschlossen"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "halboffen"
+        return "offen"
+
+    def allow(self) -> bool:
+        """True, wenn eine Anfrage gesendet werden darf."""
+        with self._lock:
+            state = self.state
+            if state == "geschlossen":
+                return True
+            if state == "halboffen" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        """Gibt einen Probeversuch frei, der ohne Ergebnis abgebrochen wurde."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class RequestMetrics:
+    """Messwerte je Anfrage (thread-sicher)."""
+
+    def __init__(self):
+        self.records: list[dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, **fields):
+        with self._lock:
+            self.records.append(fields)
+
+    def summary(self) -> str:
+        """Kurze Statistik je Host für die Konsolenausgabe."""
+        with self._lock:
+            records = list(self.records)
+        lines = []
+        for host in sorted({r["host"] for r in records}):
+            host_records = [r for r in records if r["host"] == host]
+            seconds = sorted(r["dauer_s"] for r in host_records)
+            errors = sum(1 for r in host_records if r["fehler"] or r["status"] >= 500)
+            retries = sum(1 for r in host_records if r["versuch"] > 1)
+            p95 = seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]
+            lines.append(
+                f"  {host}: {len(host_records)} Anfragen, {retries} Wiederholungen, {errors} Fehler, "
+                f"Median {statistics.median(seconds):.2f}s, p95 {p95:.2f}s"
+            )
+        return "Transport:\n" + "\n".join(lines) if lines else "Transport: keine Anfragen"
+
+    def save(self, path: Path):
+        """Schreibt alle Messwerte als JSON Lines."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class RequestGuard:
+    """Gemeinsamer Zustand aller Transporte eines Abrufs: Buckets, Breaker, Messwerte je Host."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        retries: int = DEFAULT_RETRIES,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = RequestMetrics()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+
+def backoff_delay(attempt: int, base: float, maximum: float, retry_after: str | None = None) -> float:
+    """Wartezeit vor Versuch attempt + 1: Retry-After, sonst Backoff mit vollem Jitter."""
+    if retry_after:
+        try:
+            return min(float(retry_after), maximum)
+        except ValueError:
+            pass
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
+
+
+class Transport:
+    """
+    Sendet Anfragen über eine requests.Session mit den Regeln aus RequestGuard.
+
+    request() hat die Signatur von requests.Session.request und kann direkt
+    als send-Funktion an ResponseCache.request übergeben werden.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        guard: RequestGuard | None = None,
+        retries: int | None = None,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        session_expired: Callable[[requests.Response], bool] | None = None,
+        renew_session: Callable[[], bool] | None = None
+    ):
+        self.session = session or requests.Session()
+        self.guard = guard or RequestGuard()
+        self.retries = self.guard.retries if retries is None else retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session_expired = session_expired
+        self.renew_session = renew_session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Anfrage mit Rate-Limit, Timeout, Wiederholungen und Circuit-Breaker.
+
+        Die Antwort hat das Attribut wartezeit: Sekunden, die in Rate-Limit
+        und Backoff gewartet wurden (nicht Teil der Antwortzeit des Servers).
+
+        Raises:
+            CircuitOpen: Host ist gesperrt
+            requests.RequestException: Verbindungsfehler nach allen Versuchen
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        bucket, breaker = self.guard.bucket(host), self.guard.breaker(host)
+        renewed = False
+        attempt = 0
+        waited = 0.0
+
+        while True:
+            attempt += 1
+            if not breaker.allow():
+                raise CircuitOpen(f"Circuit-Breaker für {host} offen ({breaker.failures} Fehler in Folge)")
+            waited += bucket.acquire()
+
+            started = time.perf_counter()
+            response, error = None, None
+            try:
+                response = self.session.request(method, url, **kwargs)
+                REPORT.count("requests")
+                REPORT.count("bytes", len(response.content))
+            except requests.RequestException as e:
+                error = e
+            except BaseException:
+                breaker.release()
+                raise
+            self.guard.metrics.record(
+                host=host, methode=method.upper(), pfad=urlsplit(url).path,
+                status=response.status_code if response is not None else 0,
+                dauer_s=round(time.perf_counter() - started, 4), versuch=attempt,
+                fehler=type(error).__name__ if error else None,
+            )
+
+            failed = error is not None or response.status_code in RETRY_STATUS
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if (not failed and not renewed and self.session_expired is not None
+                    and self.renew_session is not None and self.session_expired(response)):
+                renewed = True
+                if self.renew_session():
+                    continue
+
+            # Nur Verbindungsfehler und Timeouts wiederholen (nicht z.B. InvalidURL, TooManyRedirects)
+            retryable = error is None or isinstance(error, (requests.ConnectionError, requests.Timeout))
+            if not failed or not retryable or attempt > self.retries:
+                if error is not None:
+                    raise error
+                response.wartezeit = waited
+                return response
+
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            delay = backoff_delay(attempt, self.backoff, self.max_backoff, retry_after)
+            time.sleep(delay)
+            waited += delay
+
+
+async def request_async(
+    guard: RequestGuard,
+    send,
+    url: str,
+    retry_exceptions: tuple[type[Exception], ...],
+    retries: int | None = None,
+    backoff: float = DEFAULT_BACKOFF,
+    max_backoff: float = DEFAULT_MAX_BACKOFF,
+    method: str = "POST"
+):
+    """
+    Asynchrone Variante von Transport.request für httpx.
+
+    Args:
+        send: Coroutine-Funktion ohne Argumente, die die Anfrage sendet
+        retry_exceptions: Verbindungsfehler, die wiederholt werden (z.B. httpx.TransportError)
+    """
+    retries = guard.retries if retries is None else retries
+    host = urlsplit(url).netloc
+    bucket, breaker = guard.bucket(host), guard.breaker(host)
+    attempt = 0
+    while True:
+        attempt += 1
+        if not breaker.allow():
+            raise CircuitOpen(f"Circuit-Breaker für {host} offen ({breaker.failures} Fehler in Folge)")
+        delay = bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        started = time.perf_counter()
+        response, error = None, None
+        try:
+            response = await send()
+            REPORT.count("requests")
+            REPORT.count("bytes", len(response.content))
+        except retry_exceptions as e:
+            error = e
+        except BaseException:
+            breaker.release()
+            raise
+        guard.metrics.record(
+            host=host, methode=method, pfad=urlsplit(url).path,
+            status=response.status_code if response is not None else 0,
+            dauer_s=round(time.perf_counter() - started, 4), versuch=attempt,
+            fehler=type(error).__name__ if error else None,
+        )
+
+        failed = error is not None or response.status_code in RETRY_STATUS
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if not failed or attempt > retries:
+            if error is not None:
+                raise error
+            return response
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        await asyncio.sleep(backoff_delay(attempt, backoff, max_backoff, retry_after))
+
+
+def add_transport_arguments(parser, rate: float = DEFAULT_RATE):
+    """Fügt die gemeinsamen Transport-Schalter zu einem ArgumentParser hinzu."""
+    group = parser.add_argument_group("Transport")
+    group.add_argument("--rate", type=float, default=rate,
+                       help=f"Anfragen pro Sekunde und Host, 0 = unbegrenzt (Standard: {rate})")
+    group.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                       help=f"Wiederholungen bei 5xx/Verbindungsfehlern (Standard: {DEFAULT_RETRIES})")
+    group.add_argument("--metrics", type=Path, help="Messwerte je Anfrage als JSON Lines speichern")
+
+
+def guard_from_args(args) -> RequestGuard:
+    """Erzeugt den gemeinsamen RequestGuard entsprechend den Kommandozeilen-Schaltern."""
+    burst = max(1, round(args.rate * 2)) if args.rate > 0 else DEFAULT_BURST
+    return RequestGuard(rate=args.rate, burst=burst, retries=args.retries)
@@ -0,0 +1,69 @@
+import { createHash } from 'node:crypto';
+import { readdirSync, readFileSync } from 'node:fs';
+import { join } from 'node:path';
+import analytics from '../data/analytics.json';
+
+/**
+ * Vorberechnete Kennzahlen aus scripts/generate_analytics.py
+ * (Arrays je Position, Index = Position des Jahres in analytics.jahre)
+ */
+export interface Kennzahlen {
+  werte: (number | null)[];
+  anteil?: (number | null)[];
+  veraenderung: (number | null)[];
+  veraenderung_prozent: (number | null)[];
+  pro_kopf: (number | null)[];
+  cagr_ist: number | null;
+  cagr_plan: number | null;
+  wachstum: { start: number; ende: number; veraenderung: number; prozent: number };
+}
+
+export type Gruppe = 'ertraege' | 'aufwendungen' | 'summen';
+
+export { analytics };
+
+/**
+ * Hash der Jahresdateien wie content_digest() in scripts/generate_analytics.py
+ * (Dateiname und Inhalt, nach Namen sortiert)
+ */
+function contentDigest(dir: string): string {
+  const hash = createHash('sha256');
+  for (const name of readdirSync(dir).filter(n => n.endsWith('.json')).sort()) {
+    hash.update(Buffer.from(`${name}\0`, 'utf-8'));
+    hash.update(readFileSync(join(dir, name)));
+    hash.update(Buffer.from([0]));
+  }
+  return hash.digest('hex');
+}
+
+// Build abbrechen, wenn analytics.json nicht zu den Jahresdateien passt
+if (contentDigest(join(process.cwd(), 'src', 'content', 'haushalte')) !== analytics.quellen_sha256) {
+  throw new Error(
+    'src/data/analytics.json ist veraltet (Jahresdateien geändert). ' +
+    'Bitte "python scripts/haushalt.py render analytics" ausführen.'
+  );
+}
+
+const jahrIndex = new Map(analytics.jahre.map((jahr, i) => [jahr, i]));
+
+/**
+ * Kennzahlen einer Position (z.B. kennzahlen('aufwendungen', 'personalaufwendungen'))
+ */
+export function kennzahlen(gruppe: Gruppe, key: string): Kennzahlen {
+  return (analytics.gruppen[gruppe] as Record<string, Kennzahlen>)[key];
+}
+
+/**
+ * Wert einer Kennzahlen-Reihe für ein Jahr (null, wenn nicht vorhanden)
+ */
+export function wertImJahr(reihe: (number | null)[] | undefined, jahr: number): number | null {
+  const i = jahrIndex.get(jahr);
+  return (i === undefined ? null : reihe?.[i]) ?? null;
+}
+
+/**
+ * Wert einer Kennzahlen-Reihe für ein Jahr (0, wenn nicht vorhanden)
+ */
+export function imJahr(reihe: (number | null)[] | undefined, jahr: number): number {
+  return wertImJahr(reihe, jahr) ?? 0;
+}
@@ -0,0 +1,27 @@
+import szenarien from '../data/szenarien.json';
+
+/**
+ * Monte-Carlo-Szenarien aus scripts/generate_szenarien.py
+ * (Arrays je Kennzahl, Index = Position des Jahres in szenarien.jahre)
+ */
+export type Quantil = 'p05' | 'p10' | 'p25' | 'p50' | 'p75' | 'p90' | 'p95';
+
+export interface Jahresergebnis {
+  plan: number[];
+  mittel: number[];
+  quantile: Record<Quantil, number[]>;
+  wahrscheinlichkeit_defizit: number[];
+}
+
+export { szenarien };
+
+/**
+ * Verteilung des Jahresergebnisses eines Planjahres als Histogramm
+ * (Klassenmitte in EUR, Anteil der Pfade)
+ */
+export function histogramm(jahr: number): { mitte: number; anteil: number }[] {
+  const i = szenarien.jahre.indexOf(jahr);
+  if (i < 0) return [];
+  const { grenzen, anteile } = szenarien.histogramm;
+  return anteile[i].map((anteil, k) => ({ mitte: (grenzen[k] + grenzen[k + 1]) / 2, anteil }));
+}